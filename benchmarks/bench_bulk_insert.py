@@ -0,0 +1,44 @@
+"""Compare bulk insert strategies with the example.model.User shape.
+
+Usage: python benchmarks/bench_bulk_insert.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyqlite.db import BulkInsertStrategy, DB  # noqa: E402
+from example.model import User  # noqa: E402
+
+
+def measure(strategy: BulkInsertStrategy, rows: int, lazy: bool) -> float:
+    with tempfile.TemporaryDirectory() as dir:
+        db = DB(os.path.join(dir, 'bench.db'))
+        db.execute(
+            'CREATE TABLE users (id integer not null primary key, '
+            'name text not null, phone text not null, address text)')
+        models = [User(i, f"name{i}", f"phone{i}", f"address{i}")
+                  for i in range(rows)]
+        start = time.perf_counter()
+        # A non-list iterable takes the lazily consumed path.
+        db.bulk_insert(iter(models) if lazy else models, strategy=strategy)
+        db.commit()
+        elapsed = time.perf_counter() - start
+        db.close()
+    return elapsed
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+    for strategy in BulkInsertStrategy:
+        for lazy in [False, True]:
+            elapsed = measure(strategy, rows, lazy)
+            source = 'iterator' if lazy else 'list'
+            print(f"{strategy.value} ({source}): {elapsed:.3f} s, "
+                  f"{rows / elapsed:,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
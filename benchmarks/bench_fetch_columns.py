@@ -0,0 +1,57 @@
+"""Compare memory and time of where and fetch_columns.
+
+OrderItem has integer columns only, User has text columns mostly.
+Memory is the peak traced by tracemalloc while building the result.
+
+Usage: python benchmarks/bench_fetch_columns.py [rows]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyqlite.db import DB  # noqa: E402
+from example.model import OrderItem, User  # noqa: E402
+
+
+def measure(func) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if 1 < len(sys.argv) else 200000
+    db = DB(':memory:')
+    db.execute(
+        'CREATE TABLE users (id integer not null primary key, '
+        'name text not null, phone text not null, address text)')
+    db.execute(
+        'CREATE TABLE order_items (order_id integer not null, '
+        'item_no integer not null, quantity integer not null, '
+        'PRIMARY KEY (order_id, item_no))')
+    db.bulk_insert([User(i, f"name{i}", f"phone{i}", f"address{i}")
+                    for i in range(rows)])
+    db.bulk_insert([OrderItem(i, 1, i % 10) for i in range(rows)])
+
+    for model_class in [OrderItem, User]:
+        for name, func in [
+                ('where', lambda: db.where(model_class)),
+                ('fetch_columns', lambda: db.fetch_columns(model_class))]:
+            elapsed, peak = measure(func)
+            print(f"{model_class.__name__} {name}: {elapsed:.3f} s, "
+                  f"peak {peak / rows:.0f} bytes/row")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
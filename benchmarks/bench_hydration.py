@@ -0,0 +1,46 @@
+"""Compare building User models from rows by __init__ and by the row hydrator.
+
+Usage: python benchmarks/bench_hydration.py [rows]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyqlite.db import DB  # noqa: E402
+from example.model import User  # noqa: E402
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if 1 < len(sys.argv) else 1000000
+    db = DB(':memory:')
+    db.execute(
+        'CREATE TABLE users (id integer not null primary key, '
+        'name text not null, phone text not null, address text)')
+    db.bulk_insert([User(i, f"name{i}", f"phone{i}", f"address{i}")
+                    for i in range(rows)])
+    fetched = db.execute('SELECT * FROM users').fetchall()
+
+    start = time.perf_counter()
+    [User(*r) for r in fetched]
+    init_elapsed = time.perf_counter() - start
+
+    hydrate = User.get_row_hydrator()
+    start = time.perf_counter()
+    list(map(hydrate, fetched))
+    hydrator_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    db.where(User)
+    where_elapsed = time.perf_counter() - start
+
+    print(f"__init__: {init_elapsed:.3f} s")
+    print(f"row hydrator: {hydrator_elapsed:.3f} s "
+          f"({init_elapsed / hydrator_elapsed:.1f}x)")
+    print(f"where including fetch: {where_elapsed:.3f} s")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Measure the overhead of Instrumentation with StatsAggregator.
+
+find by primary key is the statement where a fixed overhead weighs the most,
+and where of 100 rows shows a typical query.
+Runs with and without instrumentation are interleaved to reduce noise.
+
+Usage: python benchmarks/bench_instrumentation.py [rows] [repeat]
+"""
+import os
+import sys
+import time
+from typing import Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyqlite.db import DB, Instrumentation, StatsAggregator  # noqa: E402
+from example.model import User  # noqa: E402
+
+
+def measure_find(
+        db: DB, instrumentation: Optional[Instrumentation], rows: int) -> float:
+    db.instrumentation = instrumentation
+    start = time.perf_counter()
+    for i in range(rows):
+        db.find(User, i)
+    return time.perf_counter() - start
+
+
+def measure_where(
+        db: DB, instrumentation: Optional[Instrumentation], rows: int) -> float:
+    db.instrumentation = instrumentation
+    start = time.perf_counter()
+    for i in range(0, rows, 100):
+        db.where(User, 'id BETWEEN ? AND ?', [i, i + 99])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+    repeat = int(sys.argv[2]) if 2 < len(sys.argv) else 5
+    db = DB(':memory:')
+    db.execute(
+        'CREATE TABLE users (id integer not null primary key, '
+        'name text not null, phone text not null, address text)')
+    db.bulk_insert([User(i, f"name{i}", f"phone{i}", f"address{i}")
+                    for i in range(rows)])
+    aggregator = StatsAggregator()
+    instrumentation = Instrumentation()
+    instrumentation.add_after_execute(aggregator)
+    for name, measure in [('find', measure_find), ('where', measure_where)]:
+        baseline = instrumented = float('inf')
+        for _ in range(repeat):
+            baseline = min(baseline, measure(db, None, rows))
+            instrumented = min(instrumented, measure(db, instrumentation, rows))
+        print(f"{name}: no instrumentation {baseline:.3f} s, "
+              f"StatsAggregator {instrumented:.3f} s "
+              f"({(instrumented / baseline - 1) * 100:+.1f} %)")
+    print(aggregator.report(3))
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
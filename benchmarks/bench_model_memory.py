@@ -0,0 +1,49 @@
+"""Measure memory used per model instance of the example.model.User shape.
+
+Usage: python benchmarks/bench_model_memory.py [rows]
+"""
+from dataclasses import dataclass
+import gc
+import os
+import sys
+import tracemalloc
+from typing import ClassVar, Final, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyqlite.model import BaseModel  # noqa: E402
+from example.model import User  # noqa: E402
+
+
+@dataclass(init=True, eq=True, slots=True)
+class SlottedUser(BaseModel):
+    id: Final[int]
+    name: str
+    phone: str
+    address: Optional[str] = None
+    __table_name: ClassVar[str] = 'users'
+
+
+def measure(model_class, rows: int) -> float:
+    # Values are created up front so only the models are measured.
+    values = [(i, f"name{i}", f"phone{i}", f"address{i}")
+              for i in range(rows)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    models = [model_class(*v) for v in values]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del models
+    return (after - before) / rows
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+    for model_class in [User, SlottedUser]:
+        print(f"{model_class.__name__}: "
+              f"{measure(model_class, rows):.1f} bytes/row")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Compare write throughput of PragmaProfile presets.
+
+Each preset inserts User rows one statement at a time and
+commits every commit_interval rows.
+
+Usage: python benchmarks/bench_pragma_profile.py [rows] [commit_interval]
+"""
+import os
+import sys
+import tempfile
+import time
+from typing import Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyqlite.db import DB, PragmaProfile  # noqa: E402
+from example.model import User  # noqa: E402
+
+
+def measure(
+        profile: Optional[PragmaProfile],
+        rows: int,
+        commit_interval: int) -> float:
+    with tempfile.TemporaryDirectory() as dir:
+        db = DB(os.path.join(dir, 'bench.db'), pragma_profile=profile)
+        db.execute(
+            'CREATE TABLE users (id integer not null primary key, '
+            'name text not null, phone text not null, address text)')
+        db.commit()
+        models = [User(i, f"name{i}", f"phone{i}", f"address{i}")
+                  for i in range(rows)]
+        start = time.perf_counter()
+        for i, m in enumerate(models, 1):
+            db.insert(m)
+            if i % commit_interval == 0:
+                db.commit()
+        db.commit()
+        elapsed = time.perf_counter() - start
+        db.close()
+    return elapsed
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if 1 < len(sys.argv) else 20000
+    commit_interval = int(sys.argv[2]) if 2 < len(sys.argv) else 10
+    profiles = [('default', None)] + [
+        (name, PragmaProfile.preset(name))
+        for name in ['durable', 'balanced', 'bulk-load']]
+    for name, profile in profiles:
+        elapsed = measure(profile, rows, commit_interval)
+        print(f"{name}: {elapsed:.3f} s, {rows / elapsed:,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Measure read throughput of DB.with_readers by the number of threads.
+
+Each thread runs where queries that scan a range of User rows,
+sharing one DB instance and its pool of read-only connections.
+
+Usage: python benchmarks/bench_reader_pool.py [rows] [queries] [max_threads]
+max_threads defaults to the number of CPUs.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyqlite.db import DB, PragmaProfile  # noqa: E402
+from example.model import User  # noqa: E402
+
+
+def measure(db: DB, threads: int, rows: int, queries: int) -> float:
+    def query(i: int) -> int:
+        low = i * 97 % rows
+        return len(db.where(User, 'id BETWEEN ? AND ?', [low, low + 100]))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in executor.map(query, range(queries)):
+            pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+    queries = int(sys.argv[2]) if 2 < len(sys.argv) else 2000
+    cpu_count = os.cpu_count() or 1
+    max_threads = int(sys.argv[3]) if 3 < len(sys.argv) else cpu_count
+    with tempfile.TemporaryDirectory() as dir:
+        db = DB.with_readers(
+            os.path.join(dir, 'bench.db'),
+            readers=max_threads,
+            pragma_profile=PragmaProfile.preset('balanced'))
+        db.execute(
+            'CREATE TABLE users (id integer not null primary key, '
+            'name text not null, phone text not null, address text)')
+        db.bulk_insert([User(i, f"name{i}", f"phone{i}", f"address{i}")
+                        for i in range(rows)])
+        db.commit()
+        threads = 1
+        while threads <= max_threads:
+            elapsed = measure(db, threads, rows, queries)
+            print(f"{threads} threads: {elapsed:.3f} s, "
+                  f"{queries / elapsed:,.0f} queries/s")
+            threads *= 2
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
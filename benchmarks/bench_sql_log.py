@@ -0,0 +1,52 @@
+"""Measure the cost of SQL logging by DB.log_level.
+
+Each run inserts User rows one statement at a time and by bulk_insert.
+Records are sent to a NullHandler, so only the logging itself is measured.
+
+Usage: python benchmarks/bench_sql_log.py [rows]
+"""
+from logging import INFO, WARNING, NullHandler, getLogger
+import os
+import sys
+import time
+from typing import Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyqlite.db import DB  # noqa: E402
+from example.model import User  # noqa: E402
+
+
+def measure(log_level: Optional[int], rows: int) -> tuple:
+    db = DB(':memory:')
+    db.log_level = log_level
+    db.execute(
+        'CREATE TABLE users (id integer not null primary key, '
+        'name text not null, phone text not null, address text)')
+    models = [User(i, f"name{i}", f"phone{i}", f"address{i}")
+              for i in range(rows)]
+    start = time.perf_counter()
+    for m in models:
+        db.insert(m)
+    insert_elapsed = time.perf_counter() - start
+    db.delete(User)
+    start = time.perf_counter()
+    db.bulk_insert(models)
+    bulk_insert_elapsed = time.perf_counter() - start
+    db.close()
+    return insert_elapsed, bulk_insert_elapsed
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+    logger = getLogger(DB.__name__)
+    logger.addHandler(NullHandler())
+    logger.propagate = False
+    for name, log_level in [('None', None), ('WARNING', WARNING), ('INFO', INFO)]:
+        insert_elapsed, bulk_insert_elapsed = measure(log_level, rows)
+        print(f"log_level {name}: insert {insert_elapsed:.3f} s, "
+              f"bulk_insert {bulk_insert_elapsed:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,3 @@
 from example.model.user import User
 from example.model.user_edited_history import UserEditedHistory
+from example.model.order_item import OrderItem
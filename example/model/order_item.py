@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+from typing import ClassVar, Final
+
+from pyqlite.model import BaseModel
+
+
+@dataclass(init=True, eq=True)
+class OrderItem(BaseModel):
+    order_id: Final[int]
+    item_no: Final[int]
+    quantity: int
+    __table_name: ClassVar[str] = 'order_items'
@@ -1,3 +1,13 @@
 from pyqlite.db.db import DB
 from pyqlite.db.querybuilder import QueryBuilder
 from pyqlite.db.isolation_level import IsolationLevel
+from pyqlite.db.compiled_model import CompiledModel
+from pyqlite.db.bulk_insert_strategy import BulkInsertStrategy
+from pyqlite.db.connection_pool import ConnectionPool
+from pyqlite.db.pragma_profile import PragmaProfile
+from pyqlite.db.retry_policy import RetryPolicy
+from pyqlite.db.instrumentation import (
+    ExecuteEvent, Instrumentation, LatencyHistogram, StatementStats, StatsAggregator)
+from pyqlite.db.statement_cache_stats import StatementCacheStats
+from pyqlite.db.write_queue import WriteQueue
+from pyqlite.db.async_db import AsyncDB
@@ -0,0 +1,380 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import contextlib
+import functools
+from typing import (
+    Any, AsyncIterator, Callable, Dict, Final, Iterable, List, Optional, Type, Union)
+
+from pyqlite.db.bulk_insert_strategy import BulkInsertStrategy
+from pyqlite.db.db import DB
+from pyqlite.db.isolation_level import IsolationLevel
+from pyqlite.db.pragma_profile import PragmaProfile
+from pyqlite.model import BaseModel
+
+
+class AsyncDB:
+    """asyncio front-end of DB
+
+    Every operation runs on a dedicated thread that owns the connection,
+    so the event loop is never blocked by SQLite.
+    Models are hydrated in the same way as DB.
+    """
+
+    def __init__(
+            self,
+            db_filepath: str,
+            isolation_level: IsolationLevel = IsolationLevel.DEFERRED,
+            pragma_profile: Optional[PragmaProfile] = None) -> None:
+        """Constructor
+
+        The connection is opened on the dedicated thread.
+        When opening fails, every operation raises the error of opening.
+        Use AsyncDB.open to get the error on construction.
+
+        Parameters
+        ----------
+        db_filepath : str
+            Database file path
+        isolation_level : IsolationLevel, optional
+            Isolation level, by default IsolationLevel.DEFERRED
+        pragma_profile : Optional[PragmaProfile], optional
+            PRAGMA settings applied to the connection, by default None
+        """
+        self.db_filepath: Final[str] = db_filepath
+        self.__executor: Final[ThreadPoolExecutor] = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='pyqlite-async')
+        self.__db: Optional[DB] = None
+        # Queued first, so it runs before any operation on the same thread.
+        self.__opened: Final[Future] = self.__executor.submit(
+            self.__open, db_filepath, isolation_level, pragma_profile)
+
+    @classmethod
+    async def open(
+            cls,
+            db_filepath: str,
+            isolation_level: IsolationLevel = IsolationLevel.DEFERRED,
+            pragma_profile: Optional[PragmaProfile] = None) -> 'AsyncDB':
+        """Create an instance after the connection is opened.
+
+        Parameters
+        ----------
+        db_filepath : str
+            Database file path
+        isolation_level : IsolationLevel, optional
+            Isolation level, by default IsolationLevel.DEFERRED
+        pragma_profile : Optional[PragmaProfile], optional
+            PRAGMA settings applied to the connection, by default None
+
+        Returns
+        -------
+        AsyncDB
+            AsyncDB instance with an opened connection
+
+        Raises
+        ------
+        sqlite3.Error
+            Raises the error of opening the database
+        """
+        db = cls(db_filepath, isolation_level, pragma_profile)
+        try:
+            await asyncio.wrap_future(db.__opened)
+        except BaseException:
+            await db.close()
+            raise
+        return db
+
+    def __open(
+            self,
+            db_filepath: str,
+            isolation_level: IsolationLevel,
+            pragma_profile: Optional[PragmaProfile]) -> None:
+        self.__db = DB(
+            db_filepath, isolation_level, pragma_profile=pragma_profile)
+
+    def __call(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        # Raises the error of opening
+        self.__opened.result()
+        return func(self.__db, *args, **kwargs)
+
+    def __close(self) -> None:
+        if self.__db is not None:
+            self.__db.close()
+
+    async def __run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.__executor,
+            functools.partial(self.__call, func, args, kwargs))
+
+    @staticmethod
+    def __execute_and_fetchall(
+            db: DB,
+            sql: str,
+            params: Optional[Union[dict, List]]) -> List:
+        cursor = db.execute(sql, params)
+        try:
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    ###################
+    # Connection
+    ###################
+    async def commit(self) -> None:
+        """Commit
+        """
+        await self.__run(DB.commit)
+
+    async def rollback(self) -> None:
+        """Rollback
+        """
+        await self.__run(DB.rollback)
+
+    async def close(self) -> None:
+        """Close database and stop the dedicated thread
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.__executor, self.__close)
+        finally:
+            self.__executor.shutdown(wait=False)
+
+    ###################
+    # Select
+    ###################
+    async def find(self, model_class: Type[BaseModel], *primary_key_values):
+        """Find a data by primary keys.
+
+        See DB.find.
+        """
+        return await self.__run(DB.find, model_class, *primary_key_values)
+
+    async def find_by(
+            self,
+            model_class: Type[BaseModel],
+            where: Optional[str] = None,
+            where_params: Optional[Union[dict, List]] = None,
+            columns: Optional[List[str]] = None):
+        """Find a data by specified parameters.
+
+        See DB.find_by.
+        """
+        return await self.__run(
+            DB.find_by, model_class, where, where_params, columns)
+
+    async def where(
+            self,
+            model_class: Type[BaseModel],
+            where: Optional[str] = None,
+            where_params: Optional[Union[dict, List]] = None,
+            columns: Optional[List[str]] = None) -> List:
+        """Find data by specified parameters.
+
+        See DB.where.
+        """
+        return await self.__run(
+            DB.where, model_class, where, where_params, columns)
+
+    async def iter_where(
+            self,
+            model_class: Type[BaseModel],
+            where: Optional[str] = None,
+            where_params: Optional[Union[dict, List]] = None,
+            batch_size: int = 1000) -> AsyncIterator:
+        """Find data by specified parameters lazily.
+
+        Rows are fetched in batches of batch_size on the dedicated thread.
+        The cursor is closed when the iteration finishes or the iterator is closed.
+        Wrap it with contextlib.aclosing when breaking out of the loop early.
+        See DB.iter_where.
+
+        Yields
+        ------
+        Model Type
+            Found data
+        """
+        batches = await self.__run(
+            DB.iter_where, model_class, where, where_params,
+            batch_size=batch_size, yield_batches=True)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                batch = await loop.run_in_executor(
+                    self.__executor, next, batches, None)
+                if batch is None:
+                    break
+                for model in batch:
+                    yield model
+        finally:
+            try:
+                await loop.run_in_executor(self.__executor, batches.close)
+            except RuntimeError:
+                # Already shut down by close(), which closed the cursor too.
+                pass
+
+    async def count(
+            self,
+            model_class: Type[BaseModel],
+            where: Optional[str] = None,
+            where_params: Optional[Union[dict, List]] = None) -> int:
+        """Count data by specified parameters without fetching rows.
+
+        See DB.count.
+        """
+        return await self.__run(DB.count, model_class, where, where_params)
+
+    async def exists(
+            self,
+            model_class: Type[BaseModel],
+            where: Optional[str] = None,
+            where_params: Optional[Union[dict, List]] = None) -> bool:
+        """Check whether any data matches specified parameters.
+
+        See DB.exists.
+        """
+        return await self.__run(DB.exists, model_class, where, where_params)
+
+    async def aggregate(
+            self,
+            model_class: Type[BaseModel],
+            aggregates: Dict[str, str],
+            where: Optional[str] = None,
+            where_params: Optional[Union[dict, List]] = None,
+            group_by: Optional[List[str]] = None
+    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Aggregate data by specified parameters in SQL.
+
+        See DB.aggregate.
+        """
+        return await self.__run(
+            DB.aggregate, model_class, aggregates, where, where_params,
+            group_by)
+
+    ###################
+    # Insert
+    ###################
+    async def insert(self, model: BaseModel, insert_or_ignore: bool = True) -> int:
+        """Insert a data by model.
+
+        See DB.insert.
+        """
+        return await self.__run(DB.insert, model, insert_or_ignore)
+
+    async def bulk_insert(
+            self,
+            models: Iterable,
+            insert_or_ignore: bool = True,
+            strategy: BulkInsertStrategy = BulkInsertStrategy.EXECUTEMANY) -> int:
+        """Bulk insert data by model list.
+
+        See DB.bulk_insert.
+        """
+        return await self.__run(
+            DB.bulk_insert, models, insert_or_ignore, strategy)
+
+    ###################
+    # Update
+    ###################
+    async def update(
+            self,
+            model_class: Type[BaseModel],
+            data_to_be_updated: dict,
+            where: Optional[str] = None,
+            where_params: Optional[Union[dict, List]] = None) -> int:
+        """Update a data.
+
+        See DB.update.
+        """
+        return await self.__run(
+            DB.update, model_class, data_to_be_updated, where, where_params)
+
+    async def update_by_model(self, model: BaseModel) -> int:
+        """Update a data by model.
+
+        See DB.update_by_model.
+        """
+        return await self.__run(DB.update_by_model, model)
+
+    ###################
+    # Delete
+    ###################
+    async def delete(
+            self,
+            model_class: Type[BaseModel],
+            where: Optional[str] = None,
+            where_params: Optional[Union[dict, List]] = None) -> int:
+        """Delete a data.
+
+        See DB.delete.
+        """
+        return await self.__run(DB.delete, model_class, where, where_params)
+
+    async def delete_by_model(self, model: BaseModel) -> int:
+        """Delete a data by model.
+
+        See DB.delete_by_model.
+        """
+        return await self.__run(DB.delete_by_model, model)
+
+    ###################
+    # Execute
+    ###################
+    async def execute(
+            self,
+            sql: str,
+            params: Optional[Union[dict, List]] = None) -> List:
+        """Execute SQL and fetch all result rows.
+
+        Cursors cannot leave the dedicated thread, so rows are fetched there.
+
+        Parameters
+        ----------
+        sql : str
+            SQL
+        params : Optional[Union[dict, List]], optional
+            parameters, by default None
+
+        Returns
+        -------
+        List
+            Result rows
+            An empty list for statements that do not return rows
+        """
+        return await self.__run(AsyncDB.__execute_and_fetchall, sql, params)
+
+    ###################
+    # Transaction
+    ###################
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def transaction_scope(
+            cls,
+            db_filepath: str,
+            isolation_level: IsolationLevel = IsolationLevel.DEFERRED,
+            pragma_profile: Optional[PragmaProfile] = None):
+        """Create a transaction scope.
+
+        Uncommitted changes are rolled back at the end of the scope.
+
+        Parameters
+        ----------
+        db_filepath : str
+            Database file path
+        isolation_level : IsolationLevel, optional
+            Isolation level, by default IsolationLevel.DEFERRED
+        pragma_profile : Optional[PragmaProfile], optional
+            PRAGMA settings applied to the connection, by default None
+
+        Yields
+        ------
+        AsyncDB
+            AsyncDB instance
+        """
+        tran = await cls.open(db_filepath, isolation_level, pragma_profile)
+        try:
+            yield tran
+        finally:
+            try:
+                await tran.rollback()
+            finally:
+                await tran.close()
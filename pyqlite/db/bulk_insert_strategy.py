@@ -0,0 +1,17 @@
+from enum import Enum
+
+
+class BulkInsertStrategy(Enum):
+    """Bulk insert strategy
+
+    Parameters
+    ----------
+    Enum : str
+        Bulk insert strategy
+        EXECUTEMANY: Bind and execute a single-row insert statement per model
+        MULTI_ROW_VALUES: Execute INSERT ... VALUES (...), (...), ... statements
+        chunked under the SQLite variable number limit
+    """
+
+    EXECUTEMANY = 'EXECUTEMANY'
+    MULTI_ROW_VALUES = 'MULTI_ROW_VALUES'
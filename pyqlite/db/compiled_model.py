@@ -0,0 +1,294 @@
+from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import Dict, Final, Optional, Tuple, Type
+
+
+@dataclass(frozen=True)
+class CompiledModel:
+    """Represents metadata and SQL texts compiled for a model class.
+
+    Attributes
+    ----------
+    table_name: Final[str]
+        Table name
+    member_names: Final[Tuple[str, ...]]
+        Model member names in declared order
+    pks: Final[Tuple[str, ...]]
+        Primary key names
+    select_by_pk_sql: Final[Optional[str]]
+        Select statement by primary keys with qmark parameters
+        None if the model does not have any primary keys
+    insert_sql: Final[str]
+        Insert statement with qmark parameters
+    insert_or_ignore_sql: Final[str]
+        Insert or ignore statement with qmark parameters
+    bulk_insert_sql: Final[str]
+        Insert statement with named parameters
+    bulk_insert_or_ignore_sql: Final[str]
+        Insert or ignore statement with named parameters
+    delete_by_model_sql: Final[str]
+        Delete statement by primary keys with named parameters
+        All members are used as keys if the model does not have any primary keys
+    ----------
+    """
+
+    table_name: Final[str]
+    member_names: Final[Tuple[str, ...]]
+    pks: Final[Tuple[str, ...]]
+    select_by_pk_sql: Final[Optional[str]]
+    insert_sql: Final[str]
+    insert_or_ignore_sql: Final[str]
+    bulk_insert_sql: Final[str]
+    bulk_insert_or_ignore_sql: Final[str]
+    delete_by_model_sql: Final[str]
+    __update_sqls: Dict[Tuple[str, ...], str] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    __multi_row_insert_sqls: Dict[Tuple[int, bool], str] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    __select_by_pks_sqls: Dict[int, str] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    __delete_by_pks_sqls: Dict[int, str] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    __upsert_sqls: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], str] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    __ordered_columns: Dict[Tuple[str, ...], Tuple[str, ...]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    __partial_types: Dict[Tuple[str, ...], Type[tuple]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+
+    def get_ordered_columns(
+            self, column_names: Tuple[str, ...]) -> Tuple[str, ...]:
+        """Get column names in declared member order.
+
+        Building SQL from the ordered names gives one SQL text per column set,
+        so that the prepared statement is reused whatever order
+        the columns are specified in.
+        Names that are not members are kept after the members in given order,
+        and are not cached, so that invalid names do not fill the cache.
+
+        Parameters
+        ----------
+        column_names : Tuple[str, ...]
+            Column names
+
+        Returns
+        -------
+        Tuple[str, ...]
+            Ordered column names
+        """
+        ordered = self.__ordered_columns.get(column_names)
+        if ordered is None:
+            members = [c for c in self.member_names if c in column_names]
+            others = [c for c in column_names if c not in self.member_names]
+            ordered = tuple(members + others)
+            if len(others) == 0:
+                self.__ordered_columns[column_names] = ordered
+        return ordered
+
+    def get_select_by_pks_sql(self, rows_count: int) -> str:
+        """Get select statement by multiple primary key values with qmark parameters.
+
+        The primary key values are joined as a VALUES table, and each row ends
+        with the 0-based position of its primary key values in the parameters,
+        so that rows are matched to the values whatever type conversion
+        the column affinity applies to them.
+        The statement is built once per rows count and reused afterwards.
+
+        Parameters
+        ----------
+        rows_count : int
+            The number of primary key values in the VALUES table
+
+        Returns
+        -------
+        str
+            Select statement str
+        """
+        sql = self.__select_by_pks_sqls.get(rows_count)
+        if sql is None:
+            placeholders = ', '.join('?' * len(self.pks))
+            values_str = ', '.join(
+                f"({i}, {placeholders})" for i in range(rows_count))
+            on_str = ' AND '.join(
+                f"t.{pk} = k.column{i + 2}" for i, pk in enumerate(self.pks))
+            sql = f"SELECT t.*, k.column1 FROM (VALUES {values_str}) AS k JOIN {self.table_name} AS t ON {on_str}"
+            self.__select_by_pks_sqls[rows_count] = sql
+        return sql
+
+    def get_delete_by_pks_sql(self, rows_count: int) -> str:
+        """Get delete statement by multiple primary key values with qmark parameters.
+
+        The statement is built once per rows count and reused afterwards.
+
+        Parameters
+        ----------
+        rows_count : int
+            The number of primary key values in the IN list
+
+        Returns
+        -------
+        str
+            Delete statement str
+        """
+        sql = self.__delete_by_pks_sqls.get(rows_count)
+        if sql is None:
+            sql = f"DELETE FROM {self.table_name} WHERE {self.__build_pks_in(rows_count)}"
+            self.__delete_by_pks_sqls[rows_count] = sql
+        return sql
+
+    def __build_pks_in(self, rows_count: int) -> str:
+        if len(self.pks) == 1:
+            return f"{self.pks[0]} IN ({', '.join('?' * rows_count)})"
+        row_str = f"({', '.join('?' * len(self.pks))})"
+        in_str = ', '.join([row_str] * rows_count)
+        return f"({', '.join(self.pks)}) IN (VALUES {in_str})"
+
+    def get_insert_sql(self, insert_or_ignore: bool = True) -> str:
+        """Get insert statement with qmark parameters.
+
+        Parameters
+        ----------
+        insert_or_ignore : bool, optional
+            INSERT OR IGNORE flag, by default True
+
+        Returns
+        -------
+        str
+            Insert statement str
+        """
+        return self.insert_or_ignore_sql if insert_or_ignore else self.insert_sql
+
+    def get_bulk_insert_sql(self, insert_or_ignore: bool = True) -> str:
+        """Get insert statement with named parameters.
+
+        Parameters
+        ----------
+        insert_or_ignore : bool, optional
+            INSERT OR IGNORE flag, by default True
+
+        Returns
+        -------
+        str
+            Insert statement str
+        """
+        return self.bulk_insert_or_ignore_sql if insert_or_ignore else self.bulk_insert_sql
+
+    def get_multi_row_insert_sql(
+            self,
+            rows_count: int,
+            insert_or_ignore: bool = True) -> str:
+        """Get insert statement inserting multiple rows with qmark parameters.
+
+        The statement is built once per rows count and reused afterwards.
+
+        Parameters
+        ----------
+        rows_count : int
+            The number of rows inserted by the statement
+        insert_or_ignore : bool, optional
+            INSERT OR IGNORE flag, by default True
+
+        Returns
+        -------
+        str
+            Insert statement str
+        """
+        key = (rows_count, insert_or_ignore)
+        sql = self.__multi_row_insert_sqls.get(key)
+        if sql is None:
+            row_str = f"({', '.join('?' * len(self.member_names))})"
+            or_ignore_str = " OR IGNORE" if insert_or_ignore else ''
+            sql = f"INSERT{or_ignore_str} INTO {self.table_name} VALUES " + \
+                ', '.join([row_str] * rows_count)
+            self.__multi_row_insert_sqls[key] = sql
+        return sql
+
+    def get_partial_type(self, column_names: Tuple[str, ...]) -> Type[tuple]:
+        """Get a named tuple type for rows of the specified columns.
+
+        The type is created once per column set and reused afterwards.
+        Its fields are the columns in declared member order.
+
+        Parameters
+        ----------
+        column_names : Tuple[str, ...]
+            Selected column names
+
+        Returns
+        -------
+        Type[tuple]
+            Named tuple type
+        """
+        partial_type = self.__partial_types.get(column_names)
+        if partial_type is None:
+            ordered = self.get_ordered_columns(column_names)
+            partial_type = self.__partial_types.get(ordered)
+            if partial_type is None:
+                type_name = ''.join(
+                    w.capitalize() for w in self.table_name.split('_'))
+                partial_type = namedtuple(f"{type_name}Partial", ordered)
+                self.__partial_types[ordered] = partial_type
+            self.__partial_types[column_names] = partial_type
+        return partial_type
+
+    def get_update_sql(self, column_names: Tuple[str, ...]) -> str:
+        """Get update statement by primary keys for the specified columns.
+
+        The statement is built once per column set and reused afterwards,
+        the columns are set in declared member order.
+
+        Parameters
+        ----------
+        column_names : Tuple[str, ...]
+            Column names to be updated
+
+        Returns
+        -------
+        str
+            Update statement str with named parameters
+        """
+        sql = self.__update_sqls.get(column_names)
+        if sql is None:
+            ordered = self.get_ordered_columns(column_names)
+            sql = self.__update_sqls.get(ordered)
+            if sql is None:
+                set_str = ', '.join(f"{c} = :{c}" for c in ordered)
+                where_str = ' AND '.join(f"{pk} = :{pk}" for pk in self.pks)
+                sql = f"UPDATE {self.table_name} SET {set_str} WHERE {where_str}"
+                self.__update_sqls[ordered] = sql
+            self.__update_sqls[column_names] = sql
+        return sql
+
+    def get_upsert_sql(
+            self,
+            conflict_columns: Tuple[str, ...],
+            update_columns: Tuple[str, ...]) -> str:
+        """Get insert statement with an upsert clause with qmark parameters.
+
+        The statement is built once per column sets and reused afterwards.
+
+        Parameters
+        ----------
+        conflict_columns : Tuple[str, ...]
+            Conflict target column names
+        update_columns : Tuple[str, ...]
+            Column names to be updated on conflict
+            When empty, the conflicting row is kept as it is
+
+        Returns
+        -------
+        str
+            Insert statement str
+        """
+        key = (conflict_columns, update_columns)
+        sql = self.__upsert_sqls.get(key)
+        if sql is None:
+            sql = f"{self.insert_sql} ON CONFLICT ({', '.join(conflict_columns)}) DO "
+            if 0 < len(update_columns):
+                sql += 'UPDATE SET ' + ', '.join(
+                    f"{c} = excluded.{c}"
+                    for c in self.get_ordered_columns(update_columns))
+            else:
+                sql += 'NOTHING'
+            self.__upsert_sqls[key] = sql
+        return sql
@@ -0,0 +1,262 @@
+import contextlib
+from pathlib import Path
+import sqlite3
+from sqlite3 import Connection
+import threading
+import time
+from typing import Dict, Final, Iterator, List, Optional, Set
+
+from pyqlite.db.isolation_level import IsolationLevel
+from pyqlite.db.pragma_profile import PragmaProfile
+
+
+class ConnectionPool:
+    """Pool of warm SQLite connections to a database file.
+
+    Connections are checked out by one thread at a time,
+    and a thread is given back the connection it used last when it is idle,
+    so that its page cache and prepared statement cache stay warm.
+    """
+
+    def __init__(
+            self,
+            db_filepath: str,
+            isolation_level: IsolationLevel = IsolationLevel.DEFERRED,
+            max_size: int = 5,
+            cached_statements: int = 128,
+            health_check: bool = True,
+            pragma_profile: Optional[PragmaProfile] = None,
+            read_only: bool = False) -> None:
+        """Constructor
+
+        Parameters
+        ----------
+        db_filepath : str
+            Database file path
+        isolation_level : IsolationLevel, optional
+            Isolation level, by default IsolationLevel.DEFERRED
+        max_size : int, optional
+            Max number of connections, by default 5
+        cached_statements : int, optional
+            Prepared statement cache size per connection, by default 128
+        health_check : bool, optional
+            Check a connection by running a query when it is checked out
+            , by default True
+        pragma_profile : Optional[PragmaProfile], optional
+            PRAGMA settings applied to each new connection, by default None
+        read_only : bool, optional
+            Open connections with the mode=ro URI, so that writes fail
+            , by default False
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if max_size is less than 1
+        """
+        if max_size < 1:
+            raise ValueError('max_size must be 1 or more')
+        self.db_filepath: Final[str] = db_filepath
+        self.isolation_level: Final[IsolationLevel] = isolation_level
+        self.max_size: Final[int] = max_size
+        self.cached_statements: Final[int] = cached_statements
+        self.health_check: Final[bool] = health_check
+        self.pragma_profile: Final[Optional[PragmaProfile]] = pragma_profile
+        self.read_only: Final[bool] = read_only
+        self.__condition = threading.Condition()
+        self.__idle: List[Connection] = []
+        self.__checked_out: Set[Connection] = set()
+        self.__last_thread_ids: Dict[int, int] = dict()
+        self.__size = 0
+        self.__closed = False
+
+    @property
+    def size(self) -> int:
+        """The number of open connections
+        """
+        return self.__size
+
+    @property
+    def idle_count(self) -> int:
+        """The number of connections that are not checked out
+        """
+        return len(self.__idle)
+
+    def acquire(self, timeout: Optional[float] = None) -> Connection:
+        """Check out a connection.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Seconds to wait for a connection to be returned when the pool is full
+            When not specified, wait forever
+            , by default None
+
+        Returns
+        -------
+        Connection
+            Checked out connection
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the pool is closed
+        TimeoutError
+            Raises TimeoutError if no connection is returned in time
+        """
+        thread_id = threading.get_ident()
+        # The timeout covers the whole wait, however many times it wakes up.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.__condition:
+            while True:
+                if self.__closed:
+                    raise ValueError('The connection pool is closed')
+                if 0 < len(self.__idle):
+                    con = self.__pop_idle(thread_id)
+                    break
+                if self.__size < self.max_size:
+                    self.__size += 1
+                    con = None
+                    break
+                remaining = None if deadline is None \
+                    else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(
+                        'Timed out waiting for a connection to be returned')
+                self.__condition.wait(remaining)
+
+        if con is not None:
+            if self.__is_healthy(con):
+                self.__check_out(con, thread_id)
+                return con
+            # Replace the broken connection, keeping its slot.
+            self.__last_thread_ids.pop(id(con), None)
+            with contextlib.suppress(sqlite3.Error):
+                con.close()
+
+        try:
+            con = self.__connect()
+        except BaseException:
+            with self.__condition:
+                self.__size -= 1
+                self.__condition.notify()
+            raise
+        self.__check_out(con, thread_id)
+        return con
+
+    def release(self, con: Connection) -> None:
+        """Return a checked out connection.
+
+        An open transaction of the connection is rolled back.
+
+        Parameters
+        ----------
+        con : Connection
+            Connection to be returned
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the connection is not checked out from this pool,
+            including one that is already returned
+        """
+        with self.__condition:
+            if con not in self.__checked_out:
+                raise ValueError(
+                    'The connection is not checked out from this pool')
+            self.__checked_out.remove(con)
+
+        try:
+            con.rollback()
+            con.isolation_level = self.isolation_level.value
+        except sqlite3.Error:
+            self.__discard(con)
+            return
+
+        with self.__condition:
+            if self.__closed:
+                self.__size -= 1
+                con.close()
+            else:
+                self.__idle.append(con)
+            self.__condition.notify()
+
+    @contextlib.contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Connection]:
+        """Create a scope that checks out a connection and returns it at the end.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Seconds to wait for a connection to be returned when the pool is full
+            , by default None
+
+        Yields
+        ------
+        Connection
+            Checked out connection
+        """
+        con = self.acquire(timeout)
+        try:
+            yield con
+        finally:
+            self.release(con)
+
+    def close(self) -> None:
+        """Close idle connections and the pool.
+
+        Checked out connections are closed when they are returned.
+        """
+        with self.__condition:
+            self.__closed = True
+            for con in self.__idle:
+                self.__last_thread_ids.pop(id(con), None)
+                con.close()
+                self.__size -= 1
+            self.__idle.clear()
+            self.__condition.notify_all()
+
+    def __check_out(self, con: Connection, thread_id: int) -> None:
+        self.__last_thread_ids[id(con)] = thread_id
+        with self.__condition:
+            self.__checked_out.add(con)
+
+    def __pop_idle(self, thread_id: int) -> Connection:
+        # Prefer the connection that this thread used last.
+        for i in range(len(self.__idle) - 1, -1, -1):
+            if self.__last_thread_ids.get(id(self.__idle[i])) == thread_id:
+                return self.__idle.pop(i)
+        return self.__idle.pop()
+
+    def __is_healthy(self, con: Connection) -> bool:
+        if not self.health_check:
+            return True
+        try:
+            con.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def __discard(self, con: Connection) -> None:
+        self.__last_thread_ids.pop(id(con), None)
+        with contextlib.suppress(sqlite3.Error):
+            con.close()
+        with self.__condition:
+            self.__size -= 1
+            self.__condition.notify()
+
+    def __connect(self) -> Connection:
+        # Connections move between threads, and the pool guarantees that
+        # only one thread uses a connection at a time.
+        if self.read_only:
+            database = Path(self.db_filepath).absolute().as_uri() + '?mode=ro'
+        else:
+            database = self.db_filepath
+        con = sqlite3.connect(
+            database,
+            isolation_level=self.isolation_level.value,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            uri=self.read_only)
+        if self.pragma_profile is not None:
+            self.pragma_profile.apply(con)
+        return con
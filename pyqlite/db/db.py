@@ -1,25 +1,56 @@
+import array
+import base64
 import contextlib
-from logging import getLogger
+import itertools
+import json
+import os
+from logging import INFO, Logger, getLogger
 import sqlite3
-from sqlite3 import Connection
-from typing import Final, List, Optional, Type, Union
+import threading
+import time
+import typing
+from sqlite3 import Connection, Cursor
+from typing import Any, Callable, Dict, Final, Iterable, Iterator, List, Optional, Tuple, Type, Union
 
 import pyqlite.log
+from pyqlite.db.bulk_insert_strategy import BulkInsertStrategy
+from pyqlite.db.compiled_model import CompiledModel
+from pyqlite.db.connection_pool import ConnectionPool
+from pyqlite.db.instrumentation import ExecuteEvent, Instrumentation
 from pyqlite.db.isolation_level import IsolationLevel
+from pyqlite.db.pragma_profile import PragmaProfile
 from pyqlite.db.querybuilder import QueryBuilder
+from pyqlite.db.retry_policy import RetryPolicy
+from pyqlite.db.sql_log import ParamsSampler, SqlLogParams
+from pyqlite.db.statement_cache_stats import StatementCacheStats
 from pyqlite.model import BaseModel
 
 
+_NO_CALLBACKS: Final[Tuple[Callable, ...]] = ()
+
+
 class DB:
     """SQLite client wrapper
+
+    Found models are built by BaseModel.get_row_hydrator,
+    which does not call __init__ and __post_init__ of model classes.
     """
 
     log_level: Optional[int] = None
+    log_max_params: int = 10
+    log_max_param_length: int = 1000
+    instrumentation: Optional[Instrumentation] = None
 
     def __init__(
             self,
             db_filepath: str,
-            isolation_level: IsolationLevel = IsolationLevel.DEFERRED) -> None:
+            isolation_level: IsolationLevel = IsolationLevel.DEFERRED,
+            connection: Optional[Connection] = None,
+            pragma_profile: Optional[PragmaProfile] = None,
+            reader_pool: Optional[ConnectionPool] = None,
+            read_your_writes: bool = False,
+            retry_policy: Optional[RetryPolicy] = None,
+            cached_statements: int = 128) -> None:
         """Constructor
 
         Parameters
@@ -28,25 +59,209 @@ class DB:
             Database file path
         isolation_level : IsolationLevel, optional
             Isolation level, by default IsolationLevel.DEFERRED
+        connection : Optional[Connection], optional
+            Existing connection to use, such as one checked out from ConnectionPool
+            The connection is not closed by close method
+            When not specified, a new connection is opened
+            , by default None
+        pragma_profile : Optional[PragmaProfile], optional
+            PRAGMA settings applied to a new connection, by default None
+        reader_pool : Optional[ConnectionPool], optional
+            Pool of read-only connections that find, where and the other reads run on
+            Writes run on the connection of this instance, the writer
+            When specified, a new writer connection can be used from any thread
+            and writes are serialized by a lock, a transaction scope holds it
+            until the end, so use transaction to make writes of a thread atomic
+            , by default None
+        read_your_writes : bool, optional
+            Run reads of the thread that opened the transaction of the writer
+            on the writer until it ends, so that they see its uncommitted changes
+            Reads of other threads still run on the reader pool
+            Only used when reader_pool is specified
+            , by default False
+        retry_policy : Optional[RetryPolicy], optional
+            Policy to retry a statement failing with a busy or locked database
+            Only a statement that starts a transaction or runs outside of one
+            is retried, use run_in_transaction to retry a whole transaction
+            , by default None
+        cached_statements : int, optional
+            Prepared statement cache size of a new connection
+            Also the size enable_statement_cache_stats assumes for a passed connection
+            , by default 128
         """
         self.db_filepath: Final[str] = db_filepath
-        self.con: Final[Connection] = sqlite3.connect(
-            db_filepath, isolation_level=isolation_level.value)
+        self.__owns_connection: Final[bool] = connection is None
+        self.reader_pool: Final[Optional[ConnectionPool]] = reader_pool
+        self.read_your_writes: Final[bool] = read_your_writes
+        self.retry_policy: Final[Optional[RetryPolicy]] = retry_policy
+        self.__owns_reader_pool = False
+        if connection is None:
+            # Readers on other threads may share this instance with the writer.
+            connection = sqlite3.connect(
+                db_filepath,
+                isolation_level=isolation_level.value,
+                check_same_thread=reader_pool is None,
+                cached_statements=cached_statements)
+            if pragma_profile is not None:
+                pragma_profile.apply(connection)
+        else:
+            connection.isolation_level = isolation_level.value
+        self.con: Final[Connection] = connection
+        self.__cached_statements: Final[int] = cached_statements
+        self.statement_cache_stats: Optional[StatementCacheStats] = None
+        self.__max_variable_number: Optional[int] = None
+        self.__savepoint_depth = 0
+        # Only a writer shared with reader threads is locked,
+        # others are used by one thread.
+        self.__writer_lock: Final[Optional[threading.RLock]] = \
+            None if reader_pool is None else threading.RLock()
+        # Thread that opened the transaction of the shared writer
+        self.__transaction_thread_id: Optional[int] = None
+        self.__logger: Final[Logger] = getLogger(self.__class__.__name__)
 
     def commit(self):
         """Commit
         """
-        self.con.commit()
+        lock = self.__writer_lock
+        if lock is None:
+            self.con.commit()
+            return
+        with lock:
+            self.con.commit()
+            self.__transaction_thread_id = None
 
     def rollback(self):
         """Rollback
         """
-        self.con.rollback()
+        lock = self.__writer_lock
+        if lock is None:
+            self.con.rollback()
+            return
+        with lock:
+            self.con.rollback()
+            self.__transaction_thread_id = None
 
     def close(self):
         """Close database
+
+        A connection passed to the constructor is not closed.
+        A reader pool is closed only when it is created by with_readers.
+        """
+        if self.__owns_connection:
+            self.con.close()
+        if self.__owns_reader_pool and self.reader_pool is not None:
+            self.reader_pool.close()
+
+    @classmethod
+    def pool(
+            cls,
+            db_filepath: str,
+            size: int = 5,
+            isolation_level: IsolationLevel = IsolationLevel.DEFERRED,
+            cached_statements: int = 128,
+            pragma_profile: Optional[PragmaProfile] = None) -> ConnectionPool:
+        """Create a connection pool.
+
+        Parameters
+        ----------
+        db_filepath : str
+            Database file path
+        size : int, optional
+            Max number of connections, by default 5
+        isolation_level : IsolationLevel, optional
+            Isolation level, by default IsolationLevel.DEFERRED
+        cached_statements : int, optional
+            Prepared statement cache size per connection, by default 128
+        pragma_profile : Optional[PragmaProfile], optional
+            PRAGMA settings applied to each new connection, by default None
+
+        Returns
+        -------
+        ConnectionPool
+            Connection pool to pass to transaction_scope
+        """
+        return ConnectionPool(
+            db_filepath,
+            isolation_level,
+            size,
+            cached_statements,
+            pragma_profile=pragma_profile)
+
+    @classmethod
+    def with_readers(
+            cls,
+            db_filepath: str,
+            readers: Optional[int] = None,
+            isolation_level: IsolationLevel = IsolationLevel.DEFERRED,
+            read_your_writes: bool = False,
+            cached_statements: int = 128,
+            pragma_profile: Optional[PragmaProfile] = None,
+            health_check: bool = False) -> 'DB':
+        """Create a DB that runs reads on a pool of read-only connections.
+
+        find, where and the other reads check out a read-only connection per call,
+        so threads sharing the instance read concurrently,
+        while writes go through the single writer connection.
+        Use it with a WAL database, on which readers do not block the writer.
+
+        Parameters
+        ----------
+        db_filepath : str
+            Database file path
+        readers : Optional[int], optional
+            Max number of read-only connections
+            When not specified, the number of CPUs
+            , by default None
+        isolation_level : IsolationLevel, optional
+            Isolation level of the writer, by default IsolationLevel.DEFERRED
+        read_your_writes : bool, optional
+            Run reads of the thread that opened the transaction of the writer
+            on the writer until it ends
+            , by default False
+        cached_statements : int, optional
+            Prepared statement cache size per connection, by default 128
+        pragma_profile : Optional[PragmaProfile], optional
+            PRAGMA settings applied to the writer and each reader
+            , by default None
+        health_check : bool, optional
+            Check a reader by running SELECT 1 whenever it is checked out,
+            which adds a statement to every read
+            , by default False
+
+        Returns
+        -------
+        DB
+            DB instance
+            The reader pool is closed by close method
         """
-        self.con.close()
+        reader_pool = ConnectionPool(
+            db_filepath,
+            max_size=readers or os.cpu_count() or 1,
+            cached_statements=cached_statements,
+            health_check=health_check,
+            pragma_profile=pragma_profile,
+            read_only=True)
+        db = cls(
+            db_filepath,
+            isolation_level,
+            pragma_profile=pragma_profile,
+            reader_pool=reader_pool,
+            read_your_writes=read_your_writes,
+            cached_statements=cached_statements)
+        db.__owns_reader_pool = True
+        return db
+
+    @contextlib.contextmanager
+    def __reader(self) -> Iterator[Connection]:
+        # Other threads must not see uncommitted changes of the writer.
+        if self.reader_pool is None or (
+                self.read_your_writes
+                and self.__transaction_thread_id == threading.get_ident()
+                and self.con.in_transaction):
+            yield self.con
+        else:
+            with self.reader_pool.connection() as con:
+                yield con
 
     ###################
     # Validation
@@ -84,22 +299,27 @@ class DB:
         ValueError
             Raises ValueError if the number of primary key values parameters and the number of primary keys model has
         """
-        pks = model_class.get_pks()
-        if len(pks) == 0:
+        compiled = QueryBuilder.compile(model_class)
+        if compiled.select_by_pk_sql is None:
             raise ValueError(
                 'Cannot use find method because this class does not have any primary keys')
-        if len(primary_key_values) != len(model_class.get_pks()):
+        if len(primary_key_values) != len(compiled.pks):
             raise ValueError(
                 'The number of primary keys and primary key values do not match')
-        sql = QueryBuilder.build_select_with_qmark_parameters(model_class, pks)
-        r = self.execute(sql, list(primary_key_values)).fetchone()
-        return None if r is None else model_class.get_class_type()(*r)
+        with self.__reader() as con:
+            r = self.__execute(
+                con,
+                compiled.select_by_pk_sql,
+                list(primary_key_values),
+                Cursor.fetchone)
+        return None if r is None else model_class.get_row_hydrator()(r)
 
     def find_by(self,
                 model_class: Type[BaseModel],
                 where: Optional[str] = None,
                 where_params: Optional[Union[dict,
-                                       List]] = None):
+                                       List]] = None,
+                columns: Optional[List[str]] = None):
         """Find a data by specified parameters.
 
         Parameters
@@ -110,6 +330,11 @@ class DB:
             Where clause str, by default None
         where_params : Optional[Union[dict, List]], optional
             Parameters for where clause, by default None
+        columns : Optional[List[str]], optional
+            Column names to be selected
+            When specified, return a named tuple of the columns
+            instead of a model, which cannot be updated by update_by_model
+            , by default None
 
         Returns
         -------
@@ -121,21 +346,23 @@ class DB:
         ------
         ValueError
             Raises ValueError if only where or where_params is specified
+        ValueError
+            Raises ValueError if columns is empty or contains unknown names
         """
         self.__validate_where_and_condition(where, where_params)
-        if where is not None and where_params is not None:
-            sql = QueryBuilder.build_select(model_class, where)
-            r = self.execute(sql, where_params).fetchone()
-        else:
-            sql = QueryBuilder.build_select(model_class)
-            r = self.execute(sql).fetchone()
-        return None if r is None else model_class.get_class_type()(*r)
+        with self.__reader() as con:
+            r = self.__select(
+                model_class, where, where_params, con, Cursor.fetchone,
+                columns)
+        return None if r is None else self.__get_row_builder(
+            model_class, columns)(r)
 
     def where(self,
               model_class: Type[BaseModel],
               where: Optional[str] = None,
               where_params: Optional[Union[dict,
-                                     List]] = None):
+                                     List]] = None,
+              columns: Optional[List[str]] = None):
         """Find data by specified parameters.
 
         Parameters
@@ -146,6 +373,11 @@ class DB:
             Where clause str, by default None
         where_params : Optional[Union[dict, List]], optional
             Parameters for where clause, by default None
+        columns : Optional[List[str]], optional
+            Column names to be selected
+            When specified, return named tuples of the columns
+            instead of models, which cannot be updated by update_by_model
+            , by default None
 
         Returns
         -------
@@ -157,20 +389,569 @@ class DB:
         ------
         ValueError
             Raises ValueError if only where or where_params is specified
+        ValueError
+            Raises ValueError if columns is empty or contains unknown names
         """
         self.__validate_where_and_condition(where, where_params)
 
-        # TODO: fetchall or fetchmany
+        with self.__reader() as con:
+            r = self.__select(
+                model_class, where, where_params, con, Cursor.fetchall,
+                columns)
+        return list(map(self.__get_row_builder(model_class, columns), r))
+
+    def iter_where(self,
+                   model_class: Type[BaseModel],
+                   where: Optional[str] = None,
+                   where_params: Optional[Union[dict,
+                                          List]] = None,
+                   batch_size: int = 1000,
+                   yield_batches: bool = False) -> Iterator:
+        """Find data by specified parameters lazily.
+
+        Rows are fetched by cursor.fetchmany(batch_size), so at most one batch
+        of rows is held in memory at a time.
+        The cursor is closed when the iteration finishes, or when the
+        iterator is closed or garbage collected before reaching the end.
+        Wrap the iterator with contextlib.closing to close the cursor
+        deterministically when stopping early.
+        With a reader pool, a read-only connection is checked out
+        until the cursor is closed.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        where : Optional[str], optional
+            Where clause str, by default None
+        where_params : Optional[Union[dict, List]], optional
+            Parameters for where clause, by default None
+        batch_size : int, optional
+            The number of rows fetched at a time, by default 1000
+        yield_batches : bool, optional
+            True: yield a list of models per batch
+            False: yield a model at a time
+            , by default False
+
+        Yields
+        ------
+        Model Type or List[Model Type]
+            Found data
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if only where or where_params is specified
+        ValueError
+            Raises ValueError if batch_size is less than 1
+        """
+        self.__validate_where_and_condition(where, where_params)
+        if batch_size < 1:
+            raise ValueError('batch_size must be 1 or more')
+        return self.__iter_where(
+            model_class, where, where_params, batch_size, yield_batches)
+
+    def __iter_where(self,
+                     model_class: Type[BaseModel],
+                     where: Optional[str],
+                     where_params: Optional[Union[dict, List]],
+                     batch_size: int,
+                     yield_batches: bool) -> Iterator:
+        hydrate = model_class.get_row_hydrator()
+        # The connection is kept checked out until the iterator is closed.
+        with self.__reader() as con:
+            cur = self.__select(model_class, where, where_params, con)
+            try:
+                while True:
+                    rows = self.__fetchmany(con, cur, batch_size)
+                    if len(rows) == 0:
+                        break
+                    if yield_batches:
+                        yield list(map(hydrate, rows))
+                    else:
+                        for r in rows:
+                            yield hydrate(r)
+            finally:
+                cur.close()
+
+    def __fetchmany(self, con: Connection, cur: Cursor, batch_size: int) -> list:
+        # Rows of the shared writer are fetched under the writer lock,
+        # since other threads may write between batches.
+        lock = self.__writer_lock if con is self.con else None
+        if lock is None:
+            return cur.fetchmany(batch_size)
+        with lock:
+            return cur.fetchmany(batch_size)
+
+    def __select(self,
+                 model_class: Type[BaseModel],
+                 where: Optional[str],
+                 where_params: Optional[Union[dict, List]],
+                 con: Optional[Connection] = None,
+                 fetch: Optional[Callable[[Cursor], Any]] = None,
+                 columns: Optional[List[str]] = None) -> Any:
+        con = self.con if con is None else con
         if where is not None and where_params is not None:
-            sql = QueryBuilder.build_select(model_class, where)
-            r = self.execute(sql, where_params).fetchall()
+            sql = QueryBuilder.build_select(model_class, where, columns)
+            return self.__execute(con, sql, where_params, fetch)
+        else:
+            sql = QueryBuilder.build_select(model_class, columns=columns)
+            return self.__execute(con, sql, None, fetch)
+
+    @staticmethod
+    def __get_row_builder(
+            model_class: Type[BaseModel],
+            columns: Optional[List[str]]) -> Callable:
+        if columns is None:
+            return model_class.get_row_hydrator()
+        return QueryBuilder.compile(model_class).get_partial_type(
+            tuple(columns))._make
+
+    def fetch_columns(
+            self,
+            model_class: Type[BaseModel],
+            where: Optional[str] = None,
+            where_params: Optional[Union[dict, List]] = None,
+            columns: Optional[List[str]] = None,
+            as_numpy: bool = False,
+            batch_size: int = 1000) -> Dict[str, Any]:
+        """Find data by specified parameters into a buffer per column.
+
+        Rows are fetched by cursor.fetchmany(batch_size) and appended to
+        the buffers batch by batch, no model is created.
+        A member annotated as int or float, and not Optional, is stored in
+        array.array('q') or array.array('d'), other members are stored in list.
+        A typed column that turns out to contain NULL is stored in list instead.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        where : Optional[str], optional
+            Where clause str, by default None
+        where_params : Optional[Union[dict, List]], optional
+            Parameters for where clause, by default None
+        columns : Optional[List[str]], optional
+            Column names to be selected
+            When not specified, all members
+            , by default None
+        as_numpy : bool, optional
+            Return numpy.ndarray per column instead
+            array.array buffers are shared without copying
+            , by default False
+        batch_size : int, optional
+            The number of rows fetched at a time, by default 1000
+
+        Returns
+        -------
+        Dict[str, Any]
+            Buffer per column name in declared member order
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if only where or where_params is specified
+        ValueError
+            Raises ValueError if batch_size is less than 1
+        ValueError
+            Raises ValueError if columns is empty or contains unknown names
+        ImportError
+            Raises ImportError if as_numpy is True and NumPy is not installed
+        """
+        self.__validate_where_and_condition(where, where_params)
+        if batch_size < 1:
+            raise ValueError('batch_size must be 1 or more')
+        numpy = None
+        if as_numpy:
+            try:
+                import numpy
+            except ImportError as e:
+                raise ImportError(
+                    'NumPy must be installed to use as_numpy') from e
+
+        compiled = QueryBuilder.compile(model_class)
+        if columns is None:
+            column_names = compiled.member_names
+        else:
+            column_names = compiled.get_ordered_columns(tuple(columns))
+        type_hints = typing.get_type_hints(model_class)
+        buffers: List[Any] = [
+            self.__create_column_buffer(type_hints.get(c)) for c in column_names]
+
+        with self.__reader() as con:
+            cur = self.__select(
+                model_class, where, where_params, con, columns=columns)
+            try:
+                while True:
+                    rows = self.__fetchmany(con, cur, batch_size)
+                    if len(rows) == 0:
+                        break
+                    for i, values in enumerate(zip(*rows)):
+                        buffers[i] = self.__extend_column_buffer(
+                            buffers[i], values)
+            finally:
+                cur.close()
+
+        if numpy is not None:
+            buffers = [
+                numpy.frombuffer(b, dtype=numpy.dtype(b.typecode))
+                if isinstance(b, array.array) else numpy.array(b, dtype=object)
+                for b in buffers]
+        return dict(zip(column_names, buffers))
+
+    @staticmethod
+    def __create_column_buffer(annotation: Any) -> Any:
+        if typing.get_origin(annotation) is Final:
+            annotation = typing.get_args(annotation)[0]
+        typecode = {int: 'q', float: 'd'}.get(annotation)
+        return list() if typecode is None else array.array(typecode)
+
+    @staticmethod
+    def __extend_column_buffer(buffer: Any, values: tuple) -> Any:
+        if isinstance(buffer, list):
+            buffer.extend(values)
+            return buffer
+        length = len(buffer)
+        try:
+            buffer.extend(values)
+            return buffer
+        except TypeError:
+            # NULL in a typed column, the values appended so far are dropped.
+            values_list = buffer[:length].tolist()
+            values_list.extend(values)
+            return values_list
+
+    def count(self,
+              model_class: Type[BaseModel],
+              where: Optional[str] = None,
+              where_params: Optional[Union[dict, List]] = None) -> int:
+        """Count data by specified parameters without fetching rows.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        where : Optional[str], optional
+            Where clause str, by default None
+        where_params : Optional[Union[dict, List]], optional
+            Parameters for where clause, by default None
+
+        Returns
+        -------
+        int
+            The number of matching rows
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if only where or where_params is specified
+        """
+        self.__validate_where_and_condition(where, where_params)
+        sql = QueryBuilder.build_count(model_class, where)
+        with self.__reader() as con:
+            r = self.__execute(con, sql, where_params, Cursor.fetchone)
+        return r[0]
+
+    def exists(self,
+               model_class: Type[BaseModel],
+               where: Optional[str] = None,
+               where_params: Optional[Union[dict, List]] = None) -> bool:
+        """Check whether any data matches specified parameters.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        where : Optional[str], optional
+            Where clause str, by default None
+        where_params : Optional[Union[dict, List]], optional
+            Parameters for where clause, by default None
+
+        Returns
+        -------
+        bool
+            True if at least one row matches
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if only where or where_params is specified
+        """
+        self.__validate_where_and_condition(where, where_params)
+        sql = QueryBuilder.build_exists(model_class, where)
+        with self.__reader() as con:
+            r = self.__execute(con, sql, where_params, Cursor.fetchone)
+        return r is not None
+
+    def aggregate(self,
+                  model_class: Type[BaseModel],
+                  aggregates: Dict[str, str],
+                  where: Optional[str] = None,
+                  where_params: Optional[Union[dict, List]] = None,
+                  group_by: Optional[List[str]] = None
+                  ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Aggregate data by specified parameters in SQL.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        aggregates : Dict[str, str]
+            Aggregate expressions keyed by alias
+            e.g. {'total': 'sum(amount)', 'latest': 'max(created_at)'}
+        where : Optional[str], optional
+            Where clause str, by default None
+        where_params : Optional[Union[dict, List]], optional
+            Parameters for where clause, by default None
+        group_by : Optional[List[str]], optional
+            Column names to group by, by default None
+
+        Returns
+        -------
+        Union[Dict[str, Any], List[Dict[str, Any]]]
+            Without group_by, a dict of the aggregated values keyed by alias
+            With group_by, a list of dicts of the group columns
+            and the aggregated values, one per group
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if only where or where_params is specified
+        ValueError
+            Raises ValueError if aggregates is empty or has an invalid alias
+        ValueError
+            Raises ValueError if group_by is empty or contains unknown names
+        ValueError
+            Raises ValueError if an alias is also a group_by column,
+            which would overwrite the group value in the result
+        """
+        self.__validate_where_and_condition(where, where_params)
+        sql = QueryBuilder.build_aggregate(
+            model_class, aggregates, where, group_by)
+        with self.__reader() as con:
+            rows = self.__execute(con, sql, where_params, Cursor.fetchall)
+        if group_by is None:
+            return dict(zip(aggregates, rows[0]))
+        keys = QueryBuilder.compile(model_class).get_ordered_columns(
+            tuple(group_by)) + tuple(aggregates)
+        return [dict(zip(keys, r)) for r in rows]
+
+    def find_many(self,
+                  model_class: Type[BaseModel],
+                  pk_values: Iterable,
+                  as_dict: bool = False) -> Union[List, Dict[tuple, Any]]:
+        """Find data by multiple primary key values.
+
+        Primary key values are looked up by chunked VALUES tables,
+        and found rows are matched to the values by their positions,
+        so a value converted by the column affinity, such as '1' for
+        an integer primary key, is found as find does.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        pk_values : Iterable
+            Primary key values
+            A value or a tuple of a value for a single primary key model,
+            a tuple of values for a multiple primary keys model
+        as_dict : bool, optional
+            True: return a dict keyed by primary key values tuple
+            False: return a list in the order of pk_values
+            , by default False
+
+        Returns
+        -------
+        Union[List, Dict[tuple, Any]]
+            Found data
+            None is set for the primary key values that are not found
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the model does not have any primary keys
+        ValueError
+            Raises ValueError if the number of primary keys and primary key values do not match
+        """
+        compiled = QueryBuilder.compile(model_class)
+        pks_count = len(compiled.pks)
+        if pks_count == 0:
+            raise ValueError(
+                'Cannot use find_many method because this class does not have any primary keys')
+
+        keys = self.__to_pk_tuples(pk_values, pks_count)
+        found: Dict[tuple, Any] = dict.fromkeys(keys)
+        unique_keys = list(found.keys())
+        hydrate = model_class.get_row_hydrator()
+        with self.__reader() as con:
+            offset = 0
+            for rows_count, params in self.__iter_pk_chunks(unique_keys, pks_count):
+                sql = QueryBuilder.build_select_by_pks(model_class, rows_count)
+                chunk_keys = unique_keys[offset:offset + rows_count]
+                offset += len(chunk_keys)
+                # The last column is the position of the key in the chunk,
+                # which the hydrator ignores. Padding positions are skipped.
+                for r in self.__execute(con, sql, params, Cursor.fetchall):
+                    if r[-1] < len(chunk_keys):
+                        found[chunk_keys[r[-1]]] = hydrate(r)
+
+        if as_dict:
+            return found
+        return [found[key] for key in keys]
+
+    @staticmethod
+    def __to_pk_tuples(pk_values: Iterable, pks_count: int) -> List[tuple]:
+        keys = []
+        for v in pk_values:
+            key = tuple(v) if isinstance(v, (tuple, list)) else (v,)
+            if len(key) != pks_count:
+                raise ValueError(
+                    'The number of primary keys and primary key values do not match')
+            keys.append(key)
+        return keys
+
+    def __iter_pk_chunks(
+            self,
+            keys: Iterable[tuple],
+            pks_count: int) -> Iterator[Tuple[int, List]]:
+        """Split primary key values tuples into chunks for IN lists and VALUES tables.
+
+        Each chunk is padded with its first key to a power of two length so that
+        statements of the same shape are reused.
+
+        Parameters
+        ----------
+        keys : Iterable[tuple]
+            Unique primary key values tuples
+        pks_count : int
+            The number of primary keys
+
+        Yields
+        ------
+        Tuple[int, List]
+            Rows count of the chunk, flattened qmark parameters
+        """
+        unique_keys = list(keys)
+        chunk_size = max(1, self.__get_max_variable_number() // pks_count)
+        for i in range(0, len(unique_keys), chunk_size):
+            chunk = unique_keys[i:i + chunk_size]
+            rows_count = min(chunk_size, 1 << (len(chunk) - 1).bit_length())
+            chunk += [chunk[0]] * (rows_count - len(chunk))
+            yield rows_count, [v for key in chunk for v in key]
+
+    def paginate(self,
+                 model_class: Type[BaseModel],
+                 where: Optional[str] = None,
+                 where_params: Optional[Union[dict,
+                                        List]] = None,
+                 after: Optional[Union[str, tuple]] = None,
+                 limit: int = 100) -> Tuple[List, Optional[str]]:
+        """Find a page of data ordered by primary keys.
+
+        Pages are selected by comparing primary keys with the last primary
+        key values of the previous page instead of OFFSET,
+        so every page costs the same.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        where : Optional[str], optional
+            Where clause str, by default None
+        where_params : Optional[Union[dict, List]], optional
+            Parameters for where clause, by default None
+        after : Optional[Union[str, tuple]], optional
+            Cursor token returned by the previous call, or primary key values tuple of
+            the last row of the previous page
+            When not specified, the first page is selected
+            , by default None
+        limit : int, optional
+            Max rows count of a page, by default 100
+
+        Returns
+        -------
+        Tuple[List, Optional[str]]
+            Found data, cursor token for the next page
+            The cursor token is None when there is no next page
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if only where or where_params is specified
+        ValueError
+            Raises ValueError if the model does not have any primary keys
+        ValueError
+            Raises ValueError if the number of primary keys and after values do not match
+        ValueError
+            Raises ValueError if limit is less than 1
+        ValueError
+            Raises ValueError if a primary key value of the last row is not
+            str, int, float, bytes or None, which cannot be encoded into a cursor token
+        """
+        self.__validate_where_and_condition(where, where_params)
+        if limit < 1:
+            raise ValueError('limit must be 1 or more')
+
+        pks = QueryBuilder.compile(model_class).pks
+        if len(pks) == 0:
+            raise ValueError(
+                'Cannot use pagination because this class does not have any primary keys')
+        after_values = self.__decode_cursor(after) if isinstance(
+            after, str) else after
+        if after_values is not None and len(after_values) != len(pks):
+            raise ValueError(
+                'The number of primary keys and primary key values do not match')
+
+        named_params = isinstance(where_params, dict)
+        sql = QueryBuilder.build_select_page(
+            model_class, where, after_values is not None, named_params)
+        if named_params:
+            params: Union[dict, List] = dict(where_params)  # type: ignore
+            if after_values is not None:
+                for i, v in enumerate(after_values):
+                    params[f"_pyqlite_after_{i}"] = v
+            params['_pyqlite_limit'] = limit
         else:
-            sql = QueryBuilder.build_select(model_class)
-            r = self.execute(sql).fetchall()
-        model_list = []
-        for o in r:
-            model_list.append(model_class.get_class_type()(*o))
-        return model_list
+            params = list(where_params) if where_params is not None else []
+            if after_values is not None:
+                params.extend(after_values)
+            params.append(limit)
+
+        with self.__reader() as con:
+            rows = self.__execute(con, sql, params, Cursor.fetchall)
+        model_list = list(map(model_class.get_row_hydrator(), rows))
+
+        next_cursor = None
+        if len(model_list) == limit:
+            last = model_list[-1]
+            next_cursor = self.__encode_cursor(
+                tuple(getattr(last, pk) for pk in pks))
+        return model_list, next_cursor
+
+    @staticmethod
+    def __encode_cursor(pk_values: tuple) -> str:
+        # BLOB values are tagged as {"b": base64 str}, which JSON cannot hold.
+        values: List[Any] = []
+        for v in pk_values:
+            if isinstance(v, bytes):
+                values.append(
+                    {'b': base64.urlsafe_b64encode(v).decode('ascii')})
+            elif v is None or isinstance(v, (str, int, float)):
+                values.append(v)
+            else:
+                raise ValueError(
+                    f"Cannot encode a primary key value of {type(v).__name__} into a cursor token")
+        return base64.urlsafe_b64encode(
+            json.dumps(values).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def __decode_cursor(cursor: str) -> tuple:
+        try:
+            return tuple(
+                base64.urlsafe_b64decode(v['b']) if isinstance(v, dict) else v
+                for v in json.loads(base64.urlsafe_b64decode(cursor)))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Invalid cursor token')
 
     ###################
     # Insert
@@ -198,19 +979,24 @@ class DB:
 
     def bulk_insert(
             self,
-            models: List,
-            insert_or_ignore: bool = True) -> int:
+            models: Iterable,
+            insert_or_ignore: bool = True,
+            strategy: BulkInsertStrategy = BulkInsertStrategy.EXECUTEMANY) -> int:
         """Bulk insert data by model list.
 
         Parameters
         ----------
-        models : List
+        models : Iterable
             Target model list
+            Any iterable such as a generator can be passed,
+            it is consumed lazily unless it is a list
         insert_or_ignore : bool, optional
             INSERT OR IGNORE flag
             True: INSERT OR IGNORE
             False: not INSERT OR IGNORE
             , by default True
+        strategy : BulkInsertStrategy, optional
+            Bulk insert strategy, by default BulkInsertStrategy.EXECUTEMANY
 
         Returns
         -------
@@ -224,17 +1010,177 @@ class DB:
         ValueError
             Raises ValueError if all model type does not match in the model list
         """
-        if not all(hasattr(m, 'class_type') for m in models):
-            # BaseModel class has class_type attribute.
-            raise ValueError(
-                'All parameter models must be inherited BaseModel')
+        if isinstance(models, list):
+            if not all(hasattr(m, 'class_type') for m in models):
+                # BaseModel class has class_type attribute.
+                raise ValueError(
+                    'All parameter models must be inherited BaseModel')
+
+            if not all(m.class_type == models[0].class_type for m in models):
+                raise ValueError(
+                    'Multiple types of models cannot be specified')
+
+            if len(models) == 0:
+                return 0
+            model_iter: Iterator = iter(models)
+            first = models[0]
+        else:
+            model_iter = self.__iter_validated_models(models)
+            first = next(model_iter, None)
+            if first is None:
+                return 0
+            model_iter = itertools.chain([first], model_iter)
+
+        compiled = QueryBuilder.compile(first.class_type)
+        if strategy is BulkInsertStrategy.MULTI_ROW_VALUES:
+            return self.__bulk_insert_multi_row_values(
+                compiled, model_iter, insert_or_ignore)
+        elif isinstance(models, list):
+            sql, param_list = QueryBuilder.build_bulk_insert(
+                models, insert_or_ignore)
+            return self.executemany(sql, param_list).rowcount
+        else:
+            sql = compiled.get_insert_sql(insert_or_ignore)
+            return self.executemany(
+                sql, (m.to_tuple() for m in model_iter)).rowcount
+
+    def __iter_validated_models(self, models: Iterable) -> Iterator:
+        class_type = None
+        for m in models:
+            if not hasattr(m, 'class_type'):
+                # BaseModel class has class_type attribute.
+                raise ValueError(
+                    'All parameter models must be inherited BaseModel')
+            if class_type is None:
+                class_type = m.class_type
+            elif m.class_type != class_type:
+                raise ValueError(
+                    'Multiple types of models cannot be specified')
+            yield m
+
+    def __bulk_insert_multi_row_values(
+            self,
+            compiled: CompiledModel,
+            model_iter: Iterator,
+            insert_or_ignore: bool) -> int:
+        # Full chunks share one cached statement,
+        # the remaining rows are inserted by a single-row statement.
+        chunk_size = max(
+            1, self.__get_max_variable_number() // len(compiled.member_names))
+        sql = compiled.get_multi_row_insert_sql(chunk_size, insert_or_ignore)
+        inserted_count = 0
+        while True:
+            chunk = list(itertools.islice(model_iter, chunk_size))
+            if len(chunk) < chunk_size:
+                break
+            params = []
+            for m in chunk:
+                params.extend(m.to_tuple())
+            inserted_count += self.execute(sql, params).rowcount
+        if 0 < len(chunk):
+            inserted_count += self.executemany(
+                compiled.get_insert_sql(insert_or_ignore),
+                [m.to_tuple() for m in chunk]).rowcount
+        return inserted_count
+
+    def __get_max_variable_number(self) -> int:
+        """Get the max number of parameters in a statement.
+
+        Returns
+        -------
+        int
+            The value of SQLITE_LIMIT_VARIABLE_NUMBER of the connection
+        """
+        if self.__max_variable_number is None:
+            if hasattr(self.con, 'getlimit'):
+                self.__max_variable_number = self.con.getlimit(
+                    sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+            else:
+                # The default of SQLite versions prior to 3.32.0
+                self.__max_variable_number = 999
+        return self.__max_variable_number
+
+    ###################
+    # Upsert
+    ###################
+    def upsert(
+            self,
+            model: BaseModel,
+            conflict_columns: Optional[List[str]] = None,
+            update_columns: Optional[List[str]] = None) -> int:
+        """Insert a data by model, or update the existing data on conflict.
+
+        Parameters
+        ----------
+        model : BaseModel
+            Target model
+        conflict_columns : Optional[List[str]], optional
+            Conflict target column names
+            When not specified, primary keys are used
+            , by default None
+        update_columns : Optional[List[str]], optional
+            Column names to be updated on conflict
+            When not specified, all columns except conflict target columns are used
+            , by default None
+
+        Returns
+        -------
+        int
+            Inserted or updated rows count
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if conflict_columns is not specified and the model does not have any primary keys
+        """
+        sql = QueryBuilder.build_upsert(
+            model.class_type, conflict_columns, update_columns)
+        return self.execute(sql, model.values).rowcount
+
+    def bulk_upsert(
+            self,
+            models: Iterable,
+            conflict_columns: Optional[List[str]] = None,
+            update_columns: Optional[List[str]] = None) -> int:
+        """Bulk insert data by model list, or update the existing data on conflict.
 
-        if not all(m.class_type == models[0].class_type for m in models):
-            raise ValueError('Multiple types of models cannot be specified')
+        Parameters
+        ----------
+        models : Iterable
+            Target model list
+            Any iterable such as a generator can be passed and is consumed lazily
+        conflict_columns : Optional[List[str]], optional
+            Conflict target column names
+            When not specified, primary keys are used
+            , by default None
+        update_columns : Optional[List[str]], optional
+            Column names to be updated on conflict
+            When not specified, all columns except conflict target columns are used
+            , by default None
+
+        Returns
+        -------
+        int
+            Inserted or updated rows count
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the model list contains an object that does not inherit BaseModel class
+        ValueError
+            Raises ValueError if all model type does not match in the model list
+        ValueError
+            Raises ValueError if conflict_columns is not specified and the model does not have any primary keys
+        """
+        model_iter = self.__iter_validated_models(models)
+        first = next(model_iter, None)
+        if first is None:
+            return 0
 
-        sql, param_list = QueryBuilder.build_bulk_insert(
-            models, insert_or_ignore)
-        return self.executemany(sql, param_list).rowcount
+        sql = QueryBuilder.build_upsert(
+            first.class_type, conflict_columns, update_columns)
+        param_iter = (m.to_tuple() for m in itertools.chain([first], model_iter))
+        return self.executemany(sql, param_iter).rowcount
 
     ###################
     # Update
@@ -279,8 +1225,7 @@ class DB:
                 params_for_execute.update(data_to_be_updated)
                 params_for_execute.update(where_params)
             elif isinstance(where_params, list):
-                params_for_execute = list()
-                params_for_execute.extend(list(data_to_be_updated.values()))
+                params_for_execute = list(data_to_be_updated.values())
                 params_for_execute.extend(where_params)
             return self.execute(sql, params_for_execute).rowcount
 
@@ -296,27 +1241,101 @@ class DB:
         -------
         int
             Updated rows count
+            0 if no member is modified
 
         Raises
         ------
+        ValueError
+            Raises ValueError if the model is a partial model selected by columns
         ValueError
             Raises ValueError if the model does not have any primary keys
         """
-        pks = model.pks
+        if not isinstance(model, BaseModel):
+            raise ValueError(
+                'Cannot update a partial model, find it without columns to update')
+        compiled = QueryBuilder.compile(model.class_type)
+        pks = compiled.pks
         if len(pks) == 0:
             raise ValueError(
                 'Cannot use this function with no primary key model')
 
-        sql = QueryBuilder.build_update_by_model(model)
         params = getattr(
             model, '_BaseModel__get_data_to_be_updated')()
+        if len(params) == 0:
+            return 0
+        sql = compiled.get_update_sql(tuple(params.keys()))
         for pk in pks:
             params.update({pk: getattr(model, pk)})
         r = self.execute(sql, params)
         if 0 < r.rowcount:
-            model._BaseModel__set_cache()  # type: ignore
+            model._BaseModel__clear_dirty()  # type: ignore
         return r.rowcount
 
+    def bulk_update_by_model(
+            self,
+            models: Iterable) -> Tuple[int, Dict[Tuple[str, ...], int]]:
+        """Bulk update data by model list.
+
+        Models are grouped by their modified member names and
+        each group is updated by a single executemany call.
+        All groups are updated in a SAVEPOINT, so that a failing group
+        rolls back the others, and the transaction is left to the caller
+        to commit as other update methods do.
+        Models with no modified members are skipped.
+        Modified members flags are cleared after all groups are updated,
+        only for the groups whose rows are all updated. When some rows of a group
+        are missing, the flags of the group are kept because
+        the updated models cannot be told apart.
+
+        Parameters
+        ----------
+        models : Iterable
+            Target model list
+
+        Returns
+        -------
+        Tuple[int, Dict[Tuple[str, ...], int]]
+            Updated rows count, updated rows count per modified member names
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the model list contains an object that does not inherit BaseModel class
+        ValueError
+            Raises ValueError if all model type does not match in the model list
+        ValueError
+            Raises ValueError if the model does not have any primary keys
+        """
+        groups: Dict[Tuple[str, ...], List] = dict()
+        for m in self.__iter_validated_models(models):
+            if m.is_dirty:
+                groups.setdefault(m.dirty_member_names, []).append(m)
+        if len(groups) == 0:
+            return 0, dict()
+
+        compiled = QueryBuilder.compile(
+            next(iter(groups.values()))[0].class_type)
+        pks = compiled.pks
+        if len(pks) == 0:
+            raise ValueError(
+                'Cannot use this function with no primary key model')
+
+        rowcounts: Dict[Tuple[str, ...], int] = dict()
+        with self.__atomic():
+            for member_names, group in groups.items():
+                keys = member_names + pks
+                param_list = [
+                    {k: getattr(m, k) for k in keys} for m in group]
+                sql = compiled.get_update_sql(member_names)
+                rowcounts[member_names] = self.executemany(
+                    sql, param_list).rowcount
+
+        for member_names, group in groups.items():
+            if rowcounts[member_names] == len(group):
+                for m in group:
+                    m._BaseModel__clear_dirty()  # type: ignore
+        return sum(rowcounts.values()), rowcounts
+
     ###################
     # Delete
     ###################
@@ -364,9 +1383,10 @@ class DB:
         int
             Deleted rows count
         """
-        sql = QueryBuilder.build_delete_by_model(model)
+        compiled = QueryBuilder.compile(model.class_type)
+        sql = compiled.delete_by_model_sql
 
-        pks = model.pks
+        pks = compiled.pks
         if 0 < len(pks):
             params = {}
             for pk in pks:
@@ -376,9 +1396,112 @@ class DB:
 
         return self.execute(sql, params).rowcount
 
+    def bulk_delete_by_model(self, models: Iterable) -> int:
+        """Bulk delete data by model list.
+
+        Models with primary keys are deleted by chunked IN lists of primary key values,
+        models without primary keys are deleted by executemany matching all columns.
+        Rows are deleted in a SAVEPOINT as delete_many does.
+
+        Parameters
+        ----------
+        models : Iterable
+            Target model list
+
+        Returns
+        -------
+        int
+            Deleted rows count
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the model list contains an object that does not inherit BaseModel class
+        ValueError
+            Raises ValueError if all model type does not match in the model list
+        """
+        model_iter = self.__iter_validated_models(models)
+        first = next(model_iter, None)
+        if first is None:
+            return 0
+
+        model_iter = itertools.chain([first], model_iter)
+        compiled = QueryBuilder.compile(first.class_type)
+        if 0 < len(compiled.pks):
+            return self.delete_many(
+                first.class_type,
+                (tuple(getattr(m, pk) for pk in compiled.pks) for m in model_iter))
+        param_list = [m.to_dict() for m in model_iter]
+        with self.__atomic():
+            return self.executemany(
+                compiled.delete_by_model_sql, param_list).rowcount
+
+    def delete_many(
+            self,
+            model_class: Type[BaseModel],
+            pk_values: Iterable) -> int:
+        """Delete data by multiple primary key values.
+
+        Primary key values are deleted by chunked IN lists.
+        All chunks are deleted in a SAVEPOINT, so that a failing chunk
+        rolls back the others, and the transaction is left to the caller
+        to commit as other delete methods do.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        pk_values : Iterable
+            Primary key values
+            A value or a tuple of a value for a single primary key model,
+            a tuple of values for a multiple primary keys model
+
+        Returns
+        -------
+        int
+            Deleted rows count
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the model does not have any primary keys
+        ValueError
+            Raises ValueError if the number of primary keys and primary key values do not match
+        """
+        pks_count = len(QueryBuilder.compile(model_class).pks)
+        if pks_count == 0:
+            raise ValueError(
+                'Cannot use delete_many method because this class does not have any primary keys')
+
+        keys = dict.fromkeys(self.__to_pk_tuples(pk_values, pks_count))
+        deleted_count = 0
+        with self.__atomic():
+            for rows_count, params in self.__iter_pk_chunks(keys, pks_count):
+                sql = QueryBuilder.build_delete_by_pks(model_class, rows_count)
+                deleted_count += self.execute(sql, params).rowcount
+        return deleted_count
+
     ###################
     # Execute
     ###################
+    def enable_statement_cache_stats(self) -> StatementCacheStats:
+        """Start counting hits and misses of the prepared statement cache.
+
+        Statements on the writer connection are recorded
+        from this call on, which costs an LRU update per statement,
+        so it is disabled by default.
+
+        Returns
+        -------
+        StatementCacheStats
+            Statistics, also set to statement_cache_stats
+            When already enabled, the existing one is returned
+        """
+        if self.statement_cache_stats is None:
+            self.statement_cache_stats = StatementCacheStats(
+                self.__cached_statements)
+        return self.statement_cache_stats
+
     def execute(self, sql: str, params: Optional[Union[dict, List]] = None):
         """Execute SQL.
 
@@ -393,19 +1516,105 @@ class DB:
         -------
         Cursor
             SQL result
-        """
-        r = self.con.execute(
-            sql) if params is None else self.con.execute(sql, params)
 
-        if self.log_level is not None:
-            logger = getLogger(self.__class__.__name__)
-            logger.setLevel(self.log_level)
-            msg = 'sql executed: ' + sql
-            if params is not None:
-                msg += f", params: {str(params)}"
-            logger.info(msg)
+        Notes
+        -----
+        When log_level is INFO or lower, an INFO record is logged
+        with sql, param_count, duration seconds and rowcount attributes.
+        The message is formatted only when a handler emits the record.
+        """
+        return self.__execute(self.con, sql, params)
 
-        return r
+    def __execute(
+            self,
+            con: Connection,
+            sql: str,
+            params: Optional[Union[dict, List]] = None,
+            fetch: Optional[Callable[[Cursor], Any]] = None) -> Any:
+        # Returns the cursor, or the rows fetched by fetch so that
+        # the duration and the number of rows reported include fetching.
+        logger = self.__get_sql_logger()
+        instrumentation = self.instrumentation
+        after_callbacks = _NO_CALLBACKS if instrumentation is None \
+            else instrumentation.after_execute_callbacks
+        observed = logger is not None or 0 < len(after_callbacks)
+        param_count = 0 if params is None else len(params)
+        if instrumentation is not None:
+            instrumentation.before_execute(sql, param_count)
+        lock = None
+        if con is self.con:
+            cache_stats = self.statement_cache_stats
+            if cache_stats is not None:
+                cache_stats.record(sql)
+            lock = self.__writer_lock
+        start = time.perf_counter() if observed else 0.0
+        if lock is not None:
+            lock.acquire()
+        try:
+            if self.retry_policy is None or con.in_transaction:
+                r = self.__execute_once(con, sql, params)
+            else:
+                r = self.retry_policy.run(self.__execute_once, con, sql, params)
+            result = r if fetch is None else fetch(r)
+        finally:
+            if lock is not None:
+                self.__update_transaction_thread_id()
+                lock.release()
+        if not observed:
+            return result
+
+        duration = time.perf_counter() - start
+        if 0 < len(after_callbacks):
+            if fetch is None:
+                rows = None
+            elif isinstance(result, list):
+                rows = len(result)
+            else:
+                rows = 0 if result is None else 1
+            instrumentation.after_execute(  # type: ignore
+                ExecuteEvent(sql, param_count, duration, rows, r.rowcount))
+        if logger is not None:
+            extra = {
+                'sql': sql,
+                'param_count': param_count,
+                'duration': duration,
+                'rowcount': r.rowcount,
+            }
+            if params is None:
+                logger.info('sql executed: %s', sql, extra=extra)
+            else:
+                logger.info(
+                    'sql executed: %s, params: %s',
+                    sql,
+                    SqlLogParams([params], 1, self.log_max_param_length),
+                    extra=extra)
+
+        return result
+
+    def __update_transaction_thread_id(self) -> None:
+        # Called under the writer lock after a statement on the writer,
+        # which may have begun or ended its transaction.
+        if not self.con.in_transaction:
+            self.__transaction_thread_id = None
+        elif self.__transaction_thread_id is None:
+            self.__transaction_thread_id = threading.get_ident()
+
+    def __get_sql_logger(self) -> Optional[Logger]:
+        # Returns None when SQL logs are not emitted,
+        # so that nothing is measured or formatted for them.
+        log_level = self.log_level
+        if log_level is None:
+            return None
+        if self.__logger.level != log_level:
+            self.__logger.setLevel(log_level)
+        return self.__logger if self.__logger.isEnabledFor(INFO) else None
+
+    @staticmethod
+    def __execute_once(
+            con: Connection,
+            sql: str,
+            params: Optional[Union[dict, List]]) -> Cursor:
+        return con.execute(sql) if params is None else con.execute(sql, params)
 
     def executemany(self, sql: str, param_list: List):
         """Execute SQL.
@@ -421,47 +1630,278 @@ class DB:
         -------
         Cursor
             SQL Result
-        """
-        r = self.con.executemany(sql, param_list)
 
-        if self.log_level is not None:
-            logger = getLogger(self.__class__.__name__)
-            logger.setLevel(self.log_level)
-            msg = f"sql executed: {sql}, params: "
-            for param in param_list:
-                msg += f"{str(param)}, "
-            msg = msg.rstrip().rstrip(',')
-            logger.info(msg)
+        Notes
+        -----
+        When log_level is INFO or lower, an INFO record is logged
+        with sql, param_count, duration seconds and rowcount attributes.
+        param_count is the number of parameter rows, and only the first
+        log_max_params rows are kept for the message.
+        """
+        logger = self.__get_sql_logger()
+        instrumentation = self.instrumentation
+        after_callbacks = _NO_CALLBACKS if instrumentation is None \
+            else instrumentation.after_execute_callbacks
+        observed = logger is not None or 0 < len(after_callbacks)
+        is_sequence = isinstance(param_list, (list, tuple))
+        sampler = None
+        if observed and not is_sequence:
+            sampler = ParamsSampler(
+                param_list, 0 if logger is None else self.log_max_params)
+            param_list = sampler
+        if instrumentation is not None:
+            instrumentation.before_execute(
+                sql, len(param_list) if is_sequence else None)
+        cache_stats = self.statement_cache_stats
+        if cache_stats is not None:
+            cache_stats.record(sql)
+        start = time.perf_counter() if observed else 0.0
+
+        lock = self.__writer_lock
+        if lock is not None:
+            lock.acquire()
+        try:
+            # A consumed iterator cannot be replayed, so only sequences are retried.
+            if self.retry_policy is None or self.con.in_transaction or not is_sequence:
+                r = self.con.executemany(sql, param_list)
+            else:
+                r = self.retry_policy.run(self.con.executemany, sql, param_list)
+        finally:
+            if lock is not None:
+                self.__update_transaction_thread_id()
+                lock.release()
+
+        if not observed:
+            return r
+
+        duration = time.perf_counter() - start
+        param_count = len(param_list) if sampler is None else sampler.count
+        if 0 < len(after_callbacks):
+            instrumentation.after_execute(  # type: ignore
+                ExecuteEvent(sql, param_count, duration, None, r.rowcount))
+        if logger is not None:
+            if sampler is None:
+                params = SqlLogParams(
+                    param_list[:self.log_max_params],
+                    len(param_list),
+                    self.log_max_param_length)
+            else:
+                params = SqlLogParams(
+                    sampler.rows, sampler.count, self.log_max_param_length)
+            logger.info(
+                'sql executed: %s, params: %s',
+                sql,
+                params,
+                extra={
+                    'sql': sql,
+                    'param_count': param_count,
+                    'duration': duration,
+                    'rowcount': r.rowcount,
+                })
 
         return r
 
     ###################
     # Transaction
     ###################
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator['DB']:
+        """Create a scope that commits on success and rolls back on exception.
+
+        Outside of a transaction, the scope begins a transaction and
+        commits or rolls back it at the end.
+        When the commit fails, the transaction is rolled back and the error is raised.
+        Inside of a transaction, including an outer scope, the scope is
+        a SAVEPOINT that is released on success, or rolled back to on exception
+        without undoing the outer transaction.
+        With a reader pool, the scope holds the writer lock until the end.
+
+        Yields
+        ------
+        DB
+            This instance
+        """
+        # Other threads sharing the writer wait until the scope ends,
+        # so that their statements and savepoints do not interleave with it.
+        lock = self.__writer_lock
+        if lock is not None:
+            lock.acquire()
+        try:
+            if not self.con.in_transaction:
+                isolation_level = self.con.isolation_level or ''
+                self.execute(f"BEGIN {isolation_level}".rstrip())
+                try:
+                    yield self
+                    self.commit()
+                except BaseException:
+                    # A failed COMMIT leaves the transaction open,
+                    # which would turn the next scope into a SAVEPOINT of it.
+                    self.rollback()
+                    raise
+                return
+
+            with self.__savepoint():
+                yield self
+        finally:
+            if lock is not None:
+                lock.release()
+
+    @contextlib.contextmanager
+    def __atomic(self) -> Iterator[None]:
+        # Makes the statements of a bulk method all or nothing
+        # without committing, unlike transaction outside of a transaction.
+        lock = self.__writer_lock
+        if lock is not None:
+            lock.acquire()
+        try:
+            if not self.con.in_transaction and self.con.isolation_level is not None:
+                # The BEGIN that the sqlite3 module issues before a write,
+                # since releasing the outermost SAVEPOINT would commit.
+                self.execute(f"BEGIN {self.con.isolation_level}".rstrip())
+            with self.__savepoint():
+                yield
+        finally:
+            if lock is not None:
+                lock.release()
+
+    @contextlib.contextmanager
+    def __savepoint(self) -> Iterator[None]:
+        self.__savepoint_depth += 1
+        savepoint = f"pyqlite_savepoint_{self.__savepoint_depth}"
+        try:
+            self.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield
+            except BaseException:
+                self.execute(f"ROLLBACK TO {savepoint}")
+                self.execute(f"RELEASE {savepoint}")
+                raise
+            self.execute(f"RELEASE {savepoint}")
+        finally:
+            self.__savepoint_depth -= 1
+
     @classmethod
     @contextlib.contextmanager
     def transaction_scope(
             cls,
-            db_filepath: str,
-            isolation_level: IsolationLevel = IsolationLevel.DEFERRED):
+            db_filepath: Optional[str] = None,
+            isolation_level: IsolationLevel = IsolationLevel.DEFERRED,
+            pool: Optional[ConnectionPool] = None,
+            pragma_profile: Optional[PragmaProfile] = None,
+            cached_statements: int = 128):
         """Create a transaction scope.
 
         Parameters
         ----------
-        db_filepath : str
+        db_filepath : Optional[str], optional
             Database file path
+            Not required when pool is specified
+            , by default None
         isolation_level : IsolationLevel, optional
             Isolation level, by default IsolationLevel.DEFERRED
+        pool : Optional[ConnectionPool], optional
+            Connection pool to borrow a connection from
+            The connection is returned to the pool at the end of the scope
+            When not specified, a new connection is opened and closed
+            , by default None
+        pragma_profile : Optional[PragmaProfile], optional
+            PRAGMA settings applied to a new connection
+            Not used when pool is specified, set it to the pool instead
+            , by default None
+        cached_statements : int, optional
+            Prepared statement cache size of a new connection
+            Not used when pool is specified, set it to the pool instead
+            , by default 128
 
         Yields
         ------
         DB
             DB instance
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if neither db_filepath nor pool is specified
         """
-        con = cls(db_filepath, isolation_level)
+        if pool is not None:
+            with pool.connection() as pooled_con:
+                tran = cls(
+                    pool.db_filepath,
+                    isolation_level,
+                    connection=pooled_con,
+                    cached_statements=pool.cached_statements)
+                try:
+                    yield tran
+                finally:
+                    tran.rollback()
+            return
+
+        if db_filepath is None:
+            raise ValueError('Either db_filepath or pool must be specified')
+        con = cls(
+            db_filepath,
+            isolation_level,
+            pragma_profile=pragma_profile,
+            cached_statements=cached_statements)
         with contextlib.closing(con) as tran:
             try:
                 yield tran
             finally:
                 tran.rollback()
                 tran.close()
+
+    @classmethod
+    def run_in_transaction(
+            cls,
+            func: Callable[['DB'], Any],
+            db_filepath: Optional[str] = None,
+            isolation_level: IsolationLevel = IsolationLevel.DEFERRED,
+            pool: Optional[ConnectionPool] = None,
+            pragma_profile: Optional[PragmaProfile] = None,
+            retry_policy: Optional[RetryPolicy] = None) -> Any:
+        """Run a function in a transaction scope, retrying the whole scope.
+
+        When the database is busy or locked, the scope is rolled back and
+        func is called again in a new scope, following retry_policy.
+        func must commit by itself and must be safe to call again.
+
+        Parameters
+        ----------
+        func : Callable[[DB], Any]
+            Function that receives the DB instance of the scope
+        db_filepath : Optional[str], optional
+            Database file path
+            Not required when pool is specified
+            , by default None
+        isolation_level : IsolationLevel, optional
+            Isolation level, by default IsolationLevel.DEFERRED
+        pool : Optional[ConnectionPool], optional
+            Connection pool to borrow a connection from, by default None
+        pragma_profile : Optional[PragmaProfile], optional
+            PRAGMA settings applied to a new connection, by default None
+        retry_policy : Optional[RetryPolicy], optional
+            Retry policy
+            When not specified, RetryPolicy with default settings is used
+            , by default None
+
+        Returns
+        -------
+        Any
+            Return value of func
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if neither db_filepath nor pool is specified
+        """
+        def run_scope():
+            with cls.transaction_scope(
+                    db_filepath,
+                    isolation_level,
+                    pool=pool,
+                    pragma_profile=pragma_profile) as tran:
+                return func(tran)
+
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        return retry_policy.run(run_scope)
@@ -0,0 +1,450 @@
+from array import array
+from collections import Counter
+import math
+import struct
+import threading
+from typing import (
+    Callable, Dict, Final, Iterable, List, NamedTuple, Optional, Sequence, Tuple)
+
+# IEEE 754 double, used to bucket durations by their bits
+_MANTISSA_BITS: Final[int] = 52
+_SIGN_BIT: Final[int] = 1 << 63
+_BITS_STRUCT: Final[struct.Struct] = struct.Struct('<Q')
+_DOUBLE_STRUCT: Final[struct.Struct] = struct.Struct('<d')
+
+
+class ExecuteEvent(NamedTuple):
+    """Represents an executed SQL statement.
+
+    A NamedTuple rather than a frozen dataclass,
+    since one is created for every statement.
+
+    Attributes
+    ----------
+    sql: str
+        SQL template, parameters are not embedded
+    param_count: Optional[int]
+        The number of parameters, or parameter rows for executemany
+        None when an iterator is passed to executemany
+    duration: float
+        Wall time seconds, including fetching rows when rows is not None
+    rows: Optional[int]
+        The number of rows returned
+        None when the rows are fetched by the caller
+    rowcount: int
+        Cursor.rowcount, -1 for SELECT
+    ----------
+    """
+
+    sql: str
+    param_count: Optional[int]
+    duration: float
+    rows: Optional[int]
+    rowcount: int
+
+
+class Instrumentation:
+    """Callbacks called before and after DB executes a statement.
+
+    Set it to DB.instrumentation for every DB instance,
+    or to the attribute of an instance.
+    Callbacks run on the thread that executes the statement.
+    Durations are measured and an ExecuteEvent is created
+    only when an after execute callback is added.
+
+    Attributes
+    ----------
+    before_execute_callbacks: Tuple[Callable, ...]
+        Callbacks added by add_before_execute, read only
+    after_execute_callbacks: Tuple[Callable, ...]
+        Callbacks added by add_after_execute, read only
+    ----------
+    """
+
+    def __init__(self) -> None:
+        """Constructor
+        """
+        # Replaced rather than modified,
+        # so that executing threads iterate them without a lock.
+        self.before_execute_callbacks: Tuple[Callable, ...] = ()
+        self.after_execute_callbacks: Tuple[Callable, ...] = ()
+
+    def add_before_execute(
+            self, callback: Callable[[str, Optional[int]], None]) -> None:
+        """Add a callback called before a statement is executed.
+
+        Parameters
+        ----------
+        callback : Callable[[str, Optional[int]], None]
+            Function that receives the SQL template and the parameter count
+        """
+        self.before_execute_callbacks = (
+            *self.before_execute_callbacks, callback)
+
+    def add_after_execute(
+            self, callback: Callable[[ExecuteEvent], None]) -> None:
+        """Add a callback called after a statement is executed.
+
+        Parameters
+        ----------
+        callback : Callable[[ExecuteEvent], None]
+            Function that receives the executed statement
+        """
+        self.after_execute_callbacks = (
+            *self.after_execute_callbacks, callback)
+
+    def remove_before_execute(self, callback: Callable) -> None:
+        """Remove a callback added by add_before_execute.
+
+        Parameters
+        ----------
+        callback : Callable
+            Added callback
+        """
+        self.before_execute_callbacks = tuple(
+            c for c in self.before_execute_callbacks if c != callback)
+
+    def remove_after_execute(self, callback: Callable) -> None:
+        """Remove a callback added by add_after_execute.
+
+        Parameters
+        ----------
+        callback : Callable
+            Added callback
+        """
+        self.after_execute_callbacks = tuple(
+            c for c in self.after_execute_callbacks if c != callback)
+
+    def before_execute(self, sql: str, param_count: Optional[int]) -> None:
+        """Call the before execute callbacks.
+
+        Parameters
+        ----------
+        sql : str
+            SQL template
+        param_count : Optional[int]
+            The number of parameters
+        """
+        for callback in self.before_execute_callbacks:
+            callback(sql, param_count)
+
+    def after_execute(self, event: ExecuteEvent) -> None:
+        """Call the after execute callbacks.
+
+        Parameters
+        ----------
+        event : ExecuteEvent
+            Executed statement
+        """
+        for callback in self.after_execute_callbacks:
+            callback(event)
+
+
+class LatencyHistogram:
+    """Streaming histogram of durations with log-scale buckets.
+
+    Each power of two is split into sub_buckets linear buckets,
+    so percentiles are accurate within 1 / sub_buckets
+    and memory is bounded by the number of buckets in use.
+    The bucket of a value is the top bits of its IEEE 754 representation,
+    the exponent and the leading mantissa bits,
+    so values are bucketed in bulk without math functions.
+    """
+
+    def __init__(self, sub_buckets: int = 32) -> None:
+        """Constructor
+
+        Parameters
+        ----------
+        sub_buckets : int, optional
+            The number of buckets per power of two, by default 32
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if sub_buckets is not a power of two up to 2 ** 52
+        """
+        if sub_buckets < 1 or sub_buckets & (sub_buckets - 1) != 0 \
+                or _MANTISSA_BITS < sub_buckets.bit_length() - 1:
+            raise ValueError('sub_buckets must be a power of two up to 2 ** 52')
+        self.sub_buckets: Final[int] = sub_buckets
+        self.__shift: Final[int] = _MANTISSA_BITS - (sub_buckets.bit_length() - 1)
+        # Bucket 0 holds zeros and negative values.
+        self.__buckets: 'Counter[int]' = Counter()
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Add a value.
+
+        Parameters
+        ----------
+        value : float
+            Duration seconds
+        """
+        self.count += 1
+        index = 0 if value <= 0 else _BITS_STRUCT.unpack(
+            _DOUBLE_STRUCT.pack(value))[0] >> self.__shift
+        self.__buckets[index] += 1
+
+    def add_many(self, values: Iterable[float]) -> None:
+        """Add values.
+
+        Parameters
+        ----------
+        values : Iterable[float]
+            Duration seconds
+        """
+        bits = array('Q', array('d', values).tobytes())
+        self.count += len(bits)
+        shift = self.__shift
+        buckets = self.__buckets
+        buckets.update([b >> shift for b in bits])
+        # Negative values have the sign bit, they are moved to bucket 0.
+        negative_indexes = [i for i in buckets if _SIGN_BIT >> shift <= i]
+        for index in negative_indexes:
+            buckets[0] += buckets.pop(index)
+
+    def percentile(self, q: float) -> float:
+        """Get an approximate percentile.
+
+        Parameters
+        ----------
+        q : float
+            Percentile from 0 to 100
+
+        Returns
+        -------
+        float
+            Upper bound of the bucket that contains the percentile
+            0.0 when no values are added
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for index in sorted(self.__buckets):
+            seen += self.__buckets[index]
+            if rank <= seen:
+                break
+        if index == 0:
+            return 0.0
+        return _DOUBLE_STRUCT.unpack(
+            _BITS_STRUCT.pack((index + 1) << self.__shift))[0]
+
+
+class StatementStats:
+    """Statistics of a SQL template.
+
+    Attributes
+    ----------
+    sql: Final[str]
+        SQL template
+    count: int
+        The number of executions
+    total: float
+        Total duration seconds
+    max: float
+        Max duration seconds
+    rows: int
+        Total rows returned when known
+    histogram: Final[LatencyHistogram]
+        Duration histogram
+    ----------
+    """
+
+    def __init__(self, sql: str) -> None:
+        """Constructor
+
+        Parameters
+        ----------
+        sql : str
+            SQL template
+        """
+        self.sql: Final[str] = sql
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.histogram: Final[LatencyHistogram] = LatencyHistogram()
+
+    @property
+    def mean(self) -> float:
+        """Mean duration seconds
+        """
+        return 0.0 if self.count == 0 else self.total / self.count
+
+    @property
+    def p50(self) -> float:
+        """Approximate median duration seconds
+        """
+        return self.histogram.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        """Approximate 95th percentile duration seconds
+        """
+        return self.histogram.percentile(95)
+
+    @property
+    def p99(self) -> float:
+        """Approximate 99th percentile duration seconds
+        """
+        return self.histogram.percentile(99)
+
+
+class StatsAggregator:
+    """Aggregates executed statements per SQL template.
+
+    Add it to Instrumentation by add_after_execute.
+    Executed statements are buffered without a lock and aggregated
+    per SQL template in batches of buffer_size, or when statistics are read
+    by get, top or report, to keep the cost on the executing thread small.
+    """
+
+    def __init__(self, buffer_size: int = 1024) -> None:
+        """Constructor
+
+        Parameters
+        ----------
+        buffer_size : int, optional
+            The number of executed statements buffered before aggregating
+            , by default 1024
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if buffer_size is less than 1
+        """
+        if buffer_size < 1:
+            raise ValueError('buffer_size must be 1 or more')
+        self.buffer_size: Final[int] = buffer_size
+        self.__lock = threading.Lock()
+        self.__stats: Dict[str, StatementStats] = dict()
+        # list.append is atomic, so executing threads append without the lock.
+        self.__buffer: List[ExecuteEvent] = []
+
+    def __call__(self, event: ExecuteEvent) -> None:
+        """Add an executed statement.
+
+        Parameters
+        ----------
+        event : ExecuteEvent
+            Executed statement
+        """
+        buffer = self.__buffer
+        buffer.append(event)
+        if self.buffer_size <= len(buffer):
+            self.__flush()
+
+    def __flush(self) -> None:
+        with self.__lock:
+            buffer = self.__buffer
+            # Events appended while slicing are kept for the next flush.
+            events = buffer[:len(buffer)]
+            del buffer[:len(events)]
+            if len(events) == 0:
+                return
+            sqls, _, durations, rows, _ = zip(*events)
+            # A batch usually comes from one statement in a loop,
+            # which is aggregated without grouping event by event.
+            if sqls.count(sqls[0]) == len(sqls):
+                self.__add(sqls[0], durations, rows)
+                return
+            groups: Dict[str, Tuple[List[float], List[Optional[int]]]] = dict()
+            for sql, duration, row in zip(sqls, durations, rows):
+                group = groups.get(sql)
+                if group is None:
+                    group = groups[sql] = ([], [])
+                group[0].append(duration)
+                group[1].append(row)
+            for sql, (group_durations, group_rows) in groups.items():
+                self.__add(sql, group_durations, group_rows)
+
+    def __add(
+            self,
+            sql: str,
+            durations: Sequence[float],
+            rows: Iterable[Optional[int]]) -> None:
+        stats = self.__stats.get(sql)
+        if stats is None:
+            stats = self.__stats[sql] = StatementStats(sql)
+        stats.count += len(durations)
+        stats.total += math.fsum(durations)
+        stats.max = max(stats.max, max(durations))
+        # None for unknown rows and 0 are dropped alike
+        stats.rows += sum(filter(None, rows))
+        stats.histogram.add_many(durations)
+
+    def get(self, sql: str) -> Optional[StatementStats]:
+        """Get statistics of a SQL template.
+
+        Parameters
+        ----------
+        sql : str
+            SQL template
+
+        Returns
+        -------
+        Optional[StatementStats]
+            Statistics
+            When the SQL is not executed, return None
+        """
+        self.__flush()
+        return self.__stats.get(sql)
+
+    def top(self, n: int = 10, key: str = 'total') -> List[StatementStats]:
+        """Get the statistics of the heaviest SQL templates.
+
+        Parameters
+        ----------
+        n : int, optional
+            The number of SQL templates, by default 10
+        key : str, optional
+            total, count, mean, max, p50, p95 or p99, by default 'total'
+
+        Returns
+        -------
+        List[StatementStats]
+            Statistics in descending order of key
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if key is unknown
+        """
+        if key not in ('total', 'count', 'mean', 'max', 'p50', 'p95', 'p99'):
+            raise ValueError(f"Unknown key: {key}")
+        self.__flush()
+        with self.__lock:
+            stats_list = list(self.__stats.values())
+        return sorted(
+            stats_list, key=lambda s: getattr(s, key), reverse=True)[:n]
+
+    def report(self, n: int = 10, key: str = 'total') -> str:
+        """Format the statistics of the heaviest SQL templates.
+
+        Parameters
+        ----------
+        n : int, optional
+            The number of SQL templates, by default 10
+        key : str, optional
+            Sort key, see top, by default 'total'
+
+        Returns
+        -------
+        str
+            A line per SQL template with durations in milliseconds
+        """
+        lines = ['count\ttotal_ms\tp50_ms\tp95_ms\tp99_ms\tsql']
+        for s in self.top(n, key):
+            lines.append(
+                f"{s.count}\t{s.total * 1000:.3f}\t{s.p50 * 1000:.3f}"
+                f"\t{s.p95 * 1000:.3f}\t{s.p99 * 1000:.3f}\t{s.sql}")
+        return '\n'.join(lines)
+
+    def clear(self) -> None:
+        """Clear all statistics.
+        """
+        with self.__lock:
+            self.__buffer.clear()
+            self.__stats.clear()
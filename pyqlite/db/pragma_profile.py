@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+from sqlite3 import Connection
+from typing import Dict, Final, List, Optional
+
+
+@dataclass(frozen=True)
+class PragmaProfile:
+    """Represents PRAGMA settings applied to each new connection.
+
+    Settings that are None are left as SQLite defaults.
+
+    Attributes
+    ----------
+    journal_mode: Final[Optional[str]]
+        DELETE, TRUNCATE, PERSIST, MEMORY, WAL or OFF
+    synchronous: Final[Optional[str]]
+        OFF, NORMAL, FULL or EXTRA
+    cache_size: Final[Optional[int]]
+        Page cache size
+        A positive value is pages, a negative value is KiB
+    mmap_size: Final[Optional[int]]
+        Max bytes of memory-mapped I/O
+    temp_store: Final[Optional[str]]
+        DEFAULT, FILE or MEMORY
+    busy_timeout: Final[Optional[int]]
+        Milliseconds to wait for a lock
+    page_size: Final[Optional[int]]
+        Page size bytes, takes effect only on a new database or after VACUUM
+        and not in WAL mode
+    ----------
+    """
+
+    journal_mode: Final[Optional[str]] = None
+    synchronous: Final[Optional[str]] = None
+    cache_size: Final[Optional[int]] = None
+    mmap_size: Final[Optional[int]] = None
+    temp_store: Final[Optional[str]] = None
+    busy_timeout: Final[Optional[int]] = None
+    page_size: Final[Optional[int]] = None
+
+    def __post_init__(self):
+        """Validate settings.
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if a setting has an invalid value
+        """
+        choices = {
+            'journal_mode': [
+                'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'],
+            'synchronous': ['OFF', 'NORMAL', 'FULL', 'EXTRA'],
+            'temp_store': ['DEFAULT', 'FILE', 'MEMORY'],
+        }
+        for name, values in choices.items():
+            value = getattr(self, name)
+            if value is not None and value.upper() not in values:
+                raise ValueError(f"Invalid {name}: {value}")
+        if self.page_size is not None and (
+                self.page_size < 512 or 65536 < self.page_size
+                or self.page_size & (self.page_size - 1) != 0):
+            raise ValueError(f"Invalid page_size: {self.page_size}")
+
+    def to_pragmas(self) -> List[str]:
+        """Convert settings to PRAGMA statements.
+
+        page_size is placed first because it cannot be changed after
+        the journal mode is switched to WAL.
+
+        Returns
+        -------
+        List[str]
+            PRAGMA statements
+        """
+        pragmas = []
+        for name in [
+                'page_size', 'journal_mode', 'synchronous', 'cache_size',
+                'mmap_size', 'temp_store', 'busy_timeout']:
+            value = getattr(self, name)
+            if value is not None:
+                pragmas.append(f"PRAGMA {name} = {value}")
+        return pragmas
+
+    def apply(self, connection: Connection) -> None:
+        """Apply settings to a connection.
+
+        Parameters
+        ----------
+        connection : Connection
+            Target connection
+        """
+        for pragma in self.to_pragmas():
+            connection.execute(pragma).fetchall()
+
+    @classmethod
+    def preset(cls, name: str) -> 'PragmaProfile':
+        """Get a named preset.
+
+        durable: WAL, synchronous=FULL, no committed transaction is lost on power failure
+        balanced: WAL, synchronous=NORMAL, larger cache and memory-mapped I/O
+        bulk-load: in-memory journal and synchronous=OFF for loading data that can be
+        reloaded when the database is corrupted by a crash
+
+        Parameters
+        ----------
+        name : str
+            Preset name: durable, balanced or bulk-load
+
+        Returns
+        -------
+        PragmaProfile
+            Preset profile
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the preset name is unknown
+        """
+        if name not in PRESETS:
+            raise ValueError(f"Unknown preset: {name}")
+        return PRESETS[name]
+
+
+PRESETS: Final[Dict[str, PragmaProfile]] = {
+    'durable': PragmaProfile(
+        journal_mode='WAL',
+        synchronous='FULL',
+        busy_timeout=5000),
+    'balanced': PragmaProfile(
+        journal_mode='WAL',
+        synchronous='NORMAL',
+        cache_size=-64000,
+        mmap_size=268435456,
+        temp_store='MEMORY',
+        busy_timeout=5000),
+    'bulk-load': PragmaProfile(
+        journal_mode='MEMORY',
+        synchronous='OFF',
+        cache_size=-256000,
+        mmap_size=268435456,
+        temp_store='MEMORY',
+        busy_timeout=5000),
+}
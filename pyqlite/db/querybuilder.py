@@ -1,13 +1,31 @@
+import functools
 import re
-from typing import List, Optional, Tuple, Type, Union
+from typing import Dict, Final, List, Optional, Tuple, Type, Union
+from weakref import WeakKeyDictionary
 
+from pyqlite.db.compiled_model import CompiledModel
 from pyqlite.model import BaseModel
 
 
+# Quoted strings, quoted identifiers and comments are kept as they are.
+_WHERE_TOKEN_PATTERN: Final = re.compile(
+    r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\]"""
+    r"""|--[^\n]*(?:\n|$)|/\*.*?\*/)|\s+""",
+    re.DOTALL)
+
+
+@functools.lru_cache(maxsize=1024)
+def _canonicalize_where(where: str) -> str:
+    return _WHERE_TOKEN_PATTERN.sub(
+        lambda m: m.group(1) or ' ', where).strip(' ')
+
+
 class QueryBuilder:
     """QueryBuilder
     """
 
+    __compiled_models: 'WeakKeyDictionary[type, CompiledModel]' = WeakKeyDictionary()
+
     ###################
     # Utils
     ###################
@@ -15,6 +33,99 @@ class QueryBuilder:
     def __format_where(cls, sql: str) -> str:
         return re.sub(' AND $', '', sql)
 
+    @classmethod
+    def canonicalize_where(cls, where: str) -> str:
+        """Canonicalize a where clause str.
+
+        Runs of whitespace outside of quoted strings, identifiers and comments are
+        collapsed into a space and both ends are stripped,
+        so that where clauses differing only in layout give one SQL text
+        and reuse one prepared statement.
+
+        Parameters
+        ----------
+        where : str
+            Where clause str
+
+        Returns
+        -------
+        str
+            Canonicalized where clause str
+        """
+        return _canonicalize_where(where)
+
+    ###################
+    # Compile
+    ###################
+    @classmethod
+    def compile(cls, model_class: Type[BaseModel]) -> CompiledModel:
+        """Get the compiled metadata and SQL texts of a model class.
+
+        The result is built on first use and cached per model class.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+
+        Returns
+        -------
+        CompiledModel
+            Compiled model
+        """
+        compiled = cls.__compiled_models.get(model_class)
+        if compiled is None:
+            compiled = cls.__compile(model_class)
+            cls.__compiled_models[model_class] = compiled
+        return compiled
+
+    @classmethod
+    def invalidate(cls, model_class: Optional[Type[BaseModel]] = None) -> None:
+        """Discard compiled models.
+
+        Call this when a model class is redefined.
+
+        Parameters
+        ----------
+        model_class : Optional[Type[BaseModel]], optional
+            Target model class type, by default None
+            When not specified, all compiled models are discarded
+        """
+        if model_class is None:
+            for c in list(cls.__compiled_models.keys()):
+                c.clear_metadata_cache()
+            cls.__compiled_models.clear()
+        else:
+            model_class.clear_metadata_cache()
+            cls.__compiled_models.pop(model_class, None)
+
+    @classmethod
+    def __compile(cls, model_class: Type[BaseModel]) -> CompiledModel:
+        table_name = model_class.get_table_name()
+        member_names = tuple(model_class.get_member_names())
+        pks = tuple(model_class.get_pks())
+
+        qmarks_str = ', '.join('?' * len(member_names))
+        named_str = ', '.join(f":{m}" for m in member_names)
+        delete_keys = pks if 0 < len(pks) else member_names
+
+        select_by_pk_sql = None
+        if 0 < len(pks):
+            select_by_pk_sql = cls.build_select_with_qmark_parameters(
+                model_class, list(pks))
+
+        return CompiledModel(
+            table_name=table_name,
+            member_names=member_names,
+            pks=pks,
+            select_by_pk_sql=select_by_pk_sql,
+            insert_sql=f"INSERT INTO {table_name} VALUES ({qmarks_str})",
+            insert_or_ignore_sql=f"INSERT OR IGNORE INTO {table_name} VALUES ({qmarks_str})",
+            bulk_insert_sql=f"INSERT INTO {table_name} VALUES ({named_str})",
+            bulk_insert_or_ignore_sql=f"INSERT OR IGNORE INTO {table_name} VALUES ({named_str})",
+            delete_by_model_sql=f"DELETE FROM {table_name} WHERE " +
+            ' AND '.join(f"{k} = :{k}" for k in delete_keys))
+
     ###################
     # Select
     ###################
@@ -54,7 +165,8 @@ class QueryBuilder:
     @classmethod
     def build_select(cls,
                      model_class: Type[BaseModel],
-                     where: Optional[str] = None) -> str:
+                     where: Optional[str] = None,
+                     columns: Optional[List[str]] = None) -> str:
         """Build select statement.
 
         Parameters
@@ -63,15 +175,247 @@ class QueryBuilder:
             Target model class type
         where : Optional[str], optional
             Where clause str, by default None
+        columns : Optional[List[str]], optional
+            Column names to be selected in declared member order
+            When not specified, select all columns by *
+            , by default None
+
+        Returns
+        -------
+        str
+            Built select statement str
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if columns is empty
+        ValueError
+            Raises ValueError if columns contains names that are not members
+        """
+        if columns is None:
+            select_str = '*'
+        else:
+            select_str = ', '.join(cls.__get_select_columns(model_class, columns))
+        sql = f"SELECT {select_str} FROM {model_class.get_table_name()}"
+        if where is not None:
+            sql += f" WHERE {_canonicalize_where(where)}"
+        return sql
+
+    @classmethod
+    def __get_select_columns(
+            cls,
+            model_class: Type[BaseModel],
+            columns: List[str]) -> Tuple[str, ...]:
+        if len(columns) == 0:
+            raise ValueError('The number of columns must be 1 or more')
+        compiled = cls.compile(model_class)
+        unknown_columns = [
+            c for c in columns if c not in compiled.member_names]
+        if 0 < len(unknown_columns):
+            raise ValueError(
+                f"Unknown column names: {', '.join(unknown_columns)}")
+        return compiled.get_ordered_columns(tuple(columns))
+
+    @classmethod
+    def build_select_by_pks(
+            cls,
+            model_class: Type[BaseModel],
+            rows_count: int) -> str:
+        """Build select statement by multiple primary key values.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        rows_count : int
+            The number of primary key values
+
+        Returns
+        -------
+        str
+            Built select statement str with qmark parameters
+            Single primary key: ... FROM (VALUES (0, ?), ...) AS k JOIN table AS t ON t.pk = k.column2
+            Multiple primary keys: ... ON t.pk1 = k.column2 AND t.pk2 = k.column3
+            Each row ends with the 0-based position of its primary key values
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the model does not have any primary keys
+        ValueError
+            Raises ValueError if rows_count is less than 1
+        """
+        compiled = cls.compile(model_class)
+        if len(compiled.pks) == 0:
+            raise ValueError(
+                'Cannot select by primary keys because this class does not have any primary keys')
+        if rows_count < 1:
+            raise ValueError('rows_count must be 1 or more')
+        return compiled.get_select_by_pks_sql(rows_count)
+
+    @classmethod
+    def build_select_page(
+            cls,
+            model_class: Type[BaseModel],
+            where: Optional[str] = None,
+            with_after: bool = False,
+            named_params: bool = False) -> str:
+        """Build keyset pagination select statement ordered by primary keys.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        where : Optional[str], optional
+            Where clause str, by default None
+        with_after : bool, optional
+            Add a condition to select rows after the specified primary key values
+            , by default False
+        named_params : bool, optional
+            True: use named parameters(:_pyqlite_after_N, :_pyqlite_limit)
+            False: use qmark parameters
+            , by default False
 
         Returns
         -------
         str
             Built select statement str
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the model does not have any primary keys
         """
+        pks = cls.compile(model_class).pks
+        if len(pks) == 0:
+            raise ValueError(
+                'Cannot use pagination because this class does not have any primary keys')
+
+        conditions = []
+        if where is not None:
+            conditions.append(f"({_canonicalize_where(where)})")
+        if with_after:
+            if named_params:
+                params = [f":_pyqlite_after_{i}" for i in range(len(pks))]
+            else:
+                params = ['?'] * len(pks)
+            if len(pks) == 1:
+                conditions.append(f"{pks[0]} > {params[0]}")
+            else:
+                conditions.append(
+                    f"({', '.join(pks)}) > ({', '.join(params)})")
+
         sql = f"SELECT * FROM {model_class.get_table_name()}"
+        if 0 < len(conditions):
+            sql += f" WHERE {' AND '.join(conditions)}"
+        limit_param = ':_pyqlite_limit' if named_params else '?'
+        sql += f" ORDER BY {', '.join(pks)} LIMIT {limit_param}"
+        return sql
+
+    @classmethod
+    def build_count(cls,
+                    model_class: Type[BaseModel],
+                    where: Optional[str] = None) -> str:
+        """Build count statement.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        where : Optional[str], optional
+            Where clause str, by default None
+
+        Returns
+        -------
+        str
+            Built count statement str
+        """
+        sql = f"SELECT count(*) FROM {model_class.get_table_name()}"
+        if where is not None:
+            sql += f" WHERE {_canonicalize_where(where)}"
+        return sql
+
+    @classmethod
+    def build_exists(cls,
+                     model_class: Type[BaseModel],
+                     where: Optional[str] = None) -> str:
+        """Build exists statement, which stops at the first matching row.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        where : Optional[str], optional
+            Where clause str, by default None
+
+        Returns
+        -------
+        str
+            Built exists statement str
+        """
+        sql = f"SELECT 1 FROM {model_class.get_table_name()}"
+        if where is not None:
+            sql += f" WHERE {_canonicalize_where(where)}"
+        return sql + ' LIMIT 1'
+
+    @classmethod
+    def build_aggregate(cls,
+                        model_class: Type[BaseModel],
+                        aggregates: Dict[str, str],
+                        where: Optional[str] = None,
+                        group_by: Optional[List[str]] = None) -> str:
+        """Build aggregate statement.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        aggregates : Dict[str, str]
+            Aggregate expressions keyed by alias, aliases are quoted
+            so that keywords such as order can be used
+            e.g. {'total': 'sum(amount)'}
+        where : Optional[str], optional
+            Where clause str, by default None
+        group_by : Optional[List[str]], optional
+            Column names to group by, selected before the aggregates
+            , by default None
+
+        Returns
+        -------
+        str
+            Built aggregate statement str
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if aggregates is empty
+        ValueError
+            Raises ValueError if an alias is not an identifier
+        ValueError
+            Raises ValueError if group_by is empty or contains unknown names
+        ValueError
+            Raises ValueError if an alias is also a group_by column
+        """
+        if len(aggregates) == 0:
+            raise ValueError('The number of aggregates must be 1 or more')
+        invalid_aliases = [a for a in aggregates if not a.isidentifier()]
+        if 0 < len(invalid_aliases):
+            raise ValueError(f"Invalid aliases: {', '.join(invalid_aliases)}")
+
+        group_columns: Tuple[str, ...] = ()
+        if group_by is not None:
+            group_columns = cls.__get_select_columns(model_class, group_by)
+        duplicate_aliases = [a for a in aggregates if a in group_columns]
+        if 0 < len(duplicate_aliases):
+            raise ValueError(
+                f"Aliases duplicate group_by columns: {', '.join(duplicate_aliases)}")
+        select_str = ', '.join(group_columns + tuple(
+            f'{expression} AS "{alias}"' for alias, expression in aggregates.items()))
+        sql = f"SELECT {select_str} FROM {model_class.get_table_name()}"
         if where is not None:
-            sql += f" WHERE {where}"
+            sql += f" WHERE {_canonicalize_where(where)}"
+        if 0 < len(group_columns):
+            sql += f" GROUP BY {', '.join(group_columns)}"
         return sql
 
     ###################
@@ -99,10 +443,7 @@ class QueryBuilder:
         Tuple[str, List]
             Built insert statement str, insert parameters
         """
-        params_str = '?, ' * len(model.member_names)
-        params_str = params_str.rstrip().rstrip(',')
-        or_ignore_str = " OR IGNORE" if insert_or_ignore else ''
-        sql = f"INSERT{or_ignore_str} INTO {model.table_name} VALUES ({params_str})"
+        sql = cls.compile(model.class_type).get_insert_sql(insert_or_ignore)
         return sql, model.values
 
     @classmethod
@@ -130,14 +471,8 @@ class QueryBuilder:
         if len(models) == 0:
             return "", []
 
-        params_str = '?, ' * len(models[0].member_names)
-        params_str = params_str.rstrip().rstrip(',')
-        or_ignore_str = " OR IGNORE" if insert_or_ignore else ''
-
-        sql = f"INSERT{or_ignore_str} INTO {models[0].table_name} VALUES ("
-        for member_name in models[0].member_names:
-            sql += f":{member_name}, "
-        sql = re.sub(', $', ')', sql)
+        sql = cls.compile(
+            models[0].class_type).get_bulk_insert_sql(insert_or_ignore)
 
         param_list = []
         for model in models:
@@ -145,6 +480,63 @@ class QueryBuilder:
 
         return sql, param_list
 
+    @classmethod
+    def build_upsert(
+            cls,
+            model_class: Type[BaseModel],
+            conflict_columns: Optional[List[str]] = None,
+            update_columns: Optional[List[str]] = None) -> str:
+        """Build insert statement with an upsert clause(ON CONFLICT DO UPDATE).
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        conflict_columns : Optional[List[str]], optional
+            Conflict target column names
+            When not specified, primary keys are used
+            , by default None
+        update_columns : Optional[List[str]], optional
+            Column names to be updated on conflict
+            When not specified, all columns except conflict target columns are used
+            , by default None
+
+        Returns
+        -------
+        str
+            Built insert statement str with qmark parameters
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if conflict_columns is not specified and the model does not have any primary keys
+        ValueError
+            Raises ValueError if an unknown column name is specified
+        """
+        compiled = cls.compile(model_class)
+        if conflict_columns is None:
+            if len(compiled.pks) == 0:
+                raise ValueError(
+                    'conflict_columns must be specified for no primary key model')
+            conflict_tuple = compiled.pks
+        else:
+            # Lists and tuples are both accepted
+            conflict_tuple = tuple(conflict_columns)
+        if update_columns is None:
+            update_tuple = tuple(
+                m for m in compiled.member_names if m not in conflict_tuple)
+        else:
+            update_tuple = tuple(update_columns)
+
+        unknown_columns = [
+            c for c in conflict_tuple + update_tuple
+            if c not in compiled.member_names]
+        if 0 < len(unknown_columns):
+            raise ValueError(
+                f"Unknown column names: {', '.join(unknown_columns)}")
+
+        return compiled.get_upsert_sql(conflict_tuple, update_tuple)
+
     ###################
     # Update
     ###################
@@ -172,18 +564,25 @@ class QueryBuilder:
         -------
         str
             Built update statement str
+            With named parameters, the SET columns are in declared member order,
+            so that one SQL text is built per column set
+            With qmark parameters, they are in the order of data_to_be_updated,
+            the order the values are bound in
         """
         sql = f"UPDATE {model_class.get_table_name()} SET "
 
-        for k in data_to_be_updated:
-            if where is None or isinstance(where_params, dict):
+        if where is None or isinstance(where_params, dict):
+            column_names = cls.compile(model_class).get_ordered_columns(
+                tuple(data_to_be_updated))
+            for k in column_names:
                 sql += f"{k} = :{k}, "
-            else:
+        else:
+            for k in data_to_be_updated:
                 sql += f"{k} = ?, "
         sql = sql.rstrip().rstrip(',')
 
         if where is not None:
-            sql += f" WHERE {where}"
+            sql += f" WHERE {_canonicalize_where(where)}"
 
         return sql
 
@@ -201,20 +600,10 @@ class QueryBuilder:
         str
             Built update statement str
         """
-        sql = f"UPDATE {model.table_name} SET "
-
         data_to_be_updated = getattr(
             model, '_BaseModel__get_data_to_be_updated')()
-        for k, _ in data_to_be_updated.items():
-            sql += f"{k} = :{k}, "
-        sql = sql.rstrip().rstrip(',')
-
-        sql += " WHERE "
-        for pk in model.pks:
-            sql += f"{pk} = :{pk} AND "
-        sql = cls.__format_where(sql)
-
-        return sql
+        return cls.compile(model.class_type).get_update_sql(
+            tuple(data_to_be_updated.keys()))
 
     ###################
     # Delete
@@ -240,7 +629,7 @@ class QueryBuilder:
         """
         sql = f"DELETE FROM {model_class.get_table_name()}"
         if where is not None:
-            sql += f" WHERE {where}"
+            sql += f" WHERE {_canonicalize_where(where)}"
         return sql
 
     @ classmethod
@@ -257,9 +646,40 @@ class QueryBuilder:
         str
             Built delete statement str
         """
-        sql = f"DELETE FROM {model.table_name} WHERE "
-        member_list = model.pks if 0 < len(model.pks) else model.member_names
-        for member_name in member_list:
-            sql += f"{member_name} = :{member_name} AND "
-        sql = cls.__format_where(sql)
-        return sql
+        return cls.compile(model.class_type).delete_by_model_sql
+
+    @classmethod
+    def build_delete_by_pks(
+            cls,
+            model_class: Type[BaseModel],
+            rows_count: int) -> str:
+        """Build delete statement by multiple primary key values.
+
+        Parameters
+        ----------
+        model_class : Type[BaseModel]
+            Target model class type
+        rows_count : int
+            The number of primary key values
+
+        Returns
+        -------
+        str
+            Built delete statement str with qmark parameters
+            Single primary key: WHERE pk IN (?, ...)
+            Multiple primary keys: WHERE (pk1, pk2) IN (VALUES (?, ?), ...)
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the model does not have any primary keys
+        ValueError
+            Raises ValueError if rows_count is less than 1
+        """
+        compiled = cls.compile(model_class)
+        if len(compiled.pks) == 0:
+            raise ValueError(
+                'Cannot delete by primary keys because this class does not have any primary keys')
+        if rows_count < 1:
+            raise ValueError('rows_count must be 1 or more')
+        return compiled.get_delete_by_pks_sql(rows_count)
@@ -0,0 +1,173 @@
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Final
+
+
+# Primary result codes, extended codes keep them in the low byte.
+_SQLITE_BUSY: Final[int] = 5
+_SQLITE_LOCKED: Final[int] = 6
+_RETRYABLE_MESSAGES: Final[tuple] = (
+    'database is locked', 'database table is locked', 'database is busy')
+
+
+class RetryPolicy:
+    """Retries operations that fail because the database is busy or locked.
+
+    The n-th retry waits initial_delay * multiplier ** (n - 1) seconds
+    capped at max_delay, reduced by a random fraction up to jitter,
+    so that competing writers do not retry in lockstep.
+    Retries stop after max_attempts attempts or when the next wait
+    would exceed max_elapsed seconds since the first attempt.
+
+    retry_count and wait_time are accumulated over every run,
+    so sharing a policy makes contention visible in one place.
+    """
+
+    def __init__(
+            self,
+            max_attempts: int = 5,
+            initial_delay: float = 0.01,
+            max_delay: float = 1.0,
+            multiplier: float = 2.0,
+            jitter: float = 0.5,
+            max_elapsed: float = 5.0) -> None:
+        """Constructor
+
+        Parameters
+        ----------
+        max_attempts : int, optional
+            Max number of attempts including the first one, by default 5
+        initial_delay : float, optional
+            Seconds to wait before the first retry, by default 0.01
+        max_delay : float, optional
+            Max seconds to wait before a retry, by default 1.0
+        multiplier : float, optional
+            Growth factor of the wait per retry, by default 2.0
+        jitter : float, optional
+            Max fraction of a wait removed at random, from 0 to 1
+            , by default 0.5
+        max_elapsed : float, optional
+            Max seconds from the first attempt to the start of the last retry
+            , by default 5.0
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if max_attempts is less than 1
+        ValueError
+            Raises ValueError if jitter is not between 0 and 1
+        """
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be 1 or more')
+        if jitter < 0 or 1 < jitter:
+            raise ValueError('jitter must be between 0 and 1')
+        self.max_attempts: Final[int] = max_attempts
+        self.initial_delay: Final[float] = initial_delay
+        self.max_delay: Final[float] = max_delay
+        self.multiplier: Final[float] = multiplier
+        self.jitter: Final[float] = jitter
+        self.max_elapsed: Final[float] = max_elapsed
+        self.__lock = threading.Lock()
+        self.__retry_count = 0
+        self.__wait_time = 0.0
+
+    @property
+    def retry_count(self) -> int:
+        """The number of retries
+        """
+        return self.__retry_count
+
+    @property
+    def wait_time(self) -> float:
+        """Total seconds waited before retries
+        """
+        return self.__wait_time
+
+    def reset_stats(self) -> None:
+        """Reset retry_count and wait_time.
+        """
+        with self.__lock:
+            self.__retry_count = 0
+            self.__wait_time = 0.0
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        """Check if an error is caused by a busy or locked database.
+
+        Parameters
+        ----------
+        error : BaseException
+            Raised error
+
+        Returns
+        -------
+        bool
+            True: SQLITE_BUSY or SQLITE_LOCKED
+            False: Otherwise
+        """
+        if not isinstance(error, sqlite3.OperationalError):
+            return False
+        error_code = getattr(error, 'sqlite_errorcode', None)
+        if error_code is not None:
+            return error_code & 0xff in (_SQLITE_BUSY, _SQLITE_LOCKED)
+        return str(error) in _RETRYABLE_MESSAGES
+
+    def get_delay(self, retry_number: int) -> float:
+        """Get seconds to wait before a retry.
+
+        Parameters
+        ----------
+        retry_number : int
+            1 for the first retry
+
+        Returns
+        -------
+        float
+            Seconds to wait
+        """
+        delay = min(
+            self.max_delay,
+            self.initial_delay * self.multiplier ** (retry_number - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Call a function, retrying it while the database is busy or locked.
+
+        Parameters
+        ----------
+        func : Callable
+            Function to be called
+            It must be safe to call again after a retryable error
+        args
+            Positional arguments for func
+        kwargs
+            Keyword arguments for func
+
+        Returns
+        -------
+        Any
+            Return value of func
+
+        Raises
+        ------
+        sqlite3.OperationalError
+            Raises the last error if retries are exhausted
+        """
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not self.is_retryable(e) or self.max_attempts <= attempt:
+                    raise
+                delay = self.get_delay(attempt)
+                if self.max_elapsed < time.monotonic() - start + delay:
+                    raise
+            time.sleep(delay)
+            with self.__lock:
+                self.__retry_count += 1
+                self.__wait_time += delay
+            attempt += 1
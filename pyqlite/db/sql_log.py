@@ -0,0 +1,64 @@
+from typing import Final, Iterable, Iterator, List
+
+
+class SqlLogParams:
+    """Parameters of a logged SQL, formatted only when the record is emitted.
+
+    At most the sampled rows are formatted, each truncated to max_length
+    characters, followed by the number of omitted rows.
+    """
+
+    def __init__(self, rows: List, count: int, max_length: int) -> None:
+        """Constructor
+
+        Parameters
+        ----------
+        rows : List
+            Sampled parameter rows
+        count : int
+            The number of all parameter rows
+        max_length : int
+            Max characters per row
+        """
+        self.rows: Final[List] = rows
+        self.count: Final[int] = count
+        self.max_length: Final[int] = max_length
+
+    def __str__(self) -> str:
+        texts = []
+        for row in self.rows:
+            text = str(row)
+            if self.max_length < len(text):
+                text = text[:self.max_length] + '...'
+            texts.append(text)
+        if len(self.rows) < self.count:
+            texts.append(f"... ({self.count - len(self.rows)} more)")
+        return ', '.join(texts)
+
+
+class ParamsSampler:
+    """Iterable that keeps the first rows and counts all rows of parameters
+    while they are consumed by executemany.
+    """
+
+    def __init__(self, params: Iterable, max_rows: int) -> None:
+        """Constructor
+
+        Parameters
+        ----------
+        params : Iterable
+            Parameter rows
+        max_rows : int
+            The number of rows to keep
+        """
+        self.rows: Final[List] = []
+        self.count = 0
+        self.__params = params
+        self.__max_rows = max_rows
+
+    def __iter__(self) -> Iterator:
+        for row in self.__params:
+            self.count += 1
+            if self.count <= self.__max_rows:
+                self.rows.append(row)
+            yield row
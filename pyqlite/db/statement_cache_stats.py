@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import Final
+
+
+class StatementCacheStats:
+    """Counts hits and misses of the prepared statement cache of a connection.
+
+    sqlite3 does not expose its statement cache, so this mirrors it:
+    an LRU list of SQL texts of the same size as cached_statements.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Constructor
+
+        Parameters
+        ----------
+        size : int
+            cached_statements of the connection
+        """
+        self.size: Final[int] = size
+        self.hits = 0
+        self.misses = 0
+        self.__sqls: 'OrderedDict[str, None]' = OrderedDict()
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of hits to executions
+        0.0 when nothing is executed
+        """
+        total = self.hits + self.misses
+        return 0.0 if total == 0 else self.hits / total
+
+    def record(self, sql: str) -> None:
+        """Record an execution of a SQL.
+
+        Parameters
+        ----------
+        sql : str
+            Executed SQL
+        """
+        sqls = self.__sqls
+        if sql in sqls:
+            sqls.move_to_end(sql)
+            self.hits += 1
+            return
+        self.misses += 1
+        if 0 < self.size:
+            sqls[sql] = None
+            if self.size < len(sqls):
+                sqls.popitem(last=False)
+
+    def reset(self) -> None:
+        """Reset hits and misses, cached SQL texts are kept.
+        """
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,337 @@
+from concurrent.futures import Future
+import queue
+import threading
+import time
+from typing import Any, Dict, Final, List, Optional, Tuple
+
+from pyqlite.db.db import DB
+from pyqlite.db.isolation_level import IsolationLevel
+from pyqlite.db.pragma_profile import PragmaProfile
+from pyqlite.model import BaseModel
+
+# DB methods that can be submitted to the queue
+_OPERATIONS: Final[Tuple[str, ...]] = (
+    'insert', 'bulk_insert', 'upsert', 'bulk_upsert',
+    'update', 'update_by_model', 'bulk_update_by_model',
+    'delete', 'delete_by_model', 'bulk_delete_by_model', 'delete_many',
+    'execute', 'executemany')
+
+# Operations clearing modified members flags, and their model argument names
+_UPDATED_MODELS_ARGUMENTS: Final[Dict[str, str]] = {
+    'update_by_model': 'model',
+    'bulk_update_by_model': 'models',
+}
+
+_STOP: Final[object] = object()
+
+
+class WriteQueue:
+    """Single writer for a database shared by many producer threads.
+
+    Write operations submitted from any thread are executed by a dedicated
+    writer thread. Pending operations are coalesced into one transaction per flush,
+    bounded by max_batch_size and max_latency, so that many logical writes
+    share a single commit.
+    Each operation runs in its own savepoint, a failing operation is rolled back
+    alone and its future gets the exception.
+    """
+
+    def __init__(
+            self,
+            db_filepath: str,
+            max_batch_size: int = 1000,
+            max_latency: float = 0.01,
+            isolation_level: IsolationLevel = IsolationLevel.IMMEDIATE,
+            pragma_profile: Optional[PragmaProfile] = None) -> None:
+        """Constructor
+
+        The writer thread starts immediately and opens the database
+        before the constructor returns.
+
+        Parameters
+        ----------
+        db_filepath : str
+            Database file path
+        max_batch_size : int, optional
+            Max number of operations committed in a transaction, by default 1000
+        max_latency : float, optional
+            Max seconds to wait for more operations before committing, by default 0.01
+        isolation_level : IsolationLevel, optional
+            Isolation level, by default IsolationLevel.IMMEDIATE
+        pragma_profile : Optional[PragmaProfile], optional
+            PRAGMA settings applied to the writer connection, by default None
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if max_batch_size is less than 1
+        sqlite3.Error
+            Raises the error of opening the database by the writer thread
+        """
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be 1 or more')
+        self.db_filepath: Final[str] = db_filepath
+        self.max_batch_size: Final[int] = max_batch_size
+        self.max_latency: Final[float] = max_latency
+        self.isolation_level: Final[IsolationLevel] = isolation_level
+        self.pragma_profile: Final[Optional[PragmaProfile]] = pragma_profile
+        self.flush_count = 0
+        self.operation_count = 0
+        self.__queue: 'queue.Queue[Any]' = queue.Queue()
+        self.__lock = threading.Lock()
+        self.__closed = False
+        self.__error: Optional[BaseException] = None
+        self.__opened = threading.Event()
+        self.__thread = threading.Thread(
+            target=self.__run, name='pyqlite-writer', daemon=True)
+        self.__thread.start()
+        self.__opened.wait()
+        if self.__error is not None:
+            self.__thread.join()
+            raise self.__error
+
+    def __enter__(self) -> 'WriteQueue':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    ###################
+    # Submit
+    ###################
+    def submit(self, operation: str, *args, **kwargs) -> Future:
+        """Submit a write operation.
+
+        Parameters
+        ----------
+        operation : str
+            DB method name such as insert, update_by_model or execute
+        args
+            Positional arguments of the DB method
+        kwargs
+            Keyword arguments of the DB method
+
+        Returns
+        -------
+        Future
+            Future of the DB method result, set after the transaction is committed
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if the operation is not a write operation
+        ValueError
+            Raises ValueError if the queue is closed
+        ValueError
+            Raises ValueError if the writer thread has stopped by an error
+        """
+        if operation not in _OPERATIONS:
+            raise ValueError(f"Unsupported operation: {operation}")
+        future: Future = Future()
+        with self.__lock:
+            if self.__closed:
+                raise ValueError('The write queue is closed')
+            if self.__error is not None:
+                raise ValueError(
+                    'The writer thread has stopped') from self.__error
+            self.__queue.put((future, operation, args, kwargs))
+        return future
+
+    def insert(self, model: BaseModel, insert_or_ignore: bool = True) -> Future:
+        """Submit DB.insert.
+
+        Parameters
+        ----------
+        model : BaseModel
+            Target model
+        insert_or_ignore : bool, optional
+            INSERT OR IGNORE flag, by default True
+
+        Returns
+        -------
+        Future
+            Future of inserted rows count
+        """
+        return self.submit('insert', model, insert_or_ignore)
+
+    def upsert(self, model: BaseModel) -> Future:
+        """Submit DB.upsert.
+
+        Parameters
+        ----------
+        model : BaseModel
+            Target model
+
+        Returns
+        -------
+        Future
+            Future of inserted or updated rows count
+        """
+        return self.submit('upsert', model)
+
+    def update_by_model(self, model: BaseModel) -> Future:
+        """Submit DB.update_by_model.
+
+        Modified members flags of the model are cleared by the writer thread
+        after the transaction is committed.
+
+        Parameters
+        ----------
+        model : BaseModel
+            Target model
+
+        Returns
+        -------
+        Future
+            Future of updated rows count
+        """
+        return self.submit('update_by_model', model)
+
+    def delete_by_model(self, model: BaseModel) -> Future:
+        """Submit DB.delete_by_model.
+
+        Parameters
+        ----------
+        model : BaseModel
+            Target model
+
+        Returns
+        -------
+        Future
+            Future of deleted rows count
+        """
+        return self.submit('delete_by_model', model)
+
+    def close(self) -> None:
+        """Commit pending operations and stop the writer thread.
+        """
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__queue.put(_STOP)
+        self.__thread.join()
+
+    ###################
+    # Writer thread
+    ###################
+    def __run(self) -> None:
+        try:
+            db = DB(
+                self.db_filepath,
+                self.isolation_level,
+                pragma_profile=self.pragma_profile)
+        except BaseException as e:
+            self.__error = e
+            return
+        finally:
+            self.__opened.set()
+
+        try:
+            stopped = False
+            while not stopped:
+                item = self.__queue.get()
+                if item is _STOP:
+                    break
+                batch = [item]
+                deadline = time.monotonic() + self.max_latency
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self.__queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopped = True
+                        break
+                    batch.append(item)
+                self.__flush(db, batch)
+        except BaseException as e:
+            # Refuse later operations and fail the queued ones,
+            # so that no future is left pending forever.
+            with self.__lock:
+                self.__error = e
+            while True:
+                try:
+                    item = self.__queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP and not item[0].done():
+                    item[0].set_exception(e)
+        finally:
+            db.close()
+
+    def __flush(self, db: DB, batch: List) -> None:
+        done = []
+        # Models with the flags written by update operations,
+        # which are cleared after the commit so that a failed batch can be retried.
+        written_flags: List[Tuple[BaseModel, int]] = []
+        try:
+            db.execute(f"BEGIN {self.isolation_level.value}")
+            for future, operation, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                args, kwargs, models = self.__get_updated_models(
+                    operation, args, kwargs)
+                flags = [getattr(m, '_BaseModel__dirty') for m in models]
+                db.execute('SAVEPOINT pyqlite_write_queue')
+                try:
+                    result = getattr(db, operation)(*args, **kwargs)
+                except BaseException as e:
+                    db.execute('ROLLBACK TO pyqlite_write_queue')
+                    db.execute('RELEASE pyqlite_write_queue')
+                    future.set_exception(e)
+                    continue
+                db.execute('RELEASE pyqlite_write_queue')
+                for m, flag in zip(models, flags):
+                    dirty = getattr(m, '_BaseModel__dirty')
+                    written = flag & ~dirty
+                    if written != 0:
+                        object.__setattr__(m, '_BaseModel__dirty', dirty | written)
+                        written_flags.append((m, written))
+                done.append((future, result))
+            db.commit()
+        except BaseException as e:
+            try:
+                db.rollback()
+            finally:
+                for future, *_ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        self.flush_count += 1
+        self.operation_count += len(done)
+        for m, written in written_flags:
+            object.__setattr__(
+                m, '_BaseModel__dirty', getattr(m, '_BaseModel__dirty') & ~written)
+        for future, result in done:
+            future.set_result(result)
+
+    @staticmethod
+    def __get_updated_models(
+            operation: str,
+            args: tuple,
+            kwargs: dict) -> Tuple[tuple, dict, List[BaseModel]]:
+        # Returns the arguments with the models materialized and the models
+        # whose modified members flags are cleared by the operation.
+        name = _UPDATED_MODELS_ARGUMENTS.get(operation)
+        if name is None:
+            return args, kwargs, []
+        if 0 < len(args):
+            target = args[0]
+        elif name in kwargs:
+            target = kwargs[name]
+        else:
+            return args, kwargs, []
+        if operation == 'update_by_model':
+            models = [target]
+        else:
+            models = list(target)
+            if 0 < len(args):
+                args = (models,) + args[1:]
+            else:
+                kwargs = dict(kwargs, models=models)
+        return args, kwargs, [m for m in models if isinstance(m, BaseModel)]
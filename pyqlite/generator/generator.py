@@ -10,7 +10,11 @@ class Generator:
     """
 
     @classmethod
-    def generate_model_files(cls, db_filepath: str, output_path: str) -> None:
+    def generate_model_files(
+            cls,
+            db_filepath: str,
+            output_path: str,
+            slots: bool = False) -> None:
         """Generate model files by db metadata.
 
         Parameters
@@ -19,6 +23,9 @@ class Generator:
             File path of the database to use
         output_path : str
             Model files output path
+        slots : bool, optional
+            Generate models that store their members in __slots__
+            , by default False
         """
         con = None
         try:
@@ -30,7 +37,8 @@ class Generator:
             table_names = DBMetaData.select_table_names(con)
             for table_name in table_names:
                 columns = DBMetaData.select_columns_metadata(con, table_name)
-                ModelFileGenerator.generate(table_name, columns, output_path)
+                ModelFileGenerator.generate(
+                    table_name, columns, output_path, slots)
 
         finally:
             if con is not None:
@@ -18,7 +18,8 @@ class ModelFileGenerator:
             cls,
             table_name: str,
             columns: List[Column],
-            output_path: str):
+            output_path: str,
+            slots: bool = False):
         """Generate model files by database metadata.
 
         Parameters
@@ -29,6 +30,9 @@ class ModelFileGenerator:
             Columns data from the target table
         output_path : str
             Model files output path
+        slots : bool, optional
+            Generate models that store their members in __slots__
+            , by default False
         """
         exists_any_type = False
         is_use_pk = False
@@ -72,7 +76,8 @@ class ModelFileGenerator:
         code_str.append_line('from pyqlite.model import BaseModel')
         code_str.append_line('')
         code_str.append_line('')
-        code_str.append_line("@dataclass(init=True, eq=True)")
+        slots_str = ', slots=True' if slots else ''
+        code_str.append_line(f"@dataclass(init=True, eq=True{slots_str})")
         code_str.append_line(
             f"class {to_pascal_case(singularized_table_name)}(BaseModel):")
         code_str.append(members_code.to_str())
@@ -22,6 +22,11 @@ def main() -> int:
         '-o',
         '--output-path',
         help='A created model files output path.')
+    parser.add_argument(
+        '-s',
+        '--slots',
+        action='store_true',
+        help='Flag to create model classes that store their members in __slots__. Requires Python 3.10 or later.')
 
     try:
         args = parser.parse_args(sys.argv[1:])
@@ -29,7 +34,8 @@ def main() -> int:
             output_path = os.getcwd()
         else:
             output_path = args.output_path
-        Generator.generate_model_files(args.db_path, output_path)
+        Generator.generate_model_files(
+            args.db_path, output_path, args.slots)
         return 0
 
     except Exception as e:
@@ -1,33 +1,59 @@
 from abc import ABC
-import copy
-from dataclasses import dataclass, field
-from typing import ClassVar, Dict, Final, List, Type
+from dataclasses import dataclass
+import inspect
+from operator import attrgetter
+from sqlite3 import Cursor
+from types import MemberDescriptorType
+from typing import (
+    Any, Callable, ClassVar, Dict, Final, Iterator, List, Sequence, Tuple, Type)
 
 
 @dataclass()
 class BaseModel(ABC):
     """Base for model classes used by the user
+
+    Model classes can be declared with @dataclass(slots=True) to store
+    their members in slots instead of __dict__.
     """
 
+    __slots__ = ('__dirty',)
+
     def __post_init__(self):
         """Init data class funciton
         """
-        self.__set_cache()
+        self.__clear_dirty()
 
     #############
-    # Cache for update
+    # Dirty tracking for update
     #############
-    __cache: dict = field(
-        default_factory=lambda: dict(),
-        init=False,
-        compare=False)
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        bit = self.__class__.__get_member_bits().get(name)
+        if bit is not None:
+            object.__setattr__(
+                self,
+                '_BaseModel__dirty',
+                getattr(self, '_BaseModel__dirty', 0) | bit)
 
-    def __set_cache(self) -> None:
-        """Set cache for update
+    def __clear_dirty(self) -> None:
+        """Clear modified members flags
         """
-        members = self.members
-        for k in members:
-            self._BaseModel__cache[k] = members[k]  # type: ignore
+        object.__setattr__(self, '_BaseModel__dirty', 0)
+
+    def __iter_dirty_member_names(self) -> Iterator[str]:
+        """Iterate modified members names in declared order.
+
+        Yields
+        ------
+        str
+            Modified member name
+        """
+        member_names = self.get_member_names()
+        dirty = self.__dirty
+        while dirty:
+            bit = dirty & -dirty
+            yield member_names[bit.bit_length() - 1]
+            dirty ^= bit
 
     def __get_data_to_be_updated(self) -> dict:
         """Get data to be updated for update.
@@ -37,12 +63,58 @@ class BaseModel(ABC):
         dict
             Data to be updated
         """
-        data_to_be_updated = dict()
-        members = self.members
-        for k in members:
-            if members[k] != self._BaseModel__cache[k]:  # type: ignore
-                data_to_be_updated[k] = members[k]
-        return data_to_be_updated
+        return {k: getattr(self, k) for k in self.__iter_dirty_member_names()}
+
+    def mark_dirty(self, *member_names: str) -> None:
+        """Mark members as modified.
+
+        Assignments to members are tracked automatically,
+        call this after mutating a member value in place, such as appending to a list.
+
+        Parameters
+        ----------
+        member_names : str
+            Modified member names
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError if an unknown member name is specified
+        """
+        bits = self.__class__.__get_member_bits()
+        for name in member_names:
+            if name not in bits:
+                raise ValueError(f"Unknown member name: {name}")
+            self.__dirty |= bits[name]
+
+    @property
+    def dirty_member_names(self) -> Tuple[str, ...]:
+        """Modified members names in declared order
+        """
+        return tuple(self.__iter_dirty_member_names())
+
+    @property
+    def is_dirty(self) -> bool:
+        """Whether any member is modified
+        """
+        return self.__dirty != 0
+
+    @classmethod
+    def __get_member_bits(cls) -> Dict[str, int]:
+        """Get the flag bits of model members.
+
+        Returns
+        -------
+        Dict[str, int]
+            Flag bit per member name, the bit position is the declared order
+        """
+        if '__member_bits' not in cls.__dict__:
+            member_bits = {
+                n: 1 << i for i, n in enumerate(cls.get_member_names())}
+            setattr(cls, '__member_bits', member_bits)
+            return member_bits
+        else:
+            return getattr(cls, '__member_bits')
     #############
 
     #############
@@ -101,7 +173,7 @@ class BaseModel(ABC):
         List[str]
             Primary key names
         """
-        if not hasattr(cls, '__pks'):
+        if '__pks' not in cls.__dict__:
             pks = list()
             for k, v in cls.__annotations__.items():
                 if hasattr(v, '__origin__') and v.__origin__ is Final:
@@ -124,12 +196,10 @@ class BaseModel(ABC):
     @property
     def members(self) -> Dict:
         """Model members dict("name": value)
+
+        The dict is a shallow copy, member values are not copied.
         """
-        excludes = ['_BaseModel__cache']
-        members = copy.deepcopy(vars(self))
-        for keyword in excludes:
-            del members[keyword]
-        return members
+        return dict(zip(self.get_member_names(), self.to_tuple()))
 
     @classmethod
     def get_member_names(cls) -> List[str]:
@@ -140,25 +210,155 @@ class BaseModel(ABC):
         List[str]
             Model members names
         """
-        member_names = list()
-        for k, v in cls.__annotations__.items():
-            if not hasattr(v, '__origin__'):
-                member_names.append(k)
-            elif v.__origin__ is not ClassVar:
-                member_names.append(k)
-        return member_names
+        if '__member_names' not in cls.__dict__:
+            member_names = list()
+            for k, v in cls.__annotations__.items():
+                if not hasattr(v, '__origin__'):
+                    member_names.append(k)
+                elif v.__origin__ is not ClassVar:
+                    member_names.append(k)
+            setattr(cls, '__member_names', member_names)
+            return member_names
+        else:
+            return getattr(cls, '__member_names')
+
+    @classmethod
+    def clear_metadata_cache(cls) -> None:
+        """Clear cached primary key names and members names.
+
+        Call this when the model class is redefined.
+        """
+        for name in [
+                '__pks', '__member_names', '__values_getter', '__member_bits',
+                '__row_hydrator']:
+            if name in cls.__dict__:
+                delattr(cls, name)
+
+    @classmethod
+    def __get_values_getter(cls) -> Callable[[Any], Tuple]:
+        """Get a function that reads model members values as a tuple.
+
+        Returns
+        -------
+        Callable[[Any], Tuple]
+            Function that reads model members values in declared order
+        """
+        if '__values_getter' not in cls.__dict__:
+            member_names = cls.get_member_names()
+            if 1 < len(member_names):
+                values_getter = attrgetter(*member_names)
+            else:
+                # attrgetter does not return a tuple for a single name.
+                getters = [attrgetter(n) for n in member_names]
+
+                def values_getter(o):
+                    return tuple(g(o) for g in getters)
+            setattr(cls, '__values_getter', values_getter)
+            return values_getter
+        else:
+            return getattr(cls, '__values_getter')
+
+    @classmethod
+    def get_row_hydrator(cls) -> Callable[[Sequence], Any]:
+        """Get a function that builds a model from a row.
+
+        The function is generated per class on first use.
+        It creates the model without calling __init__ and __post_init__,
+        and sets members values directly in declared order
+        with no modified members, so it skips default values, default factories
+        and any validation in them.
+        The row values must be in declared member order, such as SELECT *.
+
+        Returns
+        -------
+        Callable[[Sequence], Any]
+            Function that receives a row and returns a model
+        """
+        if '__row_hydrator' in cls.__dict__:
+            return getattr(cls, '__row_hydrator')
+
+        member_names = cls.get_member_names()
+        namespace: Dict[str, Any] = {
+            'new': object.__new__,
+            'cls': cls,
+            'set_dirty': BaseModel.__dict__['_BaseModel__dirty'].__set__,
+        }
+        lines = [
+            'def hydrate(row):',
+            '    o = new(cls)',
+            '    set_dirty(o, 0)',
+        ]
+        dict_items = []
+        for i, name in enumerate(member_names):
+            descriptor = inspect.getattr_static(cls, name, None)
+            if isinstance(descriptor, MemberDescriptorType):
+                # A member in __slots__
+                namespace[f"set_{i}"] = descriptor.__set__
+                lines.append(f"    set_{i}(o, row[{i}])")
+            else:
+                dict_items.append(f"{name!r}: row[{i}]")
+        if 0 < len(dict_items):
+            lines.append(f"    o.__dict__.update({{{', '.join(dict_items)}}})")
+        lines.append('    return o')
+        exec('\n'.join(lines), namespace)
+        row_hydrator = namespace['hydrate']
+        setattr(cls, '__row_hydrator', row_hydrator)
+        return row_hydrator
+
+    @classmethod
+    def from_row(cls, row: Sequence):
+        """Build a model from a row without calling __init__.
+
+        See get_row_hydrator.
+
+        Parameters
+        ----------
+        row : Sequence
+            Members values in declared order
+
+        Returns
+        -------
+        Model Type
+            Built model with no modified members
+        """
+        return cls.get_row_hydrator()(row)
+
+    @classmethod
+    def get_row_factory(cls) -> Callable[[Cursor, Sequence], Any]:
+        """Get a function to be set to Connection.row_factory or Cursor.row_factory.
+
+        Returns
+        -------
+        Callable[[Cursor, Sequence], Any]
+            Function that builds a model from a row by get_row_hydrator
+        """
+        row_hydrator = cls.get_row_hydrator()
+
+        def row_factory(cursor: Cursor, row: Sequence):
+            return row_hydrator(row)
+        return row_factory
 
     @property
     def member_names(self) -> List[str]:
         """Model members names
         """
-        return list(self.members.keys())
+        return list(self.get_member_names())
 
     @property
     def values(self) -> List:
         """Model members values
         """
-        return list(self.members.values())
+        return list(self.to_tuple())
+
+    def to_tuple(self) -> Tuple:
+        """Convert model data to tuple without copying.
+
+        Returns
+        -------
+        Tuple
+            Model members values in declared order
+        """
+        return self.__class__.__get_values_getter()(self)
 
     def to_dict(self) -> dict:
         """Convert model data to dict.
@@ -167,6 +367,7 @@ class BaseModel(ABC):
         -------
         dict
             Converted model data as dict
+            The dict is a shallow copy, member values are not copied.
         """
         return self.members
     #############
@@ -14,6 +14,7 @@ class DBForTestCreator:
         self.__create_user_edited_histories_table(con)
         self.__create_all_optional_columns_table(con)
         self.__create_products_table(con)
+        self.__create_order_items_table(con)
         con.commit()
 
     def __create_users_table(self, con: Connection) -> None:
@@ -57,6 +58,22 @@ class DBForTestCreator:
         """
         con.execute(sql)
 
+    def __create_order_items_table(self, con: Connection) -> None:
+        sql = """CREATE TABLE IF NOT EXISTS order_items
+        (
+            order_id integer not null,
+            item_no integer not null,
+            quantity integer not null,
+            primary key (order_id, item_no)
+        )
+        """
+        con.execute(sql)
+
+
+def create_test_db(dir: str, filename: str = "test.db") -> str:
+    DBForTestCreator(dir, filename).create()
+    return os.path.join(dir, filename)
+
 
 def main():
     db = DBForTestCreator()
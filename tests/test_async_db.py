@@ -0,0 +1,146 @@
+import tests.import_path_resolver
+import asyncio
+import os
+import sqlite3
+import sys
+import pytest
+from pytest import main
+from typing import Final
+
+from pyqlite.db import AsyncDB, DB
+from example.model import User
+from tests.create_test_db import DBForTestCreator
+
+currnet_dir: Final[str] = os.path.dirname(__file__)
+db_filepath: Final[str] = os.path.join(currnet_dir, 'test.db')
+
+
+class TestAsyncDB:
+
+    def setup_method(self):
+        if os.path.exists(db_filepath):
+            os.remove(db_filepath)
+        db_creator = DBForTestCreator(currnet_dir)
+        db_creator.create()
+
+    @classmethod
+    def teardown_class(cls):
+        if os.path.exists(db_filepath):
+            os.remove(db_filepath)
+
+    @pytest.mark.async_db
+    def test_insert_find_update_delete(self):
+        async def run():
+            async with AsyncDB.transaction_scope(db_filepath) as tran:
+                assert await tran.insert(User(1, 'TestUser', '123')) == 1
+                assert await tran.bulk_insert(
+                    [User(2, 'TestUser2', '123'), User(3, 'TestUser3', '123')]) == 2
+                assert await tran.find(User, 1) == User(1, 'TestUser', '123')
+                assert await tran.find_by(User, 'name = ?', ['TestUser2']) \
+                    == User(2, 'TestUser2', '123')
+                assert await tran.update(
+                    User, {'phone': '456'}, 'id = ?', [3]) == 1
+                assert await tran.delete(User, 'id = ?', [2]) == 1
+                assert await tran.where(User) == [
+                    User(1, 'TestUser', '123'), User(3, 'TestUser3', '456')]
+                await tran.commit()
+
+        asyncio.run(run())
+        with DB.transaction_scope(db_filepath) as tran:
+            assert len(tran.where(User)) == 2
+
+    @pytest.mark.async_db
+    def test_uncommitted_changes_are_rolled_back(self):
+        async def run():
+            async with AsyncDB.transaction_scope(db_filepath) as tran:
+                await tran.insert(User(1, 'TestUser', '123'))
+
+        asyncio.run(run())
+        with DB.transaction_scope(db_filepath) as tran:
+            assert tran.where(User) == []
+
+    @pytest.mark.async_db
+    def test_operations_run_on_a_dedicated_thread(self):
+        async def run():
+            async with AsyncDB.transaction_scope(db_filepath) as tran:
+                await tran.insert(User(1, 'TestUser', '123'))
+                # SQLite connections refuse to be used from another thread,
+                # so reaching here proves every call shares one worker thread.
+                rows = await tran.execute(
+                    'SELECT id FROM users WHERE id = ?', [1])
+                assert rows == [(1,)]
+
+        asyncio.run(run())
+
+    @pytest.mark.async_db
+    def test_iter_where(self):
+        async def run():
+            async with AsyncDB.transaction_scope(db_filepath) as tran:
+                await tran.bulk_insert(
+                    [User(i, f"TestUser{i}", '123') for i in range(1, 11)])
+                return [
+                    user.id async for user in tran.iter_where(
+                        User, 'id > ?', [3], batch_size=3)]
+
+        assert asyncio.run(run()) == list(range(4, 11))
+
+    @pytest.mark.async_db
+    def test_iter_where_break(self):
+        async def run():
+            async with AsyncDB.transaction_scope(db_filepath) as tran:
+                await tran.bulk_insert(
+                    [User(i, f"TestUser{i}", '123') for i in range(1, 11)])
+                ids = []
+                async for user in tran.iter_where(User, batch_size=2):
+                    ids.append(user.id)
+                    if len(ids) == 3:
+                        break
+                assert await tran.find(User, 10) == User(10, 'TestUser10', '123')
+                return ids
+
+        assert asyncio.run(run()) == [1, 2, 3]
+
+    @pytest.mark.async_db
+    def test_concurrent_tasks(self):
+        async def run():
+            async with AsyncDB.transaction_scope(db_filepath) as tran:
+                await asyncio.gather(*[
+                    tran.insert(User(i, f"TestUser{i}", '123'))
+                    for i in range(1, 21)])
+                return len(await tran.where(User))
+
+        assert asyncio.run(run()) == 20
+
+    @pytest.mark.async_db
+    def test_aggregates(self):
+        async def run():
+            async with AsyncDB.transaction_scope(db_filepath) as tran:
+                await tran.bulk_insert(
+                    [User(i, f"TestUser{i}", '123') for i in range(1, 6)])
+                assert await tran.count(User, 'id > ?', [3]) == 2
+                assert await tran.exists(User, 'id = ?', [6]) is False
+                return await tran.aggregate(User, {'largest': 'max(id)'})
+
+        assert asyncio.run(run()) == {'largest': 5}
+
+    @pytest.mark.async_db
+    def test_open_error(self):
+        invalid_filepath = os.path.join(currnet_dir, 'not_exists', 'test.db')
+
+        async def run():
+            with pytest.raises(sqlite3.OperationalError):
+                await AsyncDB.open(invalid_filepath)
+            with pytest.raises(sqlite3.OperationalError):
+                async with AsyncDB.transaction_scope(invalid_filepath):
+                    pass
+            db = AsyncDB(invalid_filepath)
+            with pytest.raises(sqlite3.OperationalError) as e:
+                await db.find(User, 1)
+            assert str(e.value) == 'unable to open database file'
+            await db.close()
+
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import sqlite3
+import sys
+import pytest
+from pytest import main
+from dataclasses import dataclass
+from typing import ClassVar, Final, List, Optional
+
+import tests.import_path_resolver
+from pyqlite.model import BaseModel
+from example.model import User
+
+
+@dataclass(init=True, eq=True)
+class Tag(BaseModel):
+    id: Final[int]
+    names: List[str]
+    __table_name: ClassVar[str] = 'tags'
+
+
+@dataclass(init=True, eq=True, slots=True)
+class SlottedUser(BaseModel):
+    id: Final[int]
+    name: str
+    phone: str
+    address: Optional[str] = None
+    __table_name: ClassVar[str] = 'users'
+
+
+class TestBaseModel:
+    ###################
+    # Members
+    ###################
+    @pytest.mark.members
+    def test_to_tuple(self):
+        user = User(1, 'Taro', '123', 'Japan')
+        assert user.to_tuple() == (1, 'Taro', '123', 'Japan')
+
+    @pytest.mark.members
+    def test_to_dict_does_not_copy_values(self):
+        tag = Tag(1, ['a'])
+        assert tag.to_dict() == {'id': 1, 'names': ['a']}
+        assert tag.to_dict()['names'] is tag.names
+
+    @pytest.mark.members
+    def test_members_names_and_values(self):
+        user = User(1, 'Taro', '123')
+        assert user.member_names == ['id', 'name', 'phone', 'address']
+        assert user.values == [1, 'Taro', '123', None]
+
+    ###################
+    # Dirty tracking
+    ###################
+    @pytest.mark.dirty_tracking
+    def test_new_model_is_not_dirty(self):
+        user = User(1, 'Taro', '123', 'Japan')
+        assert not user.is_dirty
+        assert user.dirty_member_names == ()
+
+    @pytest.mark.dirty_tracking
+    def test_data_to_be_updated_in_declared_order(self):
+        user = User(1, 'Taro', '123', 'Japan')
+        user.address = 'USA'
+        user.name = 'Jiro'
+        assert user.is_dirty
+        assert user.dirty_member_names == ('name', 'address')
+        data_to_be_updated = getattr(
+            user, '_BaseModel__get_data_to_be_updated')()
+        assert data_to_be_updated == {'name': 'Jiro', 'address': 'USA'}
+
+    @pytest.mark.dirty_tracking
+    def test_data_to_be_updated_with_mutated_value(self):
+        tag = Tag(1, ['a'])
+        tag.names.append('b')
+        assert not tag.is_dirty
+
+        tag.mark_dirty('names')
+        data_to_be_updated = getattr(
+            tag, '_BaseModel__get_data_to_be_updated')()
+        assert data_to_be_updated == {'names': ['a', 'b']}
+
+    @pytest.mark.dirty_tracking
+    def test_mark_dirty_with_unknown_member(self):
+        tag = Tag(1, ['a'])
+        with pytest.raises(ValueError) as e:
+            tag.mark_dirty('tags')
+        assert str(e.value) == 'Unknown member name: tags'
+
+    ###################
+    # Slots
+    ###################
+    @pytest.mark.slots
+    def test_slotted_model_has_no_dict(self):
+        user = SlottedUser(1, 'Taro', '123', 'Japan')
+        assert not hasattr(user, '__dict__')
+        assert user.to_dict() == {
+            'id': 1, 'name': 'Taro', 'phone': '123', 'address': 'Japan'}
+
+    @pytest.mark.slots
+    def test_slotted_model_data_to_be_updated(self):
+        user = SlottedUser(1, 'Taro', '123', 'Japan')
+        user.address = 'USA'
+        data_to_be_updated = getattr(
+            user, '_BaseModel__get_data_to_be_updated')()
+        assert data_to_be_updated == {'address': 'USA'}
+
+    @pytest.mark.slots
+    def test_slotted_model_equality(self):
+        assert SlottedUser(1, 'Taro', '123') == SlottedUser(1, 'Taro', '123')
+        assert SlottedUser.get_table_name() == 'users'
+        assert SlottedUser.get_pks() == ['id']
+
+    ###################
+    # Row hydration
+    ###################
+    @pytest.mark.row_hydration
+    def test_from_row(self):
+        user = User.from_row((1, 'Taro', '123', None))
+        assert user == User(1, 'Taro', '123')
+        assert not user.is_dirty
+        user.name = 'Jiro'
+        assert user.dirty_member_names == ('name',)
+
+    @pytest.mark.row_hydration
+    def test_from_row_slotted_model(self):
+        user = SlottedUser.from_row((1, 'Taro', '123', 'Japan'))
+        assert user == SlottedUser(1, 'Taro', '123', 'Japan')
+        assert not hasattr(user, '__dict__')
+        assert not user.is_dirty
+        user.address = 'USA'
+        assert user.dirty_member_names == ('address',)
+
+    @pytest.mark.row_hydration
+    def test_row_hydrator_is_cached(self):
+        assert User.get_row_hydrator() is User.get_row_hydrator()
+        hydrator = Tag.get_row_hydrator()
+        Tag.clear_metadata_cache()
+        assert Tag.get_row_hydrator() is not hydrator
+
+    @pytest.mark.row_hydration
+    def test_row_factory(self):
+        con = sqlite3.connect(':memory:')
+        con.row_factory = User.get_row_factory()
+        row = con.execute("SELECT 1, 'Taro', '123', NULL").fetchone()
+        assert row == User(1, 'Taro', '123')
+        con.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+import tests.import_path_resolver
+import os
+import sys
+import threading
+import time
+import pytest
+from pytest import main
+from typing import Final
+
+from pyqlite.db import ConnectionPool, DB, IsolationLevel
+from example.model import User
+from tests.create_test_db import DBForTestCreator
+
+currnet_dir: Final[str] = os.path.dirname(__file__)
+db_filepath: Final[str] = os.path.join(currnet_dir, 'test.db')
+
+
+class TestConnectionPool:
+
+    @classmethod
+    def setup_class(cls):
+        if os.path.exists(db_filepath):
+            os.remove(db_filepath)
+        db_creator = DBForTestCreator(currnet_dir)
+        db_creator.create()
+
+    @classmethod
+    def teardown_class(cls):
+        if os.path.exists(db_filepath):
+            os.remove(db_filepath)
+
+    @pytest.mark.connection_pool
+    def test_acquire_reuses_returned_connection(self):
+        pool = ConnectionPool(db_filepath, max_size=2)
+        con = pool.acquire()
+        pool.release(con)
+        assert pool.acquire() is con
+        assert pool.size == 1
+        pool.close()
+
+    @pytest.mark.connection_pool
+    def test_acquire_timeout_when_pool_is_full(self):
+        pool = ConnectionPool(db_filepath, max_size=1)
+        pool.acquire()
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+
+    @pytest.mark.connection_pool
+    def test_acquire_timeout_is_not_restarted_by_wake_ups(self):
+        pool = ConnectionPool(db_filepath, max_size=1, health_check=False)
+        stop = threading.Event()
+
+        def churn():
+            # Returns the connection often, but takes it back at once.
+            # Stops in a second, so that a restarted timeout fails rather than hangs.
+            deadline = time.monotonic() + 1
+            while not stop.is_set() and time.monotonic() < deadline:
+                con = pool.acquire()
+                time.sleep(0.02)
+                pool.release(con)
+        thread = threading.Thread(target=churn)
+        thread.start()
+        time.sleep(0.01)
+        start = time.monotonic()
+        try:
+            pool.release(pool.acquire(timeout=0.1))
+        except TimeoutError:
+            pass
+        finally:
+            elapsed = time.monotonic() - start
+            stop.set()
+            thread.join()
+        assert elapsed < 0.5
+        pool.close()
+
+    @pytest.mark.connection_pool
+    def test_release_twice(self):
+        pool = ConnectionPool(db_filepath, max_size=2)
+        con = pool.acquire()
+        pool.release(con)
+        with pytest.raises(ValueError) as e:
+            pool.release(con)
+        assert str(e.value) == 'The connection is not checked out from this pool'
+        assert pool.idle_count == 1
+        assert pool.acquire() is con
+        assert pool.acquire() is not con
+        pool.close()
+
+    @pytest.mark.connection_pool
+    def test_acquire_waits_for_returned_connection(self):
+        pool = ConnectionPool(db_filepath, max_size=1)
+        con = pool.acquire()
+        acquired = []
+
+        def acquire():
+            acquired.append(pool.acquire(timeout=5))
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        pool.release(con)
+        thread.join()
+        assert acquired == [con]
+
+    @pytest.mark.connection_pool
+    def test_acquire_replaces_broken_connection(self):
+        pool = ConnectionPool(db_filepath)
+        con = pool.acquire()
+        pool.release(con)
+        con.close()
+        new_con = pool.acquire()
+        assert new_con is not con
+        assert new_con.execute('SELECT 1').fetchone() == (1,)
+        assert pool.size == 1
+
+    @pytest.mark.connection_pool
+    def test_release_rolls_back(self):
+        pool = ConnectionPool(db_filepath, max_size=1)
+        with pool.connection() as con:
+            con.execute("INSERT INTO users VALUES (1, 'Taro', '123', NULL)")
+        with pool.connection() as con:
+            assert con.execute('SELECT * FROM users').fetchall() == []
+
+    @pytest.mark.connection_pool
+    def test_acquire_from_closed_pool(self):
+        pool = ConnectionPool(db_filepath)
+        pool.close()
+        with pytest.raises(ValueError) as e:
+            pool.acquire()
+        assert str(e.value) == 'The connection pool is closed'
+
+    @pytest.mark.transaction_scope
+    def test_transaction_scope_with_pool(self):
+        pool = DB.pool(db_filepath, size=1)
+        with DB.transaction_scope(pool=pool) as transaction:
+            transaction.insert(User(1, 'TestUser', '123', 'Japan'))
+            con = transaction.con
+            assert transaction.find(User, 1) is not None
+
+        with DB.transaction_scope(
+                pool=pool,
+                isolation_level=IsolationLevel.IMMEDIATE) as transaction:
+            assert transaction.con is con
+            assert transaction.con.isolation_level == 'IMMEDIATE'
+            assert transaction.find(User, 1) is None
+        assert pool.idle_count == 1
+        pool.close()
+
+    @pytest.mark.transaction_scope
+    def test_transaction_scope_without_db_filepath_and_pool(self):
+        with pytest.raises(ValueError) as e:
+            with DB.transaction_scope():
+                pass
+        assert str(
+            e.value) == 'Either db_filepath or pool must be specified'
+
+
+if __name__ == '__main__':
+    sys.exit(main())
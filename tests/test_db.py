@@ -1,14 +1,17 @@
 import tests.import_path_resolver
+import array
 from logging import INFO, WARNING
 import os
 import sqlite3
 import sys
 import pytest
 from pytest import main
-from typing import Final
+from dataclasses import dataclass
+from typing import ClassVar, Final
 
-from pyqlite.db import DB, IsolationLevel
-from example.model import User, UserEditedHistory, user
+from pyqlite.db import BulkInsertStrategy, DB, IsolationLevel
+from pyqlite.model import BaseModel
+from example.model import OrderItem, User, UserEditedHistory, user
 from tests.create_test_db import DBForTestCreator
 
 currnet_dir: Final[str] = os.path.dirname(__file__)
@@ -90,6 +93,82 @@ class TestDB:
             assert str(
                 e.value) == 'The number of primary keys and primary key values do not match'
 
+    ###################
+    # find_many
+    ###################
+    @pytest.mark.find_many
+    def test_find_many_in_input_order(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 4)]
+            transaction.bulk_insert(users)
+
+            found_users = transaction.find_many(User, [3, 9, 1, (2,), 3])
+            assert found_users == [users[2], None, users[0], users[1], users[2]]
+
+    @pytest.mark.find_many
+    def test_find_many_with_multiple_primary_keys(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            items = [OrderItem(1, 1, 10), OrderItem(1, 2, 20),
+                     OrderItem(2, 1, 30)]
+            transaction.bulk_insert(items)
+
+            found_items = transaction.find_many(
+                OrderItem, [(2, 1), (1, 3), (1, 1)])
+            assert found_items == [items[2], None, items[0]]
+
+    @pytest.mark.find_many
+    def test_find_many_as_dict(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 4)]
+            transaction.bulk_insert(users)
+
+            found_users = transaction.find_many(User, [2, 9], as_dict=True)
+            assert found_users == {(2,): users[1], (9,): None}
+
+    @pytest.mark.find_many
+    def test_find_many_chunked(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 6)]
+            transaction.bulk_insert(users)
+            # 2 primary key values per statement
+            transaction.con.setlimit(
+                sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 2)
+
+            found_users = transaction.find_many(User, range(5, 0, -1))
+            assert found_users == list(reversed(users))
+
+    @pytest.mark.find_many
+    def test_find_many_with_converted_pk_values(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 3)]
+            transaction.bulk_insert(users)
+
+            # '1' is converted to 1 by the integer affinity as find does.
+            assert transaction.find(User, '1') == users[0]
+            found_users = transaction.find_many(User, ['1', 2, 1, '9'])
+            assert found_users == [users[0], users[1], users[0], None]
+
+    @pytest.mark.find_many
+    def test_find_many_with_empty_pk_values(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            assert transaction.find_many(User, []) == []
+
+    @pytest.mark.find_many
+    def test_find_many_no_primary_key_model(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            with pytest.raises(ValueError) as e:
+                transaction.find_many(UserEditedHistory, [1])
+            assert str(
+                e.value) == 'Cannot use find_many method because this class does not have any primary keys'
+
+    @pytest.mark.find_many
+    def test_find_many_primary_keys_and_primary_key_values_do_not_match(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            with pytest.raises(ValueError) as e:
+                transaction.find_many(User, [(1, 'TestUser')])
+            assert str(
+                e.value) == 'The number of primary keys and primary key values do not match'
+
     ###################
     # find_by
     ###################
@@ -273,6 +352,325 @@ class TestDB:
             assert str(
                 e.value) == 'Both where and values must be passed, or not passed both'
 
+    @pytest.mark.where
+    def test_where_with_columns(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.bulk_insert([
+                User(1, 'TestUser', '123', 'Japan'),
+                User(2, 'TestUser2', '456', 'USA'),
+            ])
+            rows = transaction.where(User, 'id > ?', [0], ['phone', 'id'])
+            assert rows == [(1, '123'), (2, '456')]
+            assert rows[0]._fields == ('id', 'phone')
+            assert rows[1].phone == '456'
+            assert type(rows[0]) is type(transaction.where(User, columns=['id', 'phone'])[0])
+
+    @pytest.mark.where
+    def test_find_by_with_columns(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.insert(User(1, 'TestUser', '123', 'Japan'))
+            row = transaction.find_by(User, 'id = ?', [1], ['address'])
+            assert row.address == 'Japan'
+            assert transaction.find_by(User, 'id = ?', [2], ['address']) is None
+
+            with pytest.raises(ValueError) as e:
+                transaction.update_by_model(row)
+            assert str(
+                e.value) == 'Cannot update a partial model, find it without columns to update'
+
+    ###################
+    # iter_where
+    ###################
+    @pytest.mark.iter_where
+    def test_iter_where_with_qmark_params_data_found(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            user = User(1, 'TestUser', '123', 'Japan')
+            user2 = User(2, 'TestUser2', '123', 'Japan')
+            user3 = User(3, 'TestUse3', '123', 'Australia')
+            transaction.bulk_insert([user, user2, user3])
+
+            found_users = transaction.iter_where(
+                User, 'address = ?', ['Japan'], batch_size=1)
+            assert list(found_users) == [user, user2]
+
+    @pytest.mark.iter_where
+    def test_iter_where_with_yield_batches(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 6)]
+            transaction.bulk_insert(users)
+
+            batches = list(transaction.iter_where(
+                User, batch_size=2, yield_batches=True))
+            assert batches == [users[0:2], users[2:4], users[4:5]]
+
+    @pytest.mark.iter_where
+    def test_iter_where_stopped_early(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 6)]
+            transaction.bulk_insert(users)
+
+            found_users = transaction.iter_where(User, batch_size=2)
+            assert next(found_users) == users[0]
+            found_users.close()
+            with pytest.raises(StopIteration):
+                next(found_users)
+
+    @pytest.mark.iter_where
+    def test_iter_where_with_invalid_batch_size(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            with pytest.raises(ValueError) as e:
+                transaction.iter_where(User, batch_size=0)
+            assert str(e.value) == 'batch_size must be 1 or more'
+
+    @pytest.mark.iter_where
+    def test_iter_where_with_only_where(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            with pytest.raises(ValueError) as e:
+                transaction.iter_where(User, 'address = ?')
+            assert str(
+                e.value) == 'Both where and values must be passed, or not passed both'
+
+    ###################
+    # fetch_columns
+    ###################
+    @pytest.mark.fetch_columns
+    def test_fetch_columns(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.bulk_insert(
+                [User(i, f"TestUser{i}", '123') for i in range(1, 6)])
+            columns = transaction.fetch_columns(
+                User, 'id > ?', [1], batch_size=2)
+            assert list(columns.keys()) == ['id', 'name', 'phone', 'address']
+            assert columns['id'] == array.array('q', [2, 3, 4, 5])
+            assert columns['name'] == [f"TestUser{i}" for i in range(2, 6)]
+            assert columns['address'] == [None] * 4
+
+    @pytest.mark.fetch_columns
+    def test_fetch_columns_with_columns(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.bulk_insert(
+                [OrderItem(1, i, i * 10) for i in range(1, 4)])
+            columns = transaction.fetch_columns(
+                OrderItem, columns=['quantity', 'item_no'])
+            assert columns == {
+                'item_no': array.array('q', [1, 2, 3]),
+                'quantity': array.array('q', [10, 20, 30]),
+            }
+            assert transaction.fetch_columns(OrderItem, 'order_id = ?', [2]) == {
+                'order_id': array.array('q'),
+                'item_no': array.array('q'),
+                'quantity': array.array('q'),
+            }
+
+    @pytest.mark.fetch_columns
+    def test_fetch_columns_null_in_typed_column(self):
+        # Declared as not null types for the nullable columns
+        @dataclass
+        class TypedColumns(BaseModel):
+            col1: str
+            col2: int
+            col3: float
+            __table_name: ClassVar[str] = 'all_optional_columns'
+
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.execute(
+                "INSERT INTO all_optional_columns VALUES "
+                "('a', 1, 1.5), ('b', 2, 2.5), ('c', NULL, 3.5)")
+            columns = transaction.fetch_columns(TypedColumns, batch_size=2)
+            assert columns['col2'] == [1, 2, None]
+            assert columns['col3'] == array.array('d', [1.5, 2.5, 3.5])
+
+    @pytest.mark.fetch_columns
+    def test_fetch_columns_as_numpy(self):
+        numpy = pytest.importorskip('numpy')
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.bulk_insert(
+                [User(i, f"TestUser{i}", '123') for i in range(1, 4)])
+            columns = transaction.fetch_columns(User, as_numpy=True)
+            assert isinstance(columns['id'], numpy.ndarray)
+            assert columns['id'].dtype == numpy.int64
+            assert columns['id'].tolist() == [1, 2, 3]
+            assert columns['name'].tolist() == [
+                'TestUser1', 'TestUser2', 'TestUser3']
+
+    @pytest.mark.fetch_columns
+    def test_fetch_columns_as_numpy_not_installed(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'numpy', None)
+        with DB.transaction_scope(db_filepath) as transaction:
+            with pytest.raises(ImportError) as e:
+                transaction.fetch_columns(User, as_numpy=True)
+            assert str(e.value) == 'NumPy must be installed to use as_numpy'
+
+    @pytest.mark.fetch_columns
+    def test_fetch_columns_invalid_batch_size(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            with pytest.raises(ValueError) as e:
+                transaction.fetch_columns(User, batch_size=0)
+            assert str(e.value) == 'batch_size must be 1 or more'
+
+    ###################
+    # Aggregate
+    ###################
+    @pytest.mark.count
+    def test_count(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            assert transaction.count(User) == 0
+            transaction.bulk_insert(
+                [User(i, f"TestUser{i}", '123') for i in range(1, 6)])
+            assert transaction.count(User) == 5
+            assert transaction.count(User, 'id > ?', [2]) == 3
+            assert transaction.count(User, 'id > :id', {'id': 5}) == 0
+
+    @pytest.mark.count
+    def test_count_with_only_where(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            with pytest.raises(ValueError) as e:
+                transaction.count(User, 'id > ?')
+            assert str(
+                e.value) == 'Both where and values must be passed, or not passed both'
+
+    @pytest.mark.exists
+    def test_exists(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            assert transaction.exists(User) is False
+            transaction.insert(User(1, 'TestUser', '123'))
+            assert transaction.exists(User) is True
+            assert transaction.exists(User, 'name = ?', ['TestUser']) is True
+            assert transaction.exists(User, 'name = ?', ['Nobody']) is False
+
+    @pytest.mark.aggregate
+    def test_aggregate(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.bulk_insert([
+                OrderItem(1, 1, 10), OrderItem(1, 2, 20), OrderItem(2, 1, 5)])
+            assert transaction.aggregate(OrderItem, {
+                'total': 'sum(quantity)',
+                'smallest': 'min(quantity)',
+                'largest': 'max(quantity)',
+                'order': 'count(*)',
+            }) == {'total': 35, 'smallest': 5, 'largest': 20, 'order': 3}
+            assert transaction.aggregate(
+                OrderItem, {'total': 'sum(quantity)'}, 'order_id = ?', [3]) \
+                == {'total': None}
+
+    @pytest.mark.aggregate
+    def test_aggregate_with_group_by(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.bulk_insert([
+                OrderItem(1, 1, 10), OrderItem(1, 2, 20), OrderItem(2, 1, 5)])
+            assert transaction.aggregate(
+                OrderItem,
+                {'total': 'sum(quantity)', 'items': 'count(*)'},
+                'quantity > ?', [5],
+                group_by=['order_id']) == [
+                    {'order_id': 1, 'total': 30, 'items': 2}]
+            assert transaction.aggregate(
+                OrderItem, {'total': 'sum(quantity)'},
+                group_by=['item_no', 'order_id']) == [
+                    {'order_id': 1, 'item_no': 1, 'total': 10},
+                    {'order_id': 1, 'item_no': 2, 'total': 20},
+                    {'order_id': 2, 'item_no': 1, 'total': 5}]
+
+    ###################
+    # paginate
+    ###################
+    @pytest.mark.paginate
+    def test_paginate_all_pages(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 6)]
+            transaction.bulk_insert(users)
+
+            page, cursor = transaction.paginate(User, limit=2)
+            assert page == users[0:2]
+            page, cursor = transaction.paginate(User, after=cursor, limit=2)
+            assert page == users[2:4]
+            page, cursor = transaction.paginate(User, after=cursor, limit=2)
+            assert page == users[4:5]
+            assert cursor is None
+
+    @pytest.mark.paginate
+    def test_paginate_with_pk_tuple_and_qmark_params(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123', 'Japan' if i % 2 else 'USA')
+                     for i in range(1, 6)]
+            transaction.bulk_insert(users)
+
+            page, cursor = transaction.paginate(
+                User, 'address = ?', ['Japan'], after=(1,), limit=1)
+            assert page == [users[2]]
+            page, cursor = transaction.paginate(
+                User, 'address = ?', ['Japan'], after=cursor, limit=1)
+            assert page == [users[4]]
+
+    @pytest.mark.paginate
+    def test_paginate_with_multiple_primary_keys(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            items = [OrderItem(1, 1, 10), OrderItem(1, 2, 20),
+                     OrderItem(2, 1, 30)]
+            transaction.bulk_insert(items)
+
+            page, cursor = transaction.paginate(OrderItem, limit=2)
+            assert page == items[0:2]
+            page, cursor = transaction.paginate(
+                OrderItem, after=cursor, limit=2)
+            assert page == items[2:3]
+            assert cursor is None
+
+    @pytest.mark.paginate
+    def test_paginate_with_named_params(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123', 'Japan' if i % 2 else 'USA')
+                     for i in range(1, 6)]
+            transaction.bulk_insert(users)
+
+            page, cursor = transaction.paginate(
+                User, 'address = :address', {'address': 'USA'}, limit=5)
+            assert page == [users[1], users[3]]
+            assert cursor is None
+
+    @pytest.mark.paginate
+    def test_paginate_with_invalid_cursor(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            with pytest.raises(ValueError) as e:
+                transaction.paginate(User, after='invalid')
+            assert str(e.value) == 'Invalid cursor token'
+
+    @pytest.mark.paginate
+    def test_paginate_with_blob_primary_key(self):
+        @dataclass
+        class BlobKey(BaseModel):
+            key: Final[bytes]
+            value: int
+            __table_name: ClassVar[str] = 'blob_keys'
+
+        db = DB(db_filepath)
+        db.execute(
+            'CREATE TEMP TABLE blob_keys (key blob primary key, value integer)')
+        rows = [BlobKey(bytes([i, 255]), i) for i in range(3)]
+        db.bulk_insert(rows)
+        page, cursor = db.paginate(BlobKey, limit=2)
+        assert page == rows[0:2]
+        page, cursor = db.paginate(BlobKey, after=cursor, limit=2)
+        assert page == rows[2:3]
+        assert cursor is None
+        db.close()
+
+    @pytest.mark.paginate
+    def test_paginate_with_no_pks(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            with pytest.raises(ValueError) as e:
+                transaction.paginate(UserEditedHistory, after='invalid')
+            assert str(
+                e.value) == 'Cannot use pagination because this class does not have any primary keys'
+
+    @pytest.mark.paginate
+    def test_paginate_with_mismatched_after(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            with pytest.raises(ValueError) as e:
+                transaction.paginate(User, after=(1, 2))
+            assert str(
+                e.value) == 'The number of primary keys and primary key values do not match'
+
     ###################
     # Insert
     ###################
@@ -366,6 +764,123 @@ class TestDB:
             assert len(found_users) == 2
             assert found_users == [user1, user2]
 
+    @pytest.mark.bulk_insert
+    def test_bulk_insert_with_empty_list(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            assert transaction.bulk_insert([]) == 0
+
+    @pytest.mark.bulk_insert
+    def test_bulk_insert_with_generator(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 4)]
+            inserted_row_count = transaction.bulk_insert(u for u in users)
+            assert inserted_row_count == 3
+
+            found_users = transaction.where(User)
+            assert found_users == users
+
+    @pytest.mark.bulk_insert
+    def test_bulk_insert_with_generator_of_diferent_types_models(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            models = [
+                User(1, 'Taro', '123', 'Japan'),
+                UserEditedHistory('2022/10/31 12:34:56')
+            ]
+            with pytest.raises(ValueError) as e:
+                transaction.bulk_insert(m for m in models)
+            assert str(
+                e.value) == 'Multiple types of models cannot be specified'
+
+    @pytest.mark.bulk_insert
+    def test_bulk_insert_multi_row_values(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 4)]
+            inserted_row_count = transaction.bulk_insert(
+                users, strategy=BulkInsertStrategy.MULTI_ROW_VALUES)
+            assert inserted_row_count == 3
+
+            found_users = transaction.where(User)
+            assert found_users == users
+
+    @pytest.mark.bulk_insert
+    def test_bulk_insert_multi_row_values_chunked(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            # 2 rows of users per statement
+            transaction.con.setlimit(
+                sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 8)
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 6)]
+            inserted_row_count = transaction.bulk_insert(
+                (u for u in users),
+                strategy=BulkInsertStrategy.MULTI_ROW_VALUES)
+            assert inserted_row_count == 5
+
+            found_users = transaction.where(User)
+            assert found_users == users
+
+    @pytest.mark.bulk_insert
+    def test_bulk_insert_multi_row_values_duplicate_data_but_ignore(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            user1 = User(1, 'Taro', '123', 'Japan')
+            user2 = User(2, 'Jiro', '456', 'Australia')
+            user3 = User(2, 'Jiro', '456', 'Australia')
+            inserted_row_count = transaction.bulk_insert(
+                [user1, user2, user3],
+                strategy=BulkInsertStrategy.MULTI_ROW_VALUES)
+            assert inserted_row_count == 2
+
+            found_users = transaction.where(User)
+            assert found_users == [user1, user2]
+
+    ###################
+    # Upsert
+    ###################
+    @pytest.mark.upsert
+    def test_upsert_not_existing_data(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            user = User(1, 'TestUser', '123', 'Japan')
+            assert transaction.upsert(user) == 1
+
+            found_user = transaction.find(User, 1)
+            assert found_user == user
+
+    @pytest.mark.upsert
+    def test_upsert_existing_data(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.insert(User(1, 'TestUser', '123', 'Japan'))
+            user = User(1, 'Taro', '456', 'USA')
+            assert transaction.upsert(user) == 1
+
+            found_user = transaction.find(User, 1)
+            assert found_user == user
+
+    @pytest.mark.upsert
+    def test_upsert_with_update_columns(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.insert(User(1, 'TestUser', '123', 'Japan'))
+            transaction.upsert(
+                User(1, 'Taro', '456', 'USA'), update_columns=['address'])
+
+            found_user = transaction.find(User, 1)
+            assert found_user == User(1, 'TestUser', '123', 'USA')
+
+    @pytest.mark.bulk_upsert
+    def test_bulk_upsert(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.insert(User(1, 'TestUser', '123', 'Japan'))
+            users = [
+                User(1, 'Taro', '123', 'Japan'),
+                User(2, 'Jiro', '456', 'Australia')
+            ]
+            assert transaction.bulk_upsert(u for u in users) == 2
+
+            found_users = transaction.where(User)
+            assert found_users == users
+
+    @pytest.mark.bulk_upsert
+    def test_bulk_upsert_with_empty_list(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            assert transaction.bulk_upsert([]) == 0
+
     ###################
     # Update
     ###################
@@ -395,6 +910,14 @@ class TestDB:
             user.address = user2.address = 'USA'
             assert found_users == [user, user2]
 
+    @pytest.mark.update
+    def test_update_with_qmark_params_in_any_column_order(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.insert(User(1, 'TestUser', '123', 'Japan'))
+            transaction.update(
+                User, {'address': 'USA', 'name': 'Taro'}, 'id = ?', [1])
+            assert transaction.find(User, 1) == User(1, 'Taro', '123', 'USA')
+
     @pytest.mark.update
     def test_update_with_qmark_params_and_no_where(self):
         with DB.transaction_scope(db_filepath) as transaction:
@@ -506,6 +1029,17 @@ class TestDB:
             user_after_change = transaction.find_by(
                 User, where, {'name': 'Taro'})
             assert user_after_change == user
+            assert not user.is_dirty
+
+    @pytest.mark.update_by_model
+    def test_update_by_model_with_mark_dirty(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            user = User(1, 'TestUser', '123', 'Japan')
+            transaction.insert(user)
+
+            assert transaction.update_by_model(user) == 0
+            user.mark_dirty('name')
+            assert transaction.update_by_model(user) == 1
 
     @pytest.mark.update_by_model
     def test_update_by_model_with_no_pk(self):
@@ -525,6 +1059,92 @@ class TestDB:
     def test_update_by_model_edited_pk(self):
         pass
 
+    @pytest.mark.bulk_update_by_model
+    def test_bulk_update_by_model(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 5)]
+            transaction.bulk_insert(users)
+
+            users[0].name = 'Taro'
+            users[1].address = 'Japan'
+            users[2].name = 'Saburo'
+            r = transaction.bulk_update_by_model(users)
+            assert r == (3, {('name',): 2, ('address',): 1})
+            assert all(not u.is_dirty for u in users)
+
+            found_users = transaction.where(User)
+            assert found_users == users
+
+    @pytest.mark.bulk_update_by_model
+    def test_bulk_update_by_model_rolls_back_all_groups(self):
+        db = DB(db_filepath)
+        users = [User(i, f"TestUser{i}", '123') for i in range(1, 3)]
+        db.bulk_insert(users)
+        db.commit()
+
+        users[0].address = 'Japan'
+        users[1].name = None
+        with pytest.raises(sqlite3.IntegrityError):
+            db.bulk_update_by_model(users)
+        assert db.find(User, 1).address is None
+        assert users[0].dirty_member_names == ('address',)
+        db.rollback()
+
+        db.delete(User)
+        db.commit()
+        db.close()
+
+    @pytest.mark.bulk_update_by_model
+    def test_bulk_update_by_model_does_not_commit(self):
+        db = DB(db_filepath)
+        db.insert(User(1, 'TestUser1', '123'))
+        db.commit()
+        db.close()
+
+        with DB.transaction_scope(db_filepath) as transaction:
+            user = transaction.find(User, 1)
+            user.name = 'changed'
+            transaction.bulk_update_by_model([user])
+            assert transaction.con.in_transaction
+
+        db = DB(db_filepath)
+        assert db.find(User, 1).name == 'TestUser1'
+        db.delete(User)
+        db.commit()
+        db.close()
+
+    @pytest.mark.bulk_update_by_model
+    def test_bulk_update_by_model_with_missing_rows(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 4)]
+            transaction.bulk_insert(users[:2])
+
+            users[0].name = 'Taro'
+            users[1].address = 'Japan'
+            users[2].address = 'Japan'
+            r = transaction.bulk_update_by_model(users)
+            assert r == (2, {('name',): 1, ('address',): 1})
+            assert not users[0].is_dirty
+            # Flags of the group with a missing row are kept
+            assert users[1].is_dirty and users[2].is_dirty
+
+    @pytest.mark.bulk_update_by_model
+    def test_bulk_update_by_model_with_no_modified_models(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 3)]
+            assert transaction.bulk_update_by_model(users) == (0, {})
+
+    @pytest.mark.bulk_update_by_model
+    def test_bulk_update_by_model_with_no_pk(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            user_edited_history = UserEditedHistory(
+                '2022/10/31 10:12:34', 'note')
+            user_edited_history.note = 'aaa'
+            with pytest.raises(ValueError) as e:
+                transaction.bulk_update_by_model([user_edited_history])
+            assert str(
+                e.value) == 'Cannot use this function with no primary key model'
+
     ###################
     # Delete
     ###################
@@ -650,6 +1270,88 @@ class TestDB:
             found_histories = transaction.where(UserEditedHistory)
             assert len(found_histories) == 2
 
+    @pytest.mark.bulk_delete_by_model
+    def test_bulk_delete_by_model_with_pk(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 5)]
+            transaction.bulk_insert(users)
+
+            deleted_count = transaction.bulk_delete_by_model(
+                [users[0], users[2]])
+            assert deleted_count == 2
+
+            found_users = transaction.where(User)
+            assert found_users == [users[1], users[3]]
+
+    @pytest.mark.bulk_delete_by_model
+    def test_bulk_delete_by_model_with_no_pk(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            histories = [
+                UserEditedHistory('2022/10/31 10:12:34', 'note'),
+                UserEditedHistory('2022/11/01 10:12:34', 'note2'),
+                UserEditedHistory('2022/11/02 10:12:34', 'note3'),
+            ]
+            transaction.bulk_insert(histories)
+
+            deleted_count = transaction.bulk_delete_by_model(histories[1:])
+            assert deleted_count == 2
+
+            found_histories = transaction.where(UserEditedHistory)
+            assert found_histories == histories[0:1]
+
+    @pytest.mark.delete_many
+    def test_delete_many(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 6)]
+            transaction.bulk_insert(users)
+            # 2 primary key values per statement
+            transaction.con.setlimit(
+                sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 2)
+
+            deleted_count = transaction.delete_many(User, [1, 2, 3, 9, 1])
+            assert deleted_count == 3
+
+            found_users = transaction.where(User)
+            assert found_users == users[3:]
+
+    @pytest.mark.delete_many
+    def test_delete_many_rolls_back_all_chunks(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            users = [User(i, f"TestUser{i}", '123') for i in range(1, 4)]
+            transaction.bulk_insert(users)
+            transaction.execute(
+                'CREATE TEMP TRIGGER keep_user BEFORE DELETE ON users '
+                "WHEN old.id = 3 BEGIN SELECT RAISE(ABORT, 'kept'); END")
+            # 2 primary key values per statement
+            transaction.con.setlimit(
+                sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 2)
+
+            with pytest.raises(sqlite3.IntegrityError):
+                transaction.delete_many(User, [1, 2, 3])
+            assert transaction.where(User) == users
+
+    @pytest.mark.delete_many
+    def test_delete_many_with_multiple_primary_keys(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            items = [OrderItem(1, 1, 10), OrderItem(1, 2, 20),
+                     OrderItem(2, 1, 30)]
+            transaction.bulk_insert(items)
+
+            deleted_count = transaction.delete_many(
+                OrderItem, [(1, 2), (2, 1)])
+            assert deleted_count == 2
+
+            found_items = transaction.where(OrderItem)
+            assert found_items == items[0:1]
+
+    @pytest.mark.delete_many
+    def test_delete_many_no_primary_key_model(self):
+        with DB.transaction_scope(db_filepath) as transaction:
+            with pytest.raises(ValueError) as e:
+                transaction.delete_many(UserEditedHistory, [1])
+            assert str(
+                e.value) == 'Cannot use delete_many method because this class does not have any primary keys'
+
     ###################
     # Isolation Level
     ###################
@@ -727,6 +1429,114 @@ class TestDB:
         with DB.transaction_scope(db_filepath, IsolationLevel.EXCLUSIVE) as transaction:
             assert transaction.con.isolation_level == 'EXCLUSIVE'
 
+    @pytest.mark.transaction
+    def test_transaction_commits_on_success(self):
+        db = DB(db_filepath)
+        with db.transaction() as tran:
+            assert tran is db
+            assert db.con.in_transaction
+            db.insert(User(1, 'TestUser', '123'))
+        assert not db.con.in_transaction
+
+        with DB.transaction_scope(db_filepath) as transaction:
+            assert transaction.find(User, 1) is not None
+
+            # For subsequent tests
+            transaction.delete(User)
+            transaction.commit()
+        db.close()
+
+    @pytest.mark.transaction
+    def test_transaction_rolls_back_on_exception(self):
+        db = DB(db_filepath)
+        with pytest.raises(ValueError):
+            with db.transaction():
+                db.insert(User(1, 'TestUser', '123'))
+                raise ValueError('failed')
+        assert not db.con.in_transaction
+        assert db.find(User, 1) is None
+        db.close()
+
+    @pytest.mark.transaction
+    def test_transaction_rolls_back_on_commit_error(self):
+        db = DB(db_filepath)
+        db.execute('PRAGMA foreign_keys = ON')
+        db.execute('CREATE TEMP TABLE parents (id integer primary key)')
+        db.execute(
+            'CREATE TEMP TABLE children (parent_id integer '
+            'REFERENCES parents (id) DEFERRABLE INITIALLY DEFERRED)')
+        with pytest.raises(sqlite3.IntegrityError):
+            with db.transaction():
+                db.insert(User(1, 'TestUser', '123'))
+                db.execute('INSERT INTO children VALUES (1)')
+        assert not db.con.in_transaction
+        assert db.find(User, 1) is None
+        db.close()
+
+    @pytest.mark.transaction
+    def test_transaction_nested(self):
+        db = DB(db_filepath)
+        with db.transaction():
+            db.insert(User(1, 'TestUser', '123'))
+            with db.transaction():
+                db.insert(User(2, 'TestUser2', '123'))
+            with pytest.raises(ValueError):
+                with db.transaction():
+                    db.insert(User(3, 'TestUser3', '123'))
+                    with db.transaction():
+                        db.insert(User(4, 'TestUser4', '123'))
+                    raise ValueError('failed')
+            # Only the failed savepoint is rolled back.
+            assert [u.id for u in db.where(User)] == [1, 2]
+            assert db.con.in_transaction
+
+        with DB.transaction_scope(db_filepath) as transaction:
+            assert [u.id for u in transaction.where(User)] == [1, 2]
+
+            # For subsequent tests
+            transaction.delete(User)
+            transaction.commit()
+        db.close()
+
+    @pytest.mark.transaction
+    def test_transaction_inside_implicit_transaction(self):
+        db = DB(db_filepath)
+        db.insert(User(1, 'TestUser', '123'))
+        with db.transaction():
+            db.insert(User(2, 'TestUser2', '123'))
+        # The scope is a savepoint, so the outer transaction is still open.
+        assert db.con.in_transaction
+        db.rollback()
+        assert db.where(User) == []
+        db.close()
+
+    ###################
+    # Statement cache
+    ###################
+    @pytest.mark.statement_cache
+    def test_statement_cache_stats(self):
+        with DB.transaction_scope(
+                db_filepath, cached_statements=2) as transaction:
+            assert transaction.statement_cache_stats is None
+            stats = transaction.enable_statement_cache_stats()
+            assert stats is transaction.enable_statement_cache_stats()
+            assert stats.size == 2
+            transaction.find(User, 1)
+            transaction.find(User, 2)
+            transaction.where(User, 'name = ?', ['Taro'])
+            transaction.where(User, 'name  =  ?', ['Jiro'])
+            assert (stats.hits, stats.misses) == (2, 2)
+            assert stats.hit_rate == 0.5
+
+            # The least recently used SQL is evicted.
+            transaction.where(User)
+            transaction.find(User, 1)
+            assert (stats.hits, stats.misses) == (2, 4)
+
+            stats.reset()
+            assert (stats.hits, stats.misses) == (0, 0)
+            assert stats.hit_rate == 0.0
+
     ###################
     # Log
     ###################
@@ -740,7 +1550,11 @@ class TestDB:
             record = caplog.records[0]
             assert record.name == 'DB'
             assert record.levelname == 'INFO'
-            assert record.msg == 'sql executed: SELECT * FROM users'
+            assert record.getMessage() == 'sql executed: SELECT * FROM users'
+            assert record.sql == 'SELECT * FROM users'
+            assert record.param_count == 0
+            assert record.rowcount == -1
+            assert 0 <= record.duration
 
     @pytest.mark.log
     def test_output_sql_executed_log_with_qmark_params(self, caplog):
@@ -753,7 +1567,7 @@ class TestDB:
             record = caplog.records[0]
             assert record.name == 'DB'
             assert record.levelname == 'INFO'
-            assert record.msg == "sql executed: SELECT * FROM users WHERE name = ? AND address = ?, params: ['Taro', 'Japan']"
+            assert record.getMessage() == "sql executed: SELECT * FROM users WHERE name = ? AND address = ?, params: ['Taro', 'Japan']"
 
     @pytest.mark.log
     def test_output_sql_executed_log_with_named_params(self, caplog):
@@ -768,7 +1582,7 @@ class TestDB:
             record = caplog.records[0]
             assert record.name == 'DB'
             assert record.levelname == 'INFO'
-            assert record.msg == "sql executed: SELECT * FROM users WHERE name = :name AND address = :address, params: {'name': 'Taro', 'address': 'Japan'}"
+            assert record.getMessage() == "sql executed: SELECT * FROM users WHERE name = :name AND address = :address, params: {'name': 'Taro', 'address': 'Japan'}"
 
     @pytest.mark.log
     @pytest.mark.skip(reason="This test is already done at test_output_sql_executed_log_with_no_params and test_output_sql_executed_log_with_params.")
@@ -815,7 +1629,7 @@ class TestDB:
             assert record.levelname == 'INFO'
             expected_msg = 'sql executed: INSERT OR IGNORE INTO users VALUES (:id, :name, :phone, :address)'
             expected_msg += ", params: {'id': 1, 'name': 'TestUser1', 'phone': 'phone1', 'address': None}, {'id': 2, 'name': 'TestUser2', 'phone': 'phone2', 'address': 'test address'}, {'id': 3, 'name': 'TestUser3', 'phone': 'phone3', 'address': None}"
-            assert record.msg == expected_msg
+            assert record.getMessage() == expected_msg
 
     @pytest.mark.log
     def test_output_bulk_insert_log_with_log_level_warning(self, caplog):
@@ -835,6 +1649,38 @@ class TestDB:
 
             assert len(caplog.records) == 0
 
+    @pytest.mark.log
+    def test_output_bulk_insert_log_with_sampled_params(self, caplog):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.log_level = INFO
+            transaction.log_max_params = 2
+            transaction.log_max_param_length = 20
+            users = [User(i, f"TestUser{i}", f"phone{i}") for i in range(1, 6)]
+            transaction.bulk_insert(users)
+
+            assert len(caplog.records) == 1
+            record = caplog.records[0]
+            expected_msg = 'sql executed: INSERT OR IGNORE INTO users VALUES (:id, :name, :phone, :address)'
+            expected_msg += ", params: {'id': 1, 'name': 'T..., {'id': 2, 'name': 'T..., ... (3 more)"
+            assert record.getMessage() == expected_msg
+            assert record.param_count == 5
+            assert record.rowcount == 5
+
+    @pytest.mark.log
+    def test_output_bulk_insert_log_with_iterator(self, caplog):
+        with DB.transaction_scope(db_filepath) as transaction:
+            transaction.log_level = INFO
+            transaction.log_max_params = 1
+            users = (User(i, f"TestUser{i}", f"phone{i}") for i in range(1, 4))
+            assert transaction.bulk_insert(users) == 3
+
+            assert len(caplog.records) == 1
+            record = caplog.records[0]
+            expected_msg = 'sql executed: INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)'
+            expected_msg += ", params: (1, 'TestUser1', 'phone1', None), ... (2 more)"
+            assert record.getMessage() == expected_msg
+            assert record.param_count == 3
+
 
 if __name__ == '__main__':
     sys.exit(main())
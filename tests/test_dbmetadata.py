@@ -35,7 +35,8 @@ class TestDBMetaData:
             'users',
             'user_edited_histories',
             'all_optional_columns',
-            'backup_users'
+            'backup_users',
+            'order_items'
         ]
         assert set(got_table_names) == set(expected_table_names)
 
@@ -13,6 +13,7 @@ from tests.create_test_db import DBForTestCreator
 currnet_dir: Final[str] = os.path.dirname(__file__)
 db_filepath: Final[str] = os.path.join(currnet_dir, 'test.db')
 output_path: Final[str] = os.path.join(currnet_dir, 'models')
+slots_output_path: Final[str] = os.path.join(currnet_dir, 'slots_models')
 expected_files_path: Final[str] = os.path.join(currnet_dir, 'expected_files')
 
 
@@ -25,6 +26,8 @@ class TestColumn:
         db_creator.create()
 
         Generator.generate_model_files(db_filepath, output_path)
+        Generator.generate_model_files(
+            db_filepath, slots_output_path, slots=True)
 
         if not os.path.exists(expected_files_path):
             os.makedirs(expected_files_path)
@@ -37,6 +40,9 @@ class TestColumn:
         if os.path.exists(output_path):
             shutil.rmtree(output_path)
 
+        if os.path.exists(slots_output_path):
+            shutil.rmtree(slots_output_path)
+
         if os.path.exists(expected_files_path):
             shutil.rmtree(expected_files_path)
 
@@ -117,6 +123,28 @@ from pyqlite.model import BaseModel
 
 
 @dataclass(init=True, eq=True)
+class User(BaseModel):
+    id: Final[int]
+    name: str
+    phone: str
+    address: Optional[str] = None
+    __table_name: ClassVar[str] = 'users'
+'''
+            assert content == expected_file_content
+
+    @pytest.mark.generate
+    def test_generate_model_files_with_slots(self):
+        model_file_name = 'user.py'
+        with open(os.path.join(slots_output_path, model_file_name), 'r', encoding='UTF-8') as f:
+            content = f.read()
+
+            expected_file_content = '''from dataclasses import dataclass
+from typing import ClassVar, Final, Optional
+
+from pyqlite.model import BaseModel
+
+
+@dataclass(init=True, eq=True, slots=True)
 class User(BaseModel):
     id: Final[int]
     name: str
@@ -0,0 +1,163 @@
+import tests.import_path_resolver
+import sys
+import pytest
+from pytest import main
+
+from pyqlite.db import (
+    DB, ExecuteEvent, Instrumentation, LatencyHistogram, StatsAggregator)
+from example.model import User
+
+
+def create_db() -> DB:
+    db = DB(':memory:')
+    db.execute(
+        'CREATE TABLE users (id integer not null primary key, '
+        'name text not null, phone text not null, address text)')
+    return db
+
+
+class TestInstrumentation:
+    @pytest.mark.instrumentation
+    def test_callbacks(self):
+        db = create_db()
+        instrumentation = Instrumentation()
+        before = []
+        after = []
+        instrumentation.add_before_execute(
+            lambda sql, param_count: before.append((sql, param_count)))
+        instrumentation.add_after_execute(after.append)
+        db.instrumentation = instrumentation
+
+        db.bulk_insert([User(i, f"TestUser{i}", '123') for i in range(1, 4)])
+        db.bulk_insert(User(i, f"TestUser{i}", '123') for i in range(4, 6))
+        assert db.find(User, 1) is not None
+        assert len(db.where(User, 'id > ?', [2])) == 3
+        db.update(User, {'phone': '456'}, 'id = ?', [1])
+
+        assert before == [
+            ('INSERT OR IGNORE INTO users VALUES (:id, :name, :phone, :address)', 3),
+            ('INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)', None),
+            ('SELECT * FROM users WHERE id = ?', 1),
+            ('SELECT * FROM users WHERE id > ?', 1),
+            ('UPDATE users SET phone = ? WHERE id = ?', 2),
+        ]
+        assert [(e.param_count, e.rows, e.rowcount) for e in after] == [
+            (3, None, 3), (2, None, 2), (1, 1, -1), (1, 3, -1), (2, None, 1)]
+        assert all(0 <= e.duration for e in after)
+        db.close()
+
+    @pytest.mark.instrumentation
+    def test_remove_callbacks(self):
+        db = create_db()
+        instrumentation = Instrumentation()
+        events = []
+        instrumentation.add_after_execute(events.append)
+        db.instrumentation = instrumentation
+        db.where(User)
+        instrumentation.remove_after_execute(events.append)
+        db.where(User)
+        assert len(events) == 1
+        db.close()
+
+    @pytest.mark.instrumentation
+    def test_latency_histogram(self):
+        histogram = LatencyHistogram()
+        assert histogram.percentile(50) == 0.0
+        for i in range(1, 1001):
+            histogram.add(i / 1000)
+        assert histogram.count == 1000
+        assert histogram.percentile(50) == pytest.approx(0.5, rel=1 / 32)
+        assert histogram.percentile(99) == pytest.approx(0.99, rel=1 / 32)
+        assert histogram.percentile(100) == pytest.approx(1.0, rel=1 / 32)
+        histogram.add(0)
+        assert histogram.percentile(0) == 0.0
+
+    @pytest.mark.instrumentation
+    def test_latency_histogram_add_many(self):
+        histogram = LatencyHistogram(sub_buckets=16)
+        histogram.add_many([i / 1000 for i in range(1, 1001)])
+        histogram.add_many([-1.0, 0.0])
+        assert histogram.count == 1002
+        assert histogram.percentile(0.1) == 0.0
+        assert histogram.percentile(50) == pytest.approx(0.5, rel=1 / 16)
+        assert histogram.percentile(100) == pytest.approx(1.0, rel=1 / 16)
+        with pytest.raises(ValueError) as e:
+            LatencyHistogram(sub_buckets=10)
+        assert str(e.value) == 'sub_buckets must be a power of two up to 2 ** 52'
+
+    @pytest.mark.instrumentation
+    def test_stats_aggregator(self):
+        aggregator = StatsAggregator()
+        for i in range(100):
+            aggregator(ExecuteEvent('SELECT 1', 0, 0.001, 1, -1))
+        aggregator(ExecuteEvent('SELECT 2', 0, 0.5, None, -1))
+
+        stats = aggregator.get('SELECT 1')
+        assert stats.count == 100
+        assert stats.total == pytest.approx(0.1)
+        assert stats.mean == pytest.approx(0.001)
+        assert stats.rows == 100
+        assert stats.p50 == pytest.approx(0.001, rel=0.05)
+        assert stats.p99 == pytest.approx(0.001, rel=0.05)
+        assert aggregator.get('SELECT 3') is None
+
+        assert [s.sql for s in aggregator.top(1)] == ['SELECT 2']
+        assert [s.sql for s in aggregator.top(key='count')] == [
+            'SELECT 1', 'SELECT 2']
+        report = aggregator.report().splitlines()
+        assert report[0] == 'count\ttotal_ms\tp50_ms\tp95_ms\tp99_ms\tsql'
+        assert report[1].startswith('1\t500.000\t')
+        assert report[1].endswith('\tSELECT 2')
+
+        aggregator.clear()
+        assert aggregator.top() == []
+
+    @pytest.mark.instrumentation
+    def test_stats_aggregator_buffer(self):
+        aggregator = StatsAggregator(buffer_size=4)
+        for i in range(10):
+            aggregator(ExecuteEvent(f"SELECT {i % 2}", 0, 0.001 * i, i, -1))
+        stats = aggregator.get('SELECT 1')
+        assert (stats.count, stats.rows) == (5, 25)
+        assert stats.max == pytest.approx(0.009)
+        assert aggregator.get('SELECT 0').total == pytest.approx(0.02)
+        with pytest.raises(ValueError) as e:
+            StatsAggregator(buffer_size=0)
+        assert str(e.value) == 'buffer_size must be 1 or more'
+
+    @pytest.mark.instrumentation
+    def test_before_execute_only(self):
+        db = create_db()
+        instrumentation = Instrumentation()
+        before = []
+        instrumentation.add_before_execute(
+            lambda sql, param_count: before.append(param_count))
+        db.instrumentation = instrumentation
+        db.bulk_insert(User(i, f"TestUser{i}", '123') for i in range(1, 3))
+        db.find(User, 1)
+        assert before == [None, 1]
+        db.close()
+
+    @pytest.mark.instrumentation
+    def test_stats_aggregator_unknown_key(self):
+        with pytest.raises(ValueError) as e:
+            StatsAggregator().top(key='min')
+        assert str(e.value) == 'Unknown key: min'
+
+    @pytest.mark.instrumentation
+    def test_stats_aggregator_with_db(self):
+        db = create_db()
+        aggregator = StatsAggregator()
+        db.instrumentation = Instrumentation()
+        db.instrumentation.add_after_execute(aggregator)
+        db.bulk_insert([User(i, f"TestUser{i}", '123') for i in range(1, 11)])
+        for i in range(1, 11):
+            db.find(User, i)
+        stats = aggregator.get('SELECT * FROM users WHERE id = ?')
+        assert stats.count == 10
+        assert stats.rows == 10
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import tests.import_path_resolver
+import os
+import sys
+import pytest
+from pytest import main
+
+from pyqlite.db import ConnectionPool, DB, PragmaProfile
+
+
+class TestPragmaProfile:
+    @pytest.mark.pragma_profile
+    def test_to_pragmas(self):
+        profile = PragmaProfile(
+            journal_mode='WAL', synchronous='NORMAL', page_size=8192)
+        assert profile.to_pragmas() == [
+            'PRAGMA page_size = 8192',
+            'PRAGMA journal_mode = WAL',
+            'PRAGMA synchronous = NORMAL',
+        ]
+
+    @pytest.mark.pragma_profile
+    def test_invalid_value(self):
+        with pytest.raises(ValueError) as e:
+            PragmaProfile(synchronous='FAST')
+        assert str(e.value) == 'Invalid synchronous: FAST'
+
+    @pytest.mark.pragma_profile
+    def test_invalid_page_size(self):
+        with pytest.raises(ValueError) as e:
+            PragmaProfile(page_size=1000)
+        assert str(e.value) == 'Invalid page_size: 1000'
+
+    @pytest.mark.pragma_profile
+    def test_preset(self):
+        for name in ['durable', 'balanced', 'bulk-load']:
+            assert isinstance(PragmaProfile.preset(name), PragmaProfile)
+
+    @pytest.mark.pragma_profile
+    def test_unknown_preset(self):
+        with pytest.raises(ValueError) as e:
+            PragmaProfile.preset('fast')
+        assert str(e.value) == 'Unknown preset: fast'
+
+    @pytest.mark.pragma_profile
+    def test_db_applies_profile(self, tmp_path):
+        db_filepath = os.path.join(tmp_path, 'pragma.db')
+        with DB.transaction_scope(
+                db_filepath,
+                pragma_profile=PragmaProfile.preset('balanced')) as transaction:
+            assert transaction.execute(
+                'PRAGMA journal_mode').fetchone() == ('wal',)
+            assert transaction.execute(
+                'PRAGMA synchronous').fetchone() == (1,)
+            assert transaction.execute(
+                'PRAGMA temp_store').fetchone() == (2,)
+            assert transaction.execute(
+                'PRAGMA busy_timeout').fetchone() == (5000,)
+
+    @pytest.mark.pragma_profile
+    def test_connection_pool_applies_profile(self, tmp_path):
+        db_filepath = os.path.join(tmp_path, 'pragma.db')
+        pool = ConnectionPool(
+            db_filepath, pragma_profile=PragmaProfile(cache_size=-1000))
+        with pool.connection() as con:
+            assert con.execute('PRAGMA cache_size').fetchone() == (-1000,)
+        pool.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
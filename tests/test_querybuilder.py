@@ -4,7 +4,7 @@ from pytest import main
 
 import tests.import_path_resolver
 from pyqlite.db import QueryBuilder
-from example.model import User, UserEditedHistory
+from example.model import OrderItem, User, UserEditedHistory
 
 
 class TestQueryBuilder:
@@ -41,6 +41,105 @@ class TestQueryBuilder:
         sql = QueryBuilder.build_select(User)
         assert sql == 'SELECT * FROM users'
 
+    @pytest.mark.build_select
+    def test_build_select_with_columns(self):
+        sql = QueryBuilder.build_select(
+            User, 'id = ?', ['phone', 'name', 'name'])
+        assert sql == 'SELECT name, phone FROM users WHERE id = ?'
+        assert QueryBuilder.build_select(User, columns=['id']) == 'SELECT id FROM users'
+
+    @pytest.mark.build_select
+    def test_build_select_with_invalid_columns(self):
+        with pytest.raises(ValueError) as e:
+            QueryBuilder.build_select(User, columns=[])
+        assert str(e.value) == 'The number of columns must be 1 or more'
+        with pytest.raises(ValueError) as e:
+            QueryBuilder.build_select(User, columns=['name', 'email'])
+        assert str(e.value) == 'Unknown column names: email'
+
+    @pytest.mark.build_select_by_pks
+    def test_build_select_by_pks_with_key(self):
+        sql = QueryBuilder.build_select_by_pks(User, 3)
+        assert sql == 'SELECT t.*, k.column1 FROM (VALUES (0, ?), (1, ?), (2, ?)) AS k JOIN users AS t ON t.id = k.column2'
+
+    @pytest.mark.build_select_by_pks
+    def test_build_select_by_pks_with_multiple_keys(self):
+        sql = QueryBuilder.build_select_by_pks(OrderItem, 2)
+        assert sql == 'SELECT t.*, k.column1 FROM (VALUES (0, ?, ?), (1, ?, ?)) AS k JOIN order_items AS t ON t.order_id = k.column2 AND t.item_no = k.column3'
+
+    @pytest.mark.build_select_by_pks
+    def test_build_select_by_pks_with_no_pks(self):
+        with pytest.raises(ValueError) as e:
+            QueryBuilder.build_select_by_pks(UserEditedHistory, 1)
+        assert str(
+            e.value) == 'Cannot select by primary keys because this class does not have any primary keys'
+
+    @pytest.mark.build_select_page
+    def test_build_select_page_first_page(self):
+        sql = QueryBuilder.build_select_page(User)
+        assert sql == 'SELECT * FROM users ORDER BY id LIMIT ?'
+
+    @pytest.mark.build_select_page
+    def test_build_select_page_with_where_and_after(self):
+        sql = QueryBuilder.build_select_page(User, 'address = ?', True)
+        assert sql == 'SELECT * FROM users WHERE (address = ?) AND id > ? ORDER BY id LIMIT ?'
+
+    @pytest.mark.build_select_page
+    def test_build_select_page_with_multiple_keys_and_named_params(self):
+        sql = QueryBuilder.build_select_page(
+            OrderItem, 'quantity > :quantity', True, True)
+        assert sql == 'SELECT * FROM order_items WHERE (quantity > :quantity) AND (order_id, item_no) > (:_pyqlite_after_0, :_pyqlite_after_1) ORDER BY order_id, item_no LIMIT :_pyqlite_limit'
+
+    @pytest.mark.build_select_page
+    def test_build_select_page_with_no_pks(self):
+        with pytest.raises(ValueError) as e:
+            QueryBuilder.build_select_page(UserEditedHistory)
+        assert str(
+            e.value) == 'Cannot use pagination because this class does not have any primary keys'
+
+    @pytest.mark.build_count
+    def test_build_count(self):
+        assert QueryBuilder.build_count(User) == 'SELECT count(*) FROM users'
+        assert QueryBuilder.build_count(
+            User, ' address =  ?') == 'SELECT count(*) FROM users WHERE address = ?'
+
+    @pytest.mark.build_exists
+    def test_build_exists(self):
+        assert QueryBuilder.build_exists(User) == 'SELECT 1 FROM users LIMIT 1'
+        assert QueryBuilder.build_exists(
+            User, 'name = ?') == 'SELECT 1 FROM users WHERE name = ? LIMIT 1'
+
+    @pytest.mark.build_aggregate
+    def test_build_aggregate(self):
+        sql = QueryBuilder.build_aggregate(
+            OrderItem, {'total': 'sum(quantity)', 'items': 'count(*)'},
+            'quantity > ?')
+        assert sql == 'SELECT sum(quantity) AS "total", count(*) AS "items" FROM order_items WHERE quantity > ?'
+
+    @pytest.mark.build_aggregate
+    def test_build_aggregate_with_group_by(self):
+        sql = QueryBuilder.build_aggregate(
+            OrderItem, {'total': 'sum(quantity)'}, group_by=['order_id'])
+        assert sql == 'SELECT order_id, sum(quantity) AS "total" FROM order_items GROUP BY order_id'
+
+    @pytest.mark.build_aggregate
+    def test_build_aggregate_with_invalid_arguments(self):
+        with pytest.raises(ValueError) as e:
+            QueryBuilder.build_aggregate(OrderItem, {})
+        assert str(e.value) == 'The number of aggregates must be 1 or more'
+        with pytest.raises(ValueError) as e:
+            QueryBuilder.build_aggregate(
+                OrderItem, {'total; --': 'sum(quantity)'})
+        assert str(e.value) == 'Invalid aliases: total; --'
+        with pytest.raises(ValueError) as e:
+            QueryBuilder.build_aggregate(
+                OrderItem, {'total': 'sum(quantity)'}, group_by=['x'])
+        assert str(e.value) == 'Unknown column names: x'
+        with pytest.raises(ValueError) as e:
+            QueryBuilder.build_aggregate(
+                OrderItem, {'order_id': 'sum(quantity)'}, group_by=['order_id'])
+        assert str(e.value) == 'Aliases duplicate group_by columns: order_id'
+
     ###################
     # Build Insert
     ###################
@@ -86,6 +185,43 @@ class TestQueryBuilder:
             param_list_for_testing.append(u.to_dict())
         assert param_list == param_list_for_testing
 
+    @pytest.mark.build_upsert
+    def test_build_upsert_with_pks(self):
+        sql = QueryBuilder.build_upsert(User)
+        assert sql == 'INSERT INTO users VALUES (?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET name = excluded.name, phone = excluded.phone, address = excluded.address'
+
+    @pytest.mark.build_upsert
+    def test_build_upsert_with_columns(self):
+        sql = QueryBuilder.build_upsert(
+            UserEditedHistory, ['datetime'], ['note'])
+        assert sql == 'INSERT INTO user_edited_histories VALUES (?, ?) ON CONFLICT (datetime) DO UPDATE SET note = excluded.note'
+
+    @pytest.mark.build_upsert
+    def test_build_upsert_with_tuple_and_list_columns(self):
+        sql = QueryBuilder.build_upsert(
+            UserEditedHistory, ('datetime',), ['note'])
+        assert sql == 'INSERT INTO user_edited_histories VALUES (?, ?) ON CONFLICT (datetime) DO UPDATE SET note = excluded.note'
+        assert QueryBuilder.build_upsert(
+            UserEditedHistory, ['datetime'], ('note',)) == sql
+
+    @pytest.mark.build_upsert
+    def test_build_upsert_with_no_update_columns(self):
+        sql = QueryBuilder.build_upsert(User, update_columns=[])
+        assert sql == 'INSERT INTO users VALUES (?, ?, ?, ?) ON CONFLICT (id) DO NOTHING'
+
+    @pytest.mark.build_upsert
+    def test_build_upsert_with_no_pks(self):
+        with pytest.raises(ValueError) as e:
+            QueryBuilder.build_upsert(UserEditedHistory)
+        assert str(
+            e.value) == 'conflict_columns must be specified for no primary key model'
+
+    @pytest.mark.build_upsert
+    def test_build_upsert_with_unknown_columns(self):
+        with pytest.raises(ValueError) as e:
+            QueryBuilder.build_upsert(User, update_columns=['email'])
+        assert str(e.value) == 'Unknown column names: email'
+
     ###################
     # Build Update
     ###################
@@ -121,6 +257,21 @@ class TestQueryBuilder:
             User, data_to_be_updated, where, condition)
         assert sql == "UPDATE users SET address = :address WHERE address = :p_address"
 
+    @pytest.mark.build_update
+    def test_build_update_orders_named_columns_by_members(self):
+        sql = QueryBuilder.build_update(
+            User, {'address': 'Tokyo', 'name': 'Taro'}, 'id  =\n :id', {'id': 1})
+        assert sql == "UPDATE users SET name = :name, address = :address WHERE id = :id"
+        assert sql == QueryBuilder.build_update(
+            User, {'name': 'Taro', 'address': 'Tokyo'}, 'id = :id', {'id': 1})
+
+    @pytest.mark.build_update
+    def test_build_update_keeps_qmark_columns_order(self):
+        # Values are bound by position, in the order of data_to_be_updated
+        sql = QueryBuilder.build_update(
+            User, {'address': 'Tokyo', 'name': 'Taro'}, 'id = ?', [1])
+        assert sql == "UPDATE users SET address = ?, name = ? WHERE id = ?"
+
     @pytest.mark.build_update
     @pytest.mark.skip(reason="This case is not needed run because the same as test_build_update_with_qmark_params_and_no_where.")
     def test_build_update_with_named_params_and_no_where(self):
@@ -176,6 +327,89 @@ class TestQueryBuilder:
         sql = QueryBuilder.build_delete_by_model(user_edited_history)
         assert sql == 'DELETE FROM user_edited_histories WHERE datetime = :datetime AND note = :note'
 
+    @pytest.mark.build_delete_by_pks
+    def test_build_delete_by_pks_with_key(self):
+        sql = QueryBuilder.build_delete_by_pks(User, 2)
+        assert sql == 'DELETE FROM users WHERE id IN (?, ?)'
+
+    @pytest.mark.build_delete_by_pks
+    def test_build_delete_by_pks_with_multiple_keys(self):
+        sql = QueryBuilder.build_delete_by_pks(OrderItem, 1)
+        assert sql == 'DELETE FROM order_items WHERE (order_id, item_no) IN (VALUES (?, ?))'
+
+    @pytest.mark.build_delete_by_pks
+    def test_build_delete_by_pks_with_no_pks(self):
+        with pytest.raises(ValueError) as e:
+            QueryBuilder.build_delete_by_pks(UserEditedHistory, 1)
+        assert str(
+            e.value) == 'Cannot delete by primary keys because this class does not have any primary keys'
+
+    ###################
+    # Compile
+    ###################
+    @pytest.mark.compile
+    def test_compile_with_pks(self):
+        compiled = QueryBuilder.compile(User)
+        assert compiled.table_name == 'users'
+        assert compiled.member_names == ('id', 'name', 'phone', 'address')
+        assert compiled.pks == ('id',)
+        assert compiled.select_by_pk_sql == 'SELECT * FROM users WHERE id = ?'
+        assert compiled.insert_sql == 'INSERT INTO users VALUES (?, ?, ?, ?)'
+        assert compiled.insert_or_ignore_sql == 'INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)'
+        assert compiled.delete_by_model_sql == 'DELETE FROM users WHERE id = :id'
+
+    @pytest.mark.compile
+    def test_compile_with_no_pks(self):
+        compiled = QueryBuilder.compile(UserEditedHistory)
+        assert compiled.pks == ()
+        assert compiled.select_by_pk_sql is None
+        assert compiled.delete_by_model_sql == 'DELETE FROM user_edited_histories WHERE datetime = :datetime AND note = :note'
+
+    @pytest.mark.compile
+    def test_compile_is_cached(self):
+        assert QueryBuilder.compile(User) is QueryBuilder.compile(User)
+        assert QueryBuilder.compile(User).get_update_sql(
+            ('name',)) is QueryBuilder.compile(User).get_update_sql(('name',))
+
+    @pytest.mark.compile
+    def test_get_update_sql_one_text_per_column_set(self):
+        compiled = QueryBuilder.compile(User)
+        sql = compiled.get_update_sql(('address', 'name'))
+        assert sql == 'UPDATE users SET name = :name, address = :address WHERE id = :id'
+        assert sql is compiled.get_update_sql(('name', 'address'))
+        assert compiled.get_ordered_columns(('address', 'x', 'id')) == (
+            'id', 'address', 'x')
+
+    @pytest.mark.compile
+    def test_unknown_columns_are_not_cached(self):
+        compiled = QueryBuilder.compile(User)
+        cache = compiled._CompiledModel__ordered_columns
+        with pytest.raises(ValueError):
+            QueryBuilder.build_select(User, columns=['name', 'email'])
+        compiled.get_ordered_columns(('address', 'x'))
+        assert ('name', 'email') not in cache
+        assert ('address', 'x') not in cache
+        compiled.get_ordered_columns(('address', 'name'))
+        assert cache[('address', 'name')] == ('name', 'address')
+
+    @pytest.mark.canonicalize_where
+    def test_canonicalize_where(self):
+        assert QueryBuilder.canonicalize_where(
+            '  name =  ?\n\tAND phone = ? ') == 'name = ? AND phone = ?'
+        assert QueryBuilder.canonicalize_where(
+            "note = 'a  b' AND \"x  y\" = [c  d]") == "note = 'a  b' AND \"x  y\" = [c  d]"
+        assert QueryBuilder.canonicalize_where(
+            'id = ? -- a  comment\n  AND /* b   c */ name = ?') == 'id = ? -- a  comment\n AND /* b   c */ name = ?'
+        assert QueryBuilder.build_select(User, ' id =  ? ') == 'SELECT * FROM users WHERE id = ?'
+        assert QueryBuilder.build_delete(User, 'id\n= ?') == 'DELETE FROM users WHERE id = ?'
+
+    @pytest.mark.compile
+    def test_invalidate(self):
+        compiled = QueryBuilder.compile(User)
+        QueryBuilder.invalidate(User)
+        assert QueryBuilder.compile(User) is not compiled
+        assert QueryBuilder.compile(User) == compiled
+
 
 if __name__ == '__main__':
     sys.exit(main())
@@ -0,0 +1,163 @@
+import tests.import_path_resolver
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pytest import main
+
+from pyqlite.db import ConnectionPool, DB, PragmaProfile
+from example.model import User
+from tests.create_test_db import create_test_db
+
+
+class TestReaderPool:
+    @pytest.mark.reader_pool
+    def test_read_only_connection_pool(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'reader.db')
+        pool = ConnectionPool(db_filepath, read_only=True)
+        with pool.connection() as con:
+            assert con.execute('SELECT count(*) FROM users').fetchone() == (0,)
+            with pytest.raises(sqlite3.OperationalError):
+                con.execute("INSERT INTO users VALUES (1, 'TestUser', '123', NULL)")
+        pool.close()
+
+    @pytest.mark.reader_pool
+    def test_reads_see_committed_writes(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'reader.db')
+        db = DB.with_readers(
+            db_filepath, readers=2,
+            pragma_profile=PragmaProfile.preset('balanced'))
+        try:
+            assert not db.reader_pool.health_check
+            db.insert(User(1, 'TestUser', '123'))
+            # Readers do not see the uncommitted insert.
+            assert db.find(User, 1) is None
+            assert db.where(User) == []
+            assert db.find_many(User, [1]) == [None]
+            assert db.paginate(User) == ([], None)
+            assert list(db.iter_where(User)) == []
+            db.commit()
+            assert db.find(User, 1) == User(1, 'TestUser', '123')
+            assert db.find_by(User, 'name = ?', ['TestUser']) \
+                == User(1, 'TestUser', '123')
+            assert db.where(User) == [User(1, 'TestUser', '123')]
+            assert db.reader_pool.size == 1
+        finally:
+            db.close()
+        with pytest.raises(ValueError):
+            db.reader_pool.acquire()
+
+    @pytest.mark.reader_pool
+    def test_iter_where_keeps_reader_until_closed(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'reader.db')
+        db = DB.with_readers(
+            db_filepath, readers=2,
+            pragma_profile=PragmaProfile(journal_mode='WAL'))
+        try:
+            db.bulk_insert(
+                [User(i, f"TestUser{i}", '123') for i in range(1, 6)])
+            db.commit()
+            it = db.iter_where(User, batch_size=2)
+            assert next(it).id == 1
+            assert db.reader_pool.idle_count == 0
+            # Writes between batches do not affect the checked out reader.
+            db.delete(User)
+            db.commit()
+            assert [user.id for user in it] == [2, 3, 4, 5]
+            assert db.reader_pool.idle_count == 1
+        finally:
+            db.close()
+
+    @pytest.mark.reader_pool
+    def test_read_your_writes(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'reader.db')
+        db = DB.with_readers(
+            db_filepath, readers=2, read_your_writes=True,
+            pragma_profile=PragmaProfile(journal_mode='WAL'))
+        try:
+            db.insert(User(1, 'TestUser', '123'))
+            assert db.find(User, 1) == User(1, 'TestUser', '123')
+            assert db.reader_pool.size == 0
+            db.rollback()
+            assert db.find(User, 1) is None
+            assert db.reader_pool.size == 1
+        finally:
+            db.close()
+
+    @pytest.mark.reader_pool
+    def test_read_your_writes_on_other_thread(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'reader.db')
+        db = DB.with_readers(
+            db_filepath, readers=2, read_your_writes=True,
+            pragma_profile=PragmaProfile(journal_mode='WAL'))
+        try:
+            db.insert(User(1, 'TestUser', '123'))
+            db.commit()
+            user = db.find(User, 1)
+            user.name = 'uncommitted'
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(db.update_by_model, user).result()
+                # Another thread does not see the uncommitted update.
+                assert db.find(User, 1).name == 'TestUser'
+                assert executor.submit(
+                    db.find, User, 1).result().name == 'uncommitted'
+                executor.submit(db.rollback).result()
+        finally:
+            db.close()
+
+    @pytest.mark.reader_pool
+    def test_concurrent_reads(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'reader.db')
+        db = DB.with_readers(
+            db_filepath, readers=4,
+            pragma_profile=PragmaProfile(journal_mode='WAL'))
+        try:
+            db.bulk_insert(
+                [User(i, f"TestUser{i}", '123') for i in range(1, 101)])
+            db.commit()
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                found = list(executor.map(
+                    lambda i: db.find(User, i), range(1, 101)))
+            assert [user.id for user in found] == list(range(1, 101))
+            assert db.reader_pool.size <= 4
+        finally:
+            db.close()
+
+    @pytest.mark.reader_pool
+    def test_concurrent_transactions_on_writer(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'reader.db')
+        db = DB.with_readers(db_filepath, readers=2)
+
+        def write(n):
+            for i in range(n * 100, n * 100 + 20):
+                with db.transaction():
+                    db.insert(User(i, f"TestUser{i}", '123'))
+                    # Let other threads run inside of the transaction
+                    time.sleep(0.001)
+                    with db.transaction():
+                        db.update(User, {'phone': '456'}, 'id = ?', [i])
+            return n
+
+        try:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                assert list(executor.map(write, range(4))) == [0, 1, 2, 3]
+            assert not db.con.in_transaction
+            assert len(db.where(User, 'phone = ?', ['456'])) == 80
+        finally:
+            db.close()
+
+    @pytest.mark.reader_pool
+    def test_reader_pool_is_not_closed_when_passed(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'reader.db')
+        pool = ConnectionPool(db_filepath, read_only=True)
+        db = DB(db_filepath, reader_pool=pool)
+        assert db.where(User) == []
+        db.close()
+        with pool.connection() as con:
+            assert con.execute('SELECT 1').fetchone() == (1,)
+        pool.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import tests.import_path_resolver
+import sqlite3
+import sys
+import threading
+import pytest
+from pytest import main
+
+from pyqlite.db import DB, PragmaProfile, RetryPolicy
+from example.model import User
+from tests.create_test_db import create_test_db
+
+
+class TestRetryPolicy:
+    @pytest.mark.retry_policy
+    def test_is_retryable(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'retry.db')
+        locker = sqlite3.connect(db_filepath)
+        locker.execute('BEGIN IMMEDIATE')
+        con = sqlite3.connect(db_filepath, timeout=0)
+        with pytest.raises(sqlite3.OperationalError) as e:
+            con.execute("INSERT INTO users VALUES (1, 'TestUser', '123', NULL)")
+        assert RetryPolicy.is_retryable(e.value)
+        assert RetryPolicy.is_retryable(
+            sqlite3.OperationalError('database is locked'))
+        assert not RetryPolicy.is_retryable(
+            sqlite3.OperationalError('no such table: foo'))
+        assert not RetryPolicy.is_retryable(ValueError('database is locked'))
+        con.close()
+        locker.close()
+
+    @pytest.mark.retry_policy
+    def test_get_delay(self):
+        policy = RetryPolicy(initial_delay=0.1, max_delay=0.3, jitter=0)
+        assert [policy.get_delay(n) for n in range(1, 5)] == [
+            0.1, 0.2, 0.3, 0.3]
+        policy = RetryPolicy(initial_delay=0.1, jitter=0.5)
+        assert all(0.05 <= policy.get_delay(1) <= 0.1 for _ in range(100))
+
+    @pytest.mark.retry_policy
+    def test_run_retries_until_success(self):
+        policy = RetryPolicy(initial_delay=0.001, jitter=0)
+        calls = []
+
+        def func(value):
+            calls.append(value)
+            if len(calls) < 3:
+                raise sqlite3.OperationalError('database is locked')
+            return value
+
+        assert policy.run(func, 'ok') == 'ok'
+        assert len(calls) == 3
+        assert policy.retry_count == 2
+        assert policy.wait_time == pytest.approx(0.003)
+        policy.reset_stats()
+        assert policy.retry_count == 0
+        assert policy.wait_time == 0
+
+    @pytest.mark.retry_policy
+    def test_run_gives_up(self):
+        def func():
+            raise sqlite3.OperationalError('database is locked')
+
+        policy = RetryPolicy(max_attempts=3, initial_delay=0.001)
+        with pytest.raises(sqlite3.OperationalError):
+            policy.run(func)
+        assert policy.retry_count == 2
+
+        policy = RetryPolicy(initial_delay=1, max_elapsed=0.5)
+        with pytest.raises(sqlite3.OperationalError):
+            policy.run(func)
+        assert policy.retry_count == 0
+
+    @pytest.mark.retry_policy
+    def test_run_does_not_retry_other_errors(self):
+        policy = RetryPolicy()
+        with pytest.raises(sqlite3.OperationalError):
+            policy.run(sqlite3.connect(':memory:').execute, 'SELECT * FROM foo')
+        assert policy.retry_count == 0
+
+    @pytest.mark.retry_policy
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError) as e:
+            RetryPolicy(max_attempts=0)
+        assert str(e.value) == 'max_attempts must be 1 or more'
+        with pytest.raises(ValueError) as e:
+            RetryPolicy(jitter=2)
+        assert str(e.value) == 'jitter must be between 0 and 1'
+
+    @pytest.mark.retry_policy
+    def test_db_retries_statement(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'retry.db')
+        locker = sqlite3.connect(db_filepath, check_same_thread=False)
+        locker.execute('BEGIN IMMEDIATE')
+        timer = threading.Timer(0.05, locker.rollback)
+        timer.start()
+        policy = RetryPolicy(initial_delay=0.02, max_attempts=20)
+        db = DB(
+            db_filepath,
+            pragma_profile=PragmaProfile(busy_timeout=0),
+            retry_policy=policy)
+        assert db.insert(User(1, 'TestUser', '123')) == 1
+        db.commit()
+        assert 0 < policy.retry_count
+        assert 0 < policy.wait_time
+        timer.join()
+        db.close()
+        locker.close()
+
+    @pytest.mark.retry_policy
+    def test_db_does_not_retry_mid_transaction(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'retry.db')
+        policy = RetryPolicy(initial_delay=0.001)
+        db = DB(
+            db_filepath,
+            pragma_profile=PragmaProfile(journal_mode='WAL', busy_timeout=0),
+            retry_policy=policy)
+        # Take a read snapshot, then let another connection commit.
+        db.execute('BEGIN')
+        db.where(User)
+        other = sqlite3.connect(db_filepath)
+        other.execute("INSERT INTO users VALUES (1, 'TestUser', '123', NULL)")
+        other.commit()
+        with pytest.raises(sqlite3.OperationalError):
+            db.insert(User(2, 'TestUser2', '123'))
+        assert policy.retry_count == 0
+        db.rollback()
+        db.close()
+        other.close()
+
+    @pytest.mark.retry_policy
+    def test_run_in_transaction(self, tmp_path):
+        db_filepath = create_test_db(str(tmp_path), 'retry.db')
+        policy = RetryPolicy(initial_delay=0.001)
+        calls = []
+
+        def func(tran: DB):
+            calls.append(tran)
+            tran.insert(User(len(calls), 'TestUser', '123'))
+            if len(calls) == 1:
+                raise sqlite3.OperationalError('database is locked')
+            tran.commit()
+            return len(calls)
+
+        assert DB.run_in_transaction(
+            func, db_filepath, retry_policy=policy) == 2
+        assert policy.retry_count == 1
+        # The insert of the failed attempt was rolled back.
+        with DB.transaction_scope(db_filepath) as tran:
+            assert tran.where(User) == [User(2, 'TestUser', '123')]
+
+
+if __name__ == '__main__':
+    sys.exit(main())
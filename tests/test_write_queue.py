@@ -0,0 +1,140 @@
+import tests.import_path_resolver
+import os
+import sqlite3
+import sys
+import threading
+import pytest
+from pytest import main
+from typing import Final
+
+from pyqlite.db import DB, WriteQueue
+from example.model import User
+from tests.create_test_db import DBForTestCreator
+
+currnet_dir: Final[str] = os.path.dirname(__file__)
+db_filepath: Final[str] = os.path.join(currnet_dir, 'test.db')
+
+
+class TestWriteQueue:
+
+    def setup_method(self):
+        if os.path.exists(db_filepath):
+            os.remove(db_filepath)
+        db_creator = DBForTestCreator(currnet_dir)
+        db_creator.create()
+
+    @classmethod
+    def teardown_class(cls):
+        if os.path.exists(db_filepath):
+            os.remove(db_filepath)
+
+    @pytest.mark.write_queue
+    def test_insert_from_multiple_threads(self):
+        with WriteQueue(db_filepath, max_latency=0.05) as write_queue:
+            futures = []
+
+            def produce(start):
+                for i in range(start, start + 50):
+                    futures.append(write_queue.insert(
+                        User(i, f"TestUser{i}", '123')))
+            threads = [threading.Thread(target=produce, args=(n * 50,))
+                       for n in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert all(f.result(timeout=5) == 1 for f in futures)
+
+        assert write_queue.operation_count == 200
+        assert write_queue.flush_count < 200
+        with DB.transaction_scope(db_filepath) as transaction:
+            assert len(transaction.where(User)) == 200
+
+    @pytest.mark.write_queue
+    def test_failed_operation_is_rolled_back_alone(self):
+        with WriteQueue(db_filepath, max_latency=0.05) as write_queue:
+            f1 = write_queue.insert(User(1, 'TestUser', '123'))
+            f2 = write_queue.insert(User(1, 'TestUser', '123'), False)
+            f3 = write_queue.insert(User(2, 'TestUser2', '123'))
+            assert f1.result(timeout=5) == 1
+            with pytest.raises(sqlite3.IntegrityError):
+                f2.result(timeout=5)
+            assert f3.result(timeout=5) == 1
+
+        with DB.transaction_scope(db_filepath) as transaction:
+            assert len(transaction.where(User)) == 2
+
+    @pytest.mark.write_queue
+    def test_update_and_delete_by_model(self):
+        with WriteQueue(db_filepath) as write_queue:
+            user = User(1, 'TestUser', '123')
+            user2 = User(2, 'TestUser2', '123')
+            write_queue.insert(user)
+            write_queue.insert(user2)
+            user.name = 'Taro'
+            assert write_queue.update_by_model(user).result(timeout=5) == 1
+            assert write_queue.delete_by_model(user2).result(timeout=5) == 1
+
+        with DB.transaction_scope(db_filepath) as transaction:
+            assert transaction.where(User) == [user]
+
+    @pytest.mark.write_queue
+    def test_submit_unsupported_operation(self):
+        with WriteQueue(db_filepath) as write_queue:
+            with pytest.raises(ValueError) as e:
+                write_queue.submit('where', User)
+            assert str(e.value) == 'Unsupported operation: where'
+
+    @pytest.mark.write_queue
+    def test_submit_after_close(self):
+        write_queue = WriteQueue(db_filepath)
+        write_queue.close()
+        with pytest.raises(ValueError) as e:
+            write_queue.insert(User(1, 'TestUser', '123'))
+        assert str(e.value) == 'The write queue is closed'
+
+    @pytest.mark.write_queue
+    def test_open_error_is_raised_by_constructor(self):
+        with pytest.raises(sqlite3.OperationalError):
+            WriteQueue(os.path.join(currnet_dir, 'not_exists', 'test.db'))
+
+    @pytest.mark.write_queue
+    def test_dirty_flags_are_kept_when_commit_fails(self, monkeypatch):
+        def fail_commit(db):
+            raise sqlite3.OperationalError('database is locked')
+
+        with WriteQueue(db_filepath) as write_queue:
+            user = User(1, 'TestUser', '123')
+            write_queue.insert(user).result(timeout=5)
+            user.name = 'Taro'
+            with monkeypatch.context() as m:
+                m.setattr(DB, 'commit', fail_commit)
+                with pytest.raises(sqlite3.OperationalError):
+                    write_queue.update_by_model(user).result(timeout=5)
+            assert user.dirty_member_names == ('name',)
+            assert write_queue.update_by_model(user).result(timeout=5) == 1
+            assert not user.is_dirty
+
+        with DB.transaction_scope(db_filepath) as transaction:
+            assert transaction.find(User, 1) == user
+
+    @pytest.mark.write_queue
+    def test_writer_thread_stopped_by_error(self, monkeypatch):
+        def fail(db):
+            raise sqlite3.OperationalError('disk I/O error')
+
+        monkeypatch.setattr(DB, 'commit', fail)
+        monkeypatch.setattr(DB, 'rollback', fail)
+        write_queue = WriteQueue(db_filepath)
+        with pytest.raises(ValueError) as e:
+            # Operations submitted before the writer thread stops get the error
+            while True:
+                future = write_queue.insert(User(1, 'TestUser', '123'))
+                with pytest.raises(sqlite3.OperationalError):
+                    future.result(timeout=5)
+        assert str(e.value) == 'The writer thread has stopped'
+        write_queue.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())